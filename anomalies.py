@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Statistical Anomaly Detection
+
+Scores every (year, country, metric) value of every numeric field against
+three baselines at once:
+
+    global     z-score and percentile against every country that year
+    regional   z-score and percentile against the country's region that year
+    temporal   robust z-score of the country's change per year against the
+               median and MAD of its previous changes (a rolling window)
+
+Magnitudes that span orders of magnitude (population, GDP, trade, ...) are
+compared on a log scale, so the largest economies are not flagged every
+year just for being large. Working on changes rather than levels keeps
+steady trends like population growth from looking anomalous.
+
+Values whose score crosses a threshold are written, strongest first, to a
+ranked artifact. Work is done column by column over a MetricPanel's float64
+arrays, so only flagged values cost more than a comparison.
+
+Usage:
+    python anomalies.py
+    python anomalies.py --threshold 3 --window 5 --top 20
+
+Outputs:
+    data/_merged/anomalies.json
+"""
+
+import argparse
+import bisect
+import json
+import math
+import time
+from array import array
+from collections import deque
+from typing import Optional
+
+from merge_timeseries import OUTPUT_DIR, get_available_years, load_years
+from panel import MetricPanel
+
+NAN = math.nan
+
+ANOMALIES_FILE = 'anomalies.json'
+# |z| at or above which a value is flagged against the global or regional spread
+Z_THRESHOLD = 3.0
+# Robust z (0.6745 * deviation / MAD) threshold, after Iglewicz and Hoaglin
+ROBUST_Z_THRESHOLD = 3.5
+# Previous changes in the temporal window, and how many are needed before scoring.
+# MADs of fewer than ~10 values are noisy enough to flag ordinary years.
+WINDOW = 10
+MIN_HISTORY = 5
+# Smallest region (countries in it that year) that gets a regional baseline
+MIN_REGION_SIZE = 5
+# Compared cross-sectionally as log10 of positive values. Only quantities
+# that cannot be negative: signed ones such as current_account_billions
+# stay linear, or their deficits would drop out.
+LOG_SCALE_METRICS = {
+    'population', 'gdp_ppp_billions', 'gdp_per_capita', 'exports_billions', 'imports_billions',
+    'external_debt_billions', 'electricity_kwh', 'oil_production_bbl_day',
+    'oil_consumption_bbl_day', 'gas_production_cu_m', 'manpower_available',
+}
+
+
+def numeric_fields(all_data: dict) -> dict:
+    """{section: [fields]} of every numeric field in the loaded years, in first-seen order."""
+    sections = {}
+    for countries in all_data.values():
+        for record in countries.values():
+            for section in record.sections:
+                sections.setdefault(section, {})
+            for section, field, value in record.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    sections[section][field] = None
+    return {section: list(fields) for section, fields in sections.items() if fields}
+
+
+def region_members(all_data: dict, panel: MetricPanel) -> list[dict]:
+    """Per panel year, {region: [country positions]} from that year's records."""
+    members = []
+    for year in panel.years:
+        regions = {}
+        for key, record in all_data.get(year, {}).items():
+            regions.setdefault(record.region or 'Unknown', []).append(panel.country_index[key])
+        members.append(regions)
+    return members
+
+
+def spread(values: list[float]) -> tuple[float, float]:
+    """Mean and population standard deviation."""
+    mean = math.fsum(values) / len(values)
+    return mean, math.sqrt(math.fsum([(value - mean) ** 2 for value in values]) / len(values))
+
+
+def cross_sectional(column, positions: Optional[list[int]], threshold: float) -> dict:
+    """{position: (z, percentile)} for values at least threshold deviations from the group mean.
+
+    The group is the given country positions, or the whole column for None.
+    Percentile is the share of the group strictly below the value.
+    """
+    if positions is None:
+        values = [value for value in column if value == value]
+    else:
+        values = [value for value in [column[i] for i in positions] if value == value]
+    if len(values) < 2:
+        return {}
+    mean, std = spread(values)
+    if std == 0:
+        return {}
+    # NaN fails both comparisons
+    low, high = mean - threshold * std, mean + threshold * std
+    if positions is None:
+        flagged = [i for i, value in enumerate(column) if value <= low or value >= high]
+    else:
+        flagged = [i for i in positions if column[i] <= low or column[i] >= high]
+    if not flagged:
+        return {}
+    ordered = sorted(values)
+    return {
+        i: ((column[i] - mean) / std, bisect.bisect_left(ordered, column[i]) / len(ordered) * 100)
+        for i in flagged
+    }
+
+
+def median(ordered: list[float]) -> float:
+    n = len(ordered)
+    middle = n // 2
+    return ordered[middle] if n % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def log_scale(column) -> array:
+    """log10 of a column; zero, negative and missing values become NaN."""
+    return array('d', [math.log10(value) if value > 0 else NAN for value in column])
+
+
+def temporal(series, years: list[int], window: int, min_history: int, threshold: float) -> dict:
+    """{year position: (robust z, median change)} for unusual changes per year.
+
+    Each value's change per year since the country's previous value is
+    compared with the median and MAD of its last window changes. When more
+    than half the window repeats one change (MAD of zero) the mean absolute
+    deviation stands in, scaled to match; flat windows are skipped.
+    """
+    flagged = {}
+    recent = deque(maxlen=window)
+    ordered = []  # recent, kept sorted
+    prev_pos = None
+    for pos, value in enumerate(series):
+        if value != value:
+            continue
+        if prev_pos is None:
+            prev_pos = pos
+            continue
+        rate = (value - series[prev_pos]) / (years[pos] - years[prev_pos])
+        prev_pos = pos
+        if len(ordered) >= min_history:
+            center = median(ordered)
+            deviations = sorted([abs(x - center) for x in ordered])
+            mad = median(deviations)
+            # Spreads this small are float rounding between equal changes
+            tolerance = 1e-9 * (abs(center) + abs(rate))
+            if mad > tolerance:
+                scale = mad / 0.6745
+            else:
+                scale = 1.253314 * math.fsum(deviations) / len(deviations)
+            if scale > tolerance and abs(rate - center) >= threshold * scale:
+                flagged[pos] = ((rate - center) / scale, center)
+        if len(recent) == window:
+            del ordered[bisect.bisect_left(ordered, recent[0])]
+        recent.append(rate)
+        bisect.insort(ordered, rate)
+    return flagged
+
+
+def detect_anomalies(panel: MetricPanel, members: list[dict], z_threshold: float = Z_THRESHOLD,
+                     robust_threshold: float = ROBUST_Z_THRESHOLD, window: int = WINDOW,
+                     min_history: int = MIN_HISTORY) -> list[dict]:
+    """Flagged values across the whole panel, ranked by their strongest score."""
+    regions = [{i: region for region, positions in year_members.items() for i in positions}
+               for year_members in members]
+    found = {}  # (year_pos, country_pos, metric) -> record
+
+    def record(year_pos, i, metric):
+        key = (year_pos, i, metric)
+        if key not in found:
+            found[key] = {
+                'country': panel.countries[i],
+                'region': regions[year_pos].get(i),
+                'year': panel.years[year_pos],
+                'metric': metric,
+                'value': panel.value(metric, year_pos, i),
+                'score': 0.0,
+                'kinds': [],
+            }
+        return found[key]
+
+    def flag(entry, kind, z, **fields):
+        entry['kinds'].append(kind)
+        entry[kind] = {'z': round(z, 2), **fields}
+        entry['score'] = max(entry['score'], round(abs(z), 2))
+
+    for metric in panel.metrics:
+        columns = panel.values[metric]
+        for year_pos, column in enumerate(columns):
+            if metric in LOG_SCALE_METRICS:
+                column = log_scale(column)
+            for i, (z, pct) in cross_sectional(column, None, z_threshold).items():
+                flag(record(year_pos, i, metric), 'global', z, percentile=round(pct, 1))
+            for region, positions in members[year_pos].items():
+                if len(positions) < MIN_REGION_SIZE:
+                    continue
+                for i, (z, pct) in cross_sectional(column, positions, z_threshold).items():
+                    flag(record(year_pos, i, metric), 'regional', z, percentile=round(pct, 1))
+
+        # One tuple per country across years
+        for i, series in enumerate(zip(*columns)):
+            flagged = temporal(series, panel.years, window, min_history, robust_threshold)
+            for year_pos, (robust_z, center) in flagged.items():
+                flag(record(year_pos, i, metric), 'temporal', robust_z, median_change=round(center, 4))
+
+    return sorted(found.values(), key=lambda entry: (-entry['score'], entry['year'], entry['country'],
+                                                     entry['metric']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank statistical anomalies across the merged panel')
+    parser.add_argument('--threshold', type=float, default=Z_THRESHOLD,
+                        help='Global and regional |z| that flags a value')
+    parser.add_argument('--robust-threshold', type=float, default=ROBUST_Z_THRESHOLD,
+                        help='Robust |z| against previous editions that flags a value')
+    parser.add_argument('--window', type=int, default=WINDOW, help='Previous changes in the temporal baseline')
+    parser.add_argument('--top', type=int, default=10, help='Anomalies to print')
+    args = parser.parse_args()
+
+    years = get_available_years()
+    print(f"Found {len(years)} years of data: {years}")
+    if not years:
+        print("Error: No data years found in data/ directory")
+        return 1
+
+    all_data = load_years(years)
+    panel = MetricPanel.from_country_data(all_data, years, numeric_fields(all_data))
+    members = region_members(all_data, panel)
+    del all_data
+
+    start = time.perf_counter()
+    anomalies = detect_anomalies(panel, members, args.threshold, args.robust_threshold, args.window)
+    seconds = time.perf_counter() - start
+    values = sum(len(column) - sum(1 for v in column if v != v)
+                 for columns in panel.values.values() for column in columns)
+    print(f"\nScored {values:,} values in {seconds:.3f}s, {len(anomalies):,} anomalies")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    result = {
+        'years': years,
+        'thresholds': {'z': args.threshold, 'robust_z': args.robust_threshold, 'window': args.window,
+                       'min_history': MIN_HISTORY, 'min_region_size': MIN_REGION_SIZE},
+        'log_scale': sorted(LOG_SCALE_METRICS & set(panel.metrics)),
+        'anomalies': anomalies,
+    }
+    # Compact: one entry per flagged value
+    with open(OUTPUT_DIR / ANOMALIES_FILE, 'w') as f:
+        json.dump(result, f, separators=(',', ':'))
+    print(f"Saved anomalies to {OUTPUT_DIR / ANOMALIES_FILE}")
+
+    for entry in anomalies[:args.top]:
+        print(f"  {entry['score']:>7.2f}  {entry['year']}  {entry['country']:<28} {entry['metric']:<22} "
+              f"{'+'.join(entry['kinds'])}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+End-to-End Pipeline Benchmark
+
+Generates a synthetic corpus (see synthetic_corpus.py), extracts every
+edition with extract_factbook.py and merges the years with
+merge_timeseries.py, reporting lines/sec, countries/sec, peak RSS and
+merge time. Each stage runs in a fresh process so peak RSS readings are
+independent.
+
+Results are compared with the stored baseline for the same corpus profile
+in benchmarks/baselines.json; anything slower or larger than the tolerance
+is flagged and the run exits non-zero. Baselines are machine-specific, so
+re-save them (--save-baseline) when moving to new hardware.
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --size-mb 1024 --years 2009 2010
+    python benchmarks/bench_pipeline.py --workdir /tmp/fbbench --save-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extract_factbook import extract_to_directory, peak_rss_mb
+from synthetic_corpus import generate_corpus
+
+BASELINES_FILE = Path(__file__).resolve().parent / 'baselines.json'
+
+# Metric -> True when higher is better
+METRICS = {
+    'extract_lines_per_sec': True,
+    'extract_countries_per_sec': True,
+    'extract_mb_per_sec': True,
+    'extract_peak_rss_mb': False,
+    'merge_seconds': False,
+    'merge_peak_rss_mb': False,
+    'stream_merge_seconds': False,
+    'stream_merge_peak_rss_mb': False,
+}
+
+
+def count_lines(filepath: Path) -> int:
+    lines = 0
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+    return lines
+
+
+def _extract(filepath: str, year: int, output_dir: str) -> dict:
+    """Worker: extract one edition from scratch."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        countries = extract_to_directory(filepath, year, Path(output_dir) / str(year), force=True,
+                                         verbose=False)
+    return {'seconds': time.perf_counter() - start, 'countries': len(countries), 'peak_rss_mb': peak_rss_mb()}
+
+
+def _merge(workdir: str, args: list[str]) -> dict:
+    """Worker: run merge_timeseries.py in workdir with its output silenced."""
+    import merge_timeseries
+    os.chdir(workdir)
+    sys.argv = ['merge_timeseries.py', *args]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        merge_timeseries.main()
+    return {'seconds': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb()}
+
+
+def in_fresh_process(func, *args) -> dict:
+    # A new single-worker pool per call, so every stage gets its own process
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(func, *args).result()
+
+
+def run_benchmark(workdir: Path, years: list[int], size_mb: float, countries: int, seed: int) -> dict:
+    corpus_dir = workdir / 'corpus'
+    params = {'years': years, 'size_mb': size_mb, 'countries': countries, 'seed': seed}
+    try:
+        with open(corpus_dir / 'corpus.json') as f:
+            reuse = json.load(f) == params
+    except (OSError, ValueError):
+        reuse = False
+    if reuse:
+        print(f"Reusing corpus in {corpus_dir}")
+    else:
+        print(f"Generating {len(years)} editions of ~{size_mb:g}MB in {corpus_dir}...")
+        generate_corpus(corpus_dir, years, size_mb, countries, seed)
+
+    total_lines = total_bytes = total_countries = 0
+    extract_seconds = extract_rss = 0.0
+    for year in years:
+        filepath = corpus_dir / f"factbook_{year}.html"
+        result = in_fresh_process(_extract, str(filepath), year, str(workdir / 'data'))
+        lines = count_lines(filepath)
+        size = filepath.stat().st_size
+        print(f"  extract {year}: {lines:,} lines, {result['countries']} countries in "
+              f"{result['seconds']:.2f}s, peak RSS {result['peak_rss_mb']:.1f}MB")
+        total_lines += lines
+        total_bytes += size
+        total_countries += result['countries']
+        extract_seconds += result['seconds']
+        extract_rss = max(extract_rss, result['peak_rss_mb'] or 0.0)
+
+    merge = in_fresh_process(_merge, str(workdir), [])
+    print(f"  merge: {merge['seconds']:.2f}s, peak RSS {merge['peak_rss_mb']:.1f}MB")
+    stream = in_fresh_process(_merge, str(workdir), ['--stream'])
+    print(f"  merge --stream: {stream['seconds']:.2f}s, peak RSS {stream['peak_rss_mb']:.1f}MB")
+
+    return {
+        'extract_lines_per_sec': total_lines / extract_seconds,
+        'extract_countries_per_sec': total_countries / extract_seconds,
+        'extract_mb_per_sec': total_bytes / (1 << 20) / extract_seconds,
+        'extract_peak_rss_mb': extract_rss,
+        'merge_seconds': merge['seconds'],
+        'merge_peak_rss_mb': merge['peak_rss_mb'] or 0.0,
+        'stream_merge_seconds': stream['seconds'],
+        'stream_merge_peak_rss_mb': stream['peak_rss_mb'] or 0.0,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Metrics that got worse than the baseline by more than tolerance."""
+    print(f"\n{'metric':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    regressions = []
+    for metric, higher_is_better in METRICS.items():
+        current = results[metric]
+        previous = baseline.get(metric)
+        if not previous:
+            print(f"{metric:<28} {'-':>12} {current:>12,.1f}")
+            continue
+        change = current / previous - 1
+        worse = -change if higher_is_better else change
+        flag = '  REGRESSION' if worse > tolerance else ''
+        print(f"{metric:<28} {previous:>12,.1f} {current:>12,.1f} {change:>+7.0%}{flag}")
+        if flag:
+            regressions.append(metric)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark extraction and merging end to end')
+    parser.add_argument('--size-mb', type=float, default=18, help='Approximate size of each edition')
+    parser.add_argument('--years', type=int, nargs='+', default=[2008, 2009, 2010],
+                        help='Edition years to generate')
+    parser.add_argument('--countries', type=int, default=260, help='Countries per edition')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed')
+    parser.add_argument('--workdir', help='Keep the corpus and outputs here (reused across runs)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed relative slowdown or growth before flagging a regression')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store these results as the baseline for this corpus profile')
+    args = parser.parse_args()
+
+    profile = f"{args.size_mb:g}mb-{len(args.years)}y-{args.countries}c-s{args.seed}"
+    with contextlib.ExitStack() as stack:
+        if args.workdir:
+            workdir = Path(args.workdir)
+            workdir.mkdir(parents=True, exist_ok=True)
+        else:
+            workdir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix='fbbench-')))
+        results = run_benchmark(workdir, args.years, args.size_mb, args.countries, args.seed)
+
+    try:
+        with open(BASELINES_FILE) as f:
+            baselines = json.load(f)
+    except (OSError, ValueError):
+        baselines = {}
+
+    regressions = compare(results, baselines.get(profile, {}), args.tolerance)
+    if args.save_baseline:
+        baselines[profile] = {metric: round(value, 2) for metric, value in results.items()}
+        with open(BASELINES_FILE, 'w') as f:
+            json.dump(baselines, f, indent=2)
+        print(f"\nSaved baseline '{profile}' to {BASELINES_FILE}")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against baseline '{profile}'")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
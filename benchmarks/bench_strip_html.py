@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+HTML Stripping Benchmark
+
+Compares per-line strip_html() against the streaming TagStripper on a
+Factbook HTML file and checks that both produce identical text lines.
+
+Usage:
+    python benchmarks/bench_strip_html.py pg35830-images.html
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extract_factbook import iter_text_lines, strip_html
+
+
+def per_line(filepath: str) -> list[str]:
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        return [strip_html(line) for line in f]
+
+
+def streaming(filepath: str) -> list[str]:
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        return list(iter_text_lines(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML tag stripping')
+    parser.add_argument('input_file', help='Path to Factbook HTML file')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_file):
+        print(f"Error: File not found: {args.input_file}")
+        return 1
+
+    size_mb = os.path.getsize(args.input_file) / (1 << 20)
+    results = {}
+    for name, func in [('strip_html per line', per_line), ('TagStripper stream', streaming)]:
+        start = time.perf_counter()
+        lines = func(args.input_file)
+        elapsed = time.perf_counter() - start
+        results[name] = lines
+        print(f"{name:<20} {len(lines) / elapsed:>12,.0f} lines/s {size_mb / elapsed:>8.1f} MB/s "
+              f"({elapsed:.2f}s)")
+
+    reference, streamed = results.values()
+    if reference != streamed:
+        mismatch = next(i for i, (a, b) in enumerate(zip(reference, streamed)) if a != b)
+        print(f"Error: outputs differ at line {mismatch + 1}")
+        return 1
+    print(f"Outputs identical ({len(reference):,} lines)")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Value Parser Benchmark
+
+Compares the precompiled VALUE_PARSERS registry against the if/elif
+parser_type chain the extractor used before, per parser type.
+
+Usage:
+    python benchmarks/bench_value_parsers.py
+    python benchmarks/bench_value_parsers.py --values 200000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extract_factbook import VALUE_PARSERS
+
+SAMPLE_VALUES = {
+    'population': ['29,121,286 (July 2010 est.)', '3,659,616 (July 2010 est.)', '1,435 (2010)',
+                   'note: includes nomadic population'],
+    'plain_int': ['1,234,000 bbl/day (2009 est.)', '0 cu m (2009 est.)', 'NA', 'male: 1,890,101'],
+    'percent': ['2.596% (2010 est.)', '-0.2% (2010 est.)', 'urban population: 24% of total population',
+                'NA%'],
+    'billions': ['$27.36 billion (2010 est.)', '$14.66 trillion (2010 est.)', '$870 million (2010 est.)',
+                 '$980 billion (2009 est.) $1.02 trillion (2008 est.)', 'NA'],
+    'years': ['total population: 44.65 years', 'total: 18.2 years', '62.21', 'NA'],
+    'first_number': ['38.11 births/1,000 population (2010 est.)', '17.65 deaths/1,000 population',
+                     'NA'],
+    'dollars': ['$900 (2010 est.)', '$47,400 (2010 est.)', 'NA'],
+}
+
+
+def legacy_parse(text: str, parser_type: str):
+    """The parser_type chain FactbookExtractor._parse_value used before the registry."""
+    text = text.strip()
+
+    if parser_type == 'population':
+        match = re.search(r'^([\d,]{5,})', text)
+        if match:
+            try:
+                return int(match.group(1).replace(',', ''))
+            except ValueError:
+                return None
+        return None
+
+    if parser_type == 'plain_int':
+        match = re.search(r'([\d,]+)', text)
+        if match:
+            try:
+                return int(match.group(1).replace(',', ''))
+            except ValueError:
+                return None
+
+    elif parser_type == 'percent':
+        match = re.search(r'(-?[\d,.]+)\s*%', text)
+        if match:
+            try:
+                return float(match.group(1).replace(',', ''))
+            except ValueError:
+                return None
+
+    elif parser_type == 'billions':
+        match = re.search(r'\$?([\d,.]+)\s*trillion', text, re.IGNORECASE)
+        if match:
+            return float(match.group(1).replace(',', '')) * 1000
+        match = re.search(r'\$?([\d,.]+)\s*billion', text, re.IGNORECASE)
+        if match:
+            return float(match.group(1).replace(',', ''))
+        match = re.search(r'\$?([\d,.]+)\s*million', text, re.IGNORECASE)
+        if match:
+            return float(match.group(1).replace(',', '')) / 1000
+        return None
+
+    elif parser_type == 'years':
+        match = re.search(r'([\d,.]+)\s*years', text)
+        if match:
+            return float(match.group(1).replace(',', ''))
+        match = re.search(r'total[:\s]+([\d.]+)', text.lower())
+        if match:
+            return float(match.group(1))
+        match = re.search(r'^([\d.]+)', text)
+        if match:
+            return float(match.group(1))
+        return None
+
+    elif parser_type == 'first_number':
+        match = re.search(r'([\d.]+)', text)
+        if match:
+            return float(match.group(1))
+        return None
+
+    elif parser_type == 'dollars':
+        match = re.search(r'\$?([\d,]+)', text)
+        if match:
+            return int(match.group(1).replace(',', ''))
+        return None
+
+    return None
+
+
+def run_legacy(parser_type: str, values: list[str]) -> list:
+    return [legacy_parse(text, parser_type) for text in values]
+
+
+def run_registry(parser_type: str, values: list[str]) -> list:
+    # Resolved once, as FactbookExtractor does per FIELD_CONFIG entry
+    parse = VALUE_PARSERS[parser_type]
+    return [parse(text.strip()) for text in values]
+
+
+def timed(func, *args) -> tuple[float, list]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Factbook value parsing')
+    parser.add_argument('--values', type=int, default=100000, help='Values per parser type')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'parser':<14} {'chain ns/value':>15} {'registry ns/value':>18} {'speedup':>8}")
+    for parser_type, samples in SAMPLE_VALUES.items():
+        values = [rng.choice(samples) for _ in range(args.values)]
+
+        legacy_time, legacy_values = timed(run_legacy, parser_type, values)
+        registry_time, registry_values = timed(run_registry, parser_type, values)
+        if legacy_values != registry_values:
+            print(f"Error: registry disagrees with the chain for {parser_type}")
+            return 1
+
+        print(f"{parser_type:<14} {legacy_time / args.values * 1e9:>15,.0f} "
+              f"{registry_time / args.values * 1e9:>18,.0f} {legacy_time / registry_time:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Synthetic Factbook Corpus
+
+Writes deterministic Factbook-shaped HTML editions for benchmarking:
+@Country (Region) markers, "Section ::" headers, field labels with values
+on the same or the next line, tag noise and prose filler up to a target
+size. The same seed, size and country count always give the same bytes,
+and each country's values drift from year to year so merges see changes.
+--layout field-divs writes the <div>-structured country pages of modern
+editions instead (see FieldDivExtractor in extract_factbook.py).
+
+Usage:
+    python benchmarks/synthetic_corpus.py /tmp/corpus
+    python benchmarks/synthetic_corpus.py /tmp/corpus --size-mb 1024 --years 2000 2005 2010
+    python benchmarks/synthetic_corpus.py /tmp/corpus --layout field-divs
+
+Writes factbook_<year>.html per year, an editions.json manifest usable with
+extract_factbook.py --manifest, and corpus.json recording the parameters.
+"""
+
+import argparse
+import html
+import json
+import random
+from pathlib import Path
+
+REGIONS = [
+    'Africa', 'Central America and Caribbean', 'Central Asia', 'East & Southeast Asia',
+    'Europe', 'Middle East', 'North America', 'Oceania', 'South America', 'South Asia',
+]
+SYLLABLES = [
+    'ba', 'dor', 'en', 'ga', 'hal', 'is', 'ka', 'lan', 'mor', 'na', 'ost', 'pra',
+    'qui', 'ran', 'sa', 'tor', 'ul', 'va', 'wes', 'zan', 'bel', 'cor', 'dia', 'fin',
+]
+PROSE_WORDS = [
+    'the', 'of', 'and', 'in', 'to', 'a', 'country', 'government', 'economy', 'since',
+    'independence', 'growth', 'reform', 'war', 'trade', 'region', 'population', 'rural',
+    'industry', 'agriculture', 'republic', 'treaty', 'mountains', 'coast', 'oil', 'exports',
+    'remains', 'despite', 'recent', 'decades', 'dependent', 'foreign', 'aid', 'investment',
+]
+
+# (label, section, base value range, yearly drift range, value formatter)
+FIELDS = [
+    ('Population:', 'People', (1e4, 3e8), (-0.01, 0.03), lambda v: f"{int(v):,} (July {{year}} est.)"),
+    ('Population growth rate:', 'People', (-1.0, 4.0), (-0.05, 0.05), lambda v: f"{v:.2f}% ({{year}} est.)"),
+    ('Median age:', 'People', (15.0, 45.0), (0.0, 0.02), lambda v: f"total: {v:.1f} years\nmale: {v - 1:.1f} years"),
+    ('Birth rate:', 'People', (8.0, 45.0), (-0.02, 0.01), lambda v: f"{v:.2f} births/1,000 population ({{year}} est.)"),
+    ('Death rate:', 'People', (3.0, 18.0), (-0.02, 0.01), lambda v: f"{v:.2f} deaths/1,000 population ({{year}} est.)"),
+    ('Life expectancy at birth:', 'People', (45.0, 85.0), (0.0, 0.01), lambda v: f"total population: {v:.2f} years"),
+    ('urban population:', 'People', (10.0, 95.0), (0.0, 0.01), lambda v: f"{v:.0f}% of total population (2008)"),
+    ('GDP (purchasing power parity):', 'Economy', (0.1, 15000.0), (-0.05, 0.12), None),
+    ('GDP - real growth rate:', 'Economy', (-5.0, 10.0), (-0.5, 0.5), lambda v: f"{v:.1f}% ({{year}} est.)"),
+    ('GDP - per capita (PPP):', 'Economy', (400.0, 80000.0), (-0.03, 0.08), lambda v: f"${int(v):,} ({{year}} est.)"),
+    ('Inflation rate (consumer prices):', 'Economy', (-1.0, 25.0), (-0.4, 0.4), lambda v: f"{v:.1f}% ({{year}} est.)"),
+    ('Unemployment rate:', 'Economy', (1.0, 35.0), (-0.2, 0.2), lambda v: f"{v:.1f}% ({{year}} est.)"),
+    ('Population below poverty line:', 'Economy', (2.0, 70.0), (-0.05, 0.05), lambda v: f"{v:.0f}% (2004 est.)"),
+    ('Exports:', 'Economy', (0.05, 1500.0), (-0.1, 0.15), None),
+    ('Imports:', 'Economy', (0.05, 1500.0), (-0.1, 0.15), None),
+    ('Debt - external:', 'Economy', (0.1, 3000.0), (-0.05, 0.1), None),
+    ('Current account balance:', 'Economy', (-300.0, 300.0), (-0.2, 0.2), lambda v: f"${v:.3f} billion ({{year}} est.)"),
+    ('Oil - production:', 'Economy', (0.0, 1e7), (-0.05, 0.05), lambda v: f"{int(v):,} bbl/day ({{year}} est.)"),
+    ('Oil - consumption:', 'Economy', (1e3, 1e7), (-0.02, 0.05), lambda v: f"{int(v):,} bbl/day ({{year}} est.)"),
+    ('Natural gas - production:', 'Economy', (0.0, 5e5), (-0.05, 0.05), lambda v: f"{int(v):,} million cu m ({{year}} est.)"),
+    ('Electricity - production:', 'Economy', (1e8, 4e12), (-0.02, 0.06), lambda v: f"{int(v):,} kWh ({{year}} est.)"),
+    ('Military expenditures:', 'Military', (0.5, 8.0), (-0.2, 0.3), lambda v: f"{v:.1f}% of GDP ({{year}} est.)"),
+    ('Manpower available for military service:', 'Military', (1e3, 3e8), (0.0, 0.03),
+     lambda v: f"males age 16-49: {int(v):,}\nfemales age 16-49: {int(v * 0.97):,} ({{year}} est.)"),
+]
+SECTIONS = ['People', 'Government', 'Economy', 'Military']
+LAYOUTS = ['marker-lines', 'field-divs']
+# Section titles and renamed field labels of modern editions
+SECTION_TITLES = {'People': 'People and Society', 'Military': 'Military and Security'}
+MODERN_LABELS = {
+    'GDP (purchasing power parity):': 'Real GDP (purchasing power parity):',
+    'GDP - real growth rate:': 'Real GDP growth rate:',
+    'GDP - per capita (PPP):': 'Real GDP per capita:',
+}
+
+
+def money(value: float) -> str:
+    """A billions amount in the unit the Factbook would print it in."""
+    if value >= 1000:
+        return f"${value / 1000:.3f} trillion ({{year}} est.)"
+    if value >= 1:
+        return f"${value:.2f} billion ({{year}} est.)"
+    return f"${value * 1000:.1f} million ({{year}} est.)"
+
+
+def country_names(count: int, seed: int) -> list[tuple[str, str]]:
+    """Unique (name, region) pairs, including multi-word and punctuated names."""
+    rng = random.Random(f"{seed}:names")
+    names = []
+    seen = set()
+    while len(names) < count:
+        word = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        roll = rng.random()
+        if roll < 0.1:
+            name = f"Saint {word}"
+        elif roll < 0.15:
+            name = f"{word}-{rng.choice(SYLLABLES).capitalize()}"
+        elif roll < 0.2:
+            name = f"Cote d'{word}"
+        elif roll < 0.25:
+            name = f"{word}, Republic of the"
+        else:
+            name = word
+        key = name.lower()
+        if key not in seen:
+            seen.add(key)
+            names.append((name, rng.choice(REGIONS)))
+    return names
+
+
+def prose_pool(seed: int, size: int = 512) -> list[str]:
+    rng = random.Random(f"{seed}:prose")
+    lines = []
+    for _ in range(size):
+        words = [rng.choice(PROSE_WORDS) for _ in range(rng.randint(12, 30))]
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words)), f"{rng.randint(1, 99999):,}")
+        text = ' '.join(words).capitalize() + '.'
+        if rng.random() < 0.2:
+            text = text.replace(' of ', ' of <i>the</i> ', 1) + ' &amp; more'
+        lines.append(f"<p>{text}</p>\n")
+    return lines
+
+
+def field_value(name: str, field: tuple, year: int, base_year: int, seed: int) -> str:
+    label, _, (low, high), (drift_low, drift_high), formatter = field
+    rng = random.Random(f"{seed}:{name}:{label}")
+    base = rng.uniform(low, high)
+    drift = rng.uniform(drift_low, drift_high)
+    noise = random.Random(f"{seed}:{name}:{label}:{year}").uniform(-0.02, 0.02)
+    value = base * (1 + drift) ** (year - base_year) * (1 + noise)
+    text = (formatter or money)(value)
+    return text.replace('{year}', str(year))
+
+
+def field_lines(label: str, value: str, rng: random.Random) -> str:
+    """One field in one of the layouts found in real editions."""
+    first, _, rest = value.partition('\n')
+    tail = ''.join(f"<p>{line}</p>\n" for line in rest.split('\n') if line)
+    roll = rng.random()
+    if roll < 0.6:
+        block = f'<p class="label"><b>{label}</b></p>\n<p>{first}</p>\n'
+    elif roll < 0.8:
+        block = f"<p>{label} {first}</p>\n"
+    else:
+        block = f"<p><b>{label}</b>\n<br/>{first}</p>\n"
+    return block + tail + '<p>note: country comparison to the world: ' + str(rng.randint(1, 240)) + '</p>\n'
+
+
+def country_block(name: str, region: str, year: int, base_year: int, seed: int,
+                  rng: random.Random, prose: list[str], filler_bytes: int) -> str:
+    upper = name.upper()
+    parts = [
+        f'<p><a name="{html.escape(name)}"></a>@{name} ({html.escape(region)})</p>\n',
+        f"<p>Introduction :: {upper}</p>\n<p>Background:</p>\n",
+    ]
+    written = 0
+    while written < filler_bytes:
+        line = rng.choice(prose)
+        parts.append(line)
+        written += len(line)
+    for section in SECTIONS:
+        parts.append(f"<p>{section} :: {upper}</p>\n")
+        if section == 'Government':
+            leader = ''.join(rng.choice(SYLLABLES) for _ in range(3)).upper()
+            parts.append(f"<p>chief of state: President Ana {leader} (since {year - 2})</p>\n")
+            parts.append(f"<p>head of government: Prime Minister Luis {leader[::-1]} (since {year - 1})</p>\n")
+            parts.append(f"<p>elections: last held on 14 March {year - 1} (next to be held in {year + 4})</p>\n")
+            continue
+        for field in FIELDS:
+            # About one value in twenty is missing from any given edition
+            if field[1] == section and rng.random() >= 0.05:
+                parts.append(field_lines(field[0], field_value(name, field, year, base_year, seed), rng))
+    parts.append(f"<p>Transportation :: {upper}</p>\n<p>Airports:</p>\n<p>{rng.randint(1, 500)} ({year})</p>\n")
+    return ''.join(parts)
+
+
+def data_div(line: str) -> str:
+    """One category_data div, splitting 'name: value' into subfield spans."""
+    name, sep, rest = line.partition(': ')
+    if sep and len(name) < 40:
+        line = f'<span class="subfield-name">{name}:</span> <span class="subfield-number">{rest}</span>'
+    return f'<div class="category_data subfield numeric">{line}</div>\n'
+
+
+def field_divs(label: str, value: str, rng: random.Random) -> str:
+    """One field as a modern edition's field div followed by its data divs."""
+    lines = value.split('\n')
+    label = MODERN_LABELS.get(label, label)
+    if label[0].islower():
+        # Lowercase labels are subfields of a broader field
+        label, lines = 'Urbanization:', [f"{label} {lines[0]}"] + lines[1:]
+    title = label[:-1]
+    slug = '-'.join(title.lower().replace('(', '').replace(')', '').replace(' - ', ' ').split())
+    return (f'<div id="field-{slug}"><a href="../fields/{rng.randint(100, 400)}.html">{title}</a>:</div>\n'
+            + ''.join(data_div(line) for line in lines)
+            + f'<div class="category_data note">country comparison to the world: {rng.randint(1, 240)}</div>\n')
+
+
+def country_page(name: str, region: str, year: int, base_year: int, seed: int,
+                 rng: random.Random, prose: list[str], filler_bytes: int) -> str:
+    """A country in the <div>-structured layout of modern editions."""
+    upper = html.escape(name.upper())
+    parts = [
+        f'<div class="geos_title"><span class="region">{html.escape(region)}</span> <strong>:: </strong>'
+        f'<span class="countryName">{html.escape(name)}</span></div>\n',
+        f'<h2 sectiontitle="Introduction">Introduction :: {upper}</h2>\n',
+        '<div id="field-background">Background:</div>\n<div class="category_data subfield text">\n',
+    ]
+    written = 0
+    while written < filler_bytes:
+        line = rng.choice(prose)
+        parts.append(line)
+        written += len(line)
+    parts.append('</div>\n')
+    for section in SECTIONS:
+        title = SECTION_TITLES.get(section, section)
+        parts.append(f'<h2 sectiontitle="{title}">{title} :: {upper}</h2>\n')
+        if section == 'Government':
+            leader = ''.join(rng.choice(SYLLABLES) for _ in range(3)).upper()
+            parts.append('<div id="field-executive-branch">Executive branch:</div>\n')
+            parts.append(data_div(f"chief of state: President Ana {leader} (since {year - 2})"))
+            parts.append(data_div(f"head of government: Prime Minister Luis {leader[::-1]} (since {year - 1})"))
+            parts.append(data_div(f"elections/appointments: last held on 14 March {year - 1} "
+                                  f"(next to be held in {year + 4})"))
+            continue
+        for field in FIELDS:
+            # About one value in twenty is missing from any given edition
+            if field[1] == section and rng.random() >= 0.05:
+                parts.append(field_divs(field[0], field_value(name, field, year, base_year, seed), rng))
+    parts.append(f'<h2 sectiontitle="Transportation">Transportation :: {upper}</h2>\n'
+                 f'<div id="field-airports">Airports:</div>\n'
+                 f'<div class="category_data subfield numeric">{rng.randint(1, 500)} ({year})</div>\n')
+    return ''.join(parts)
+
+
+def write_edition(path: Path, year: int, size_mb: float, countries: list[tuple[str, str]],
+                  base_year: int, seed: int, layout: str = 'marker-lines') -> int:
+    """Write one edition of roughly size_mb megabytes; returns its size in bytes."""
+    rng = random.Random(f"{seed}:{year}")
+    prose = prose_pool(seed)
+    target = int(size_mb * (1 << 20))
+    # Structured fields take about 4KB per country; prose fills the rest
+    filler = max(0, target // max(len(countries), 1) - 4096)
+    write_country = country_page if layout == 'field-divs' else country_block
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"<!DOCTYPE html>\n<html><head><title>The World Factbook {year}</title>\n"
+                "<style type=\"text/css\">\np { margin: 0 }\n</style></head>\n<body>\n")
+        for name, region in countries:
+            f.write(write_country(name, region, year, base_year, seed, rng, prose, filler))
+        f.write('</body></html>\n')
+    return path.stat().st_size
+
+
+def generate_corpus(output_dir: Path, years: list[int], size_mb: float = 18,
+                    countries: int = 260, seed: int = 0, layout: str = 'marker-lines') -> dict:
+    """Write every edition plus editions.json and corpus.json; returns the manifest."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    names = country_names(countries, seed)
+    manifest = {}
+    for year in years:
+        filename = f"factbook_{year}.html"
+        write_edition(output_dir / filename, year, size_mb, names, min(years), seed, layout)
+        manifest[str(year)] = filename
+    with open(output_dir / 'editions.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    with open(output_dir / 'corpus.json', 'w') as f:
+        params = {'years': years, 'size_mb': size_mb, 'countries': countries, 'seed': seed}
+        if layout != 'marker-lines':
+            params['layout'] = layout
+        json.dump(params, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic Factbook corpus')
+    parser.add_argument('output_dir', help='Directory for the generated editions')
+    parser.add_argument('--size-mb', type=float, default=18, help='Approximate size of each edition')
+    parser.add_argument('--years', type=int, nargs='+', default=[2008, 2009, 2010],
+                        help='Edition years to generate')
+    parser.add_argument('--countries', type=int, default=260, help='Countries per edition')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for names, values and layout')
+    parser.add_argument('--layout', choices=LAYOUTS, default='marker-lines', help='Edition layout to write')
+    args = parser.parse_args()
+
+    manifest = generate_corpus(Path(args.output_dir), args.years, args.size_mb, args.countries, args.seed,
+                               args.layout)
+    print(f"Wrote {len(manifest)} editions to {args.output_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
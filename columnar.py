@@ -0,0 +1,161 @@
+"""
+Columnar Year Bundles
+
+Packs one year of extracted countries into a single binary file so that a
+full-year load is one read instead of one JSON parse per country.
+
+Layout of data/<year>/_columns.bin:
+    MAGIC
+    uint32 little-endian header length
+    JSON header: year, sections, country/region names, string columns and
+                 the list of numeric columns
+    one float64 little-endian column per numeric metric, indexed by
+    country position (NaN where the country has no value)
+"""
+
+import json
+import math
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Optional
+
+from records import REGISTRY, CountryRecord
+
+COLUMNS_FILE = '_columns.bin'
+MAGIC = b'FBCOLS1\n'
+HEADER_LENGTH = struct.Struct('<I')
+RECORD_KEYS = ('country', 'region', 'year')
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def encode_columns(countries: list, year: Optional[int] = None) -> bytes:
+    """Serialize a year's country records into a columnar bundle."""
+    sections = []
+    fields = {}  # (section, field) -> values in country order
+    for index, country in enumerate(countries):
+        for section, values in country.items():
+            if section in RECORD_KEYS:
+                continue
+            if section not in sections:
+                sections.append(section)
+            for field, value in values.items():
+                fields.setdefault((section, field), [None] * len(countries))[index] = value
+
+    numeric = []
+    strings = {}
+    for (section, field), values in fields.items():
+        present = [value for value in values if value is not None]
+        key = f"{section}/{field}"
+        if all(_is_number(value) for value in present):
+            kind = 'int' if all(isinstance(value, int) for value in present) else 'float'
+            numeric.append({'key': key, 'kind': kind, 'values': values})
+        else:
+            strings[key] = values
+
+    header = {
+        'year': year if year is not None else (countries[0]['year'] if countries else None),
+        'sections': sections,
+        'countries': [country['country'] for country in countries],
+        'regions': [country['region'] for country in countries],
+        'strings': strings,
+        'numeric': [{'key': column['key'], 'kind': column['kind']} for column in numeric],
+    }
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+
+    parts = [MAGIC, HEADER_LENGTH.pack(len(header_bytes)), header_bytes]
+    for column in numeric:
+        values = array('d', (math.nan if value is None else value for value in column['values']))
+        if sys.byteorder == 'big':
+            values.byteswap()
+        parts.append(values.tobytes())
+    return b''.join(parts)
+
+
+def decode_columns(data: bytes) -> dict:
+    """Parse a bundle into its header plus a {key: array('d')} column map."""
+    if not data.startswith(MAGIC):
+        raise ValueError('not a columnar bundle')
+    offset = len(MAGIC)
+    (header_length,) = HEADER_LENGTH.unpack_from(data, offset)
+    offset += HEADER_LENGTH.size
+    header = json.loads(data[offset:offset + header_length])
+    offset += header_length
+
+    count = len(header['countries'])
+    width = count * 8
+    columns = {}
+    for column in header['numeric']:
+        values = array('d')
+        values.frombytes(data[offset:offset + width])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        columns[column['key']] = values
+        offset += width
+    header['columns'] = columns
+    return header
+
+
+def read_table(path: Path) -> dict:
+    """Read a bundle file; see decode_columns for the returned shape."""
+    with open(path, 'rb') as f:
+        return decode_columns(f.read())
+
+
+def table_to_countries(table: dict) -> list:
+    """Rebuild the per-country JSON records held in a decoded bundle."""
+    countries = [
+        {'country': name, 'region': region, 'year': table['year'],
+         **{section: {} for section in table['sections']}}
+        for name, region in zip(table['countries'], table['regions'])
+    ]
+    for column in table['numeric']:
+        section, field = column['key'].split('/', 1)
+        cast = int if column['kind'] == 'int' else float
+        for country, value in zip(countries, table['columns'][column['key']]):
+            if not math.isnan(value):
+                country[section][field] = cast(value)
+    for key, values in table['strings'].items():
+        section, field = key.split('/', 1)
+        for country, value in zip(countries, values):
+            if value is not None:
+                country[section][field] = value
+    return countries
+
+
+def read_countries(path: Path) -> list:
+    """Load every country record of a year from its bundle."""
+    return table_to_countries(read_table(path))
+
+
+def table_to_records(table: dict) -> list[CountryRecord]:
+    """The countries of a decoded bundle as CountryRecords."""
+    items = [[] for _ in table['countries']]  # (slot, value) per country, in column order
+    for column in table['numeric']:
+        slot = REGISTRY.slot(*column['key'].split('/', 1))
+        cast = int if column['kind'] == 'int' else float
+        for country_items, value in zip(items, table['columns'][column['key']]):
+            if value == value:
+                country_items.append((slot, cast(value)))
+    for key, values in table['strings'].items():
+        slot = REGISTRY.slot(*key.split('/', 1))
+        for country_items, value in zip(items, values):
+            if value is not None:
+                country_items.append((slot, value))
+
+    sections = tuple(table['sections'])
+    records = []
+    for name, region, country_items in zip(table['countries'], table['regions'], items):
+        record = CountryRecord(name, region, table['year'], sections)
+        record.fill(country_items)
+        records.append(record)
+    return records
+
+
+def read_records(path: Path) -> list[CountryRecord]:
+    """Load every country of a year from its bundle as CountryRecords."""
+    return table_to_records(read_table(path))
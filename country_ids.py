@@ -0,0 +1,171 @@
+"""
+Country Identity Index
+
+Maps every spelling of a country seen across Factbook editions to one
+stable ID, so renamed or re-spelled entities (Burma/Myanmar,
+Swaziland/Eswatini, "Korea, South"/South Korea) join into a single series.
+
+IDs are the slug a country's first-seen name is saved under
+(country_filename() without .json), or the ID given in ALIASES. Once
+assigned they are kept in data/_countries.json together with every
+spelling seen and the latest display name, so they never change when an
+edition renames a country. Lookups normalise case, punctuation and
+underscores, so names, slugs and merge keys all resolve with one dict
+lookup.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+INDEX_FILE = '_countries.json'
+INDEX_VERSION = 1
+
+# Stable ID -> other names the same entity has appeared under. IDs follow the
+# names of the shipped 2010 edition so existing slugs and merge keys keep working.
+ALIASES = {
+    'burma': ['Myanmar'],
+    'macedonia': ['North Macedonia', 'The former Yugoslav Republic of Macedonia'],
+    'swaziland': ['Eswatini'],
+    'czech_republic': ['Czechia'],
+    'cape_verde': ['Cabo Verde'],
+    'timor-leste': ['East Timor'],
+    'cote_divoire': ['Ivory Coast'],
+    'turkey': ['Turkiye', 'Türkiye'],
+    'holy_see': ['Holy See (Vatican City)', 'Vatican City'],
+    'congo_democratic_republic_of_the': ['Zaire', 'Democratic Republic of the Congo', 'DR Congo'],
+    'congo_republic_of_the': ['Republic of the Congo'],
+    'korea_south': ['South Korea'],
+    'korea_north': ['North Korea'],
+    'bahamas_the': ['The Bahamas', 'Bahamas'],
+    'gambia_the': ['The Gambia', 'Gambia'],
+    'micronesia_federated_states_of': ['Federated States of Micronesia', 'Micronesia'],
+    'samoa': ['Western Samoa'],
+    'saint_helena_ascension_and_tristan_da_cunha': ['Saint Helena'],
+}
+
+PUNCTUATION = re.compile(r'[^\w\s-]')
+WHITESPACE = re.compile(r'\s+')
+SEPARATORS = re.compile(r'[\s_-]+')
+
+
+def aliases_fingerprint() -> str:
+    """Hash of ALIASES, so merges keyed by IDs notice when the table changes."""
+    return hashlib.sha256(json.dumps(ALIASES, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def slugify(name: str) -> str:
+    """The slug a country's JSON file is named after."""
+    return WHITESPACE.sub('_', PUNCTUATION.sub('', name.lower()))
+
+
+def normalize(name: str) -> str:
+    """Lookup form of a name, slug or merge key: 'Korea, South' == 'korea,_south' == 'korea_south'."""
+    return SEPARATORS.sub(' ', PUNCTUATION.sub('', name.lower())).strip()
+
+
+class CountryIndex:
+    """Stable country IDs with O(1) lookup from any known spelling."""
+
+    def __init__(self):
+        self.countries = {}  # id -> {'name': latest display name, 'aliases': [spellings]}
+        self._lookup = {}    # normalized spelling -> id
+        for country_id, aliases in ALIASES.items():
+            self._register(country_id, country_id)
+            for alias in aliases:
+                self._register(country_id, alias)
+
+    def _register(self, country_id: str, spelling: str):
+        self._lookup.setdefault(normalize(spelling), country_id)
+
+    def lookup(self, name: str) -> Optional[str]:
+        """ID of a known spelling, or None."""
+        return self._lookup.get(normalize(name))
+
+    def resolve(self, name: str) -> str:
+        """ID of any spelling; unknown names get the ID add() would assign."""
+        return self._lookup.get(normalize(name)) or slugify(name)
+
+    def add(self, name: str) -> str:
+        """Record a spelling as the latest name of its country and return the ID."""
+        country_id = self.resolve(name)
+        entry = self.countries.setdefault(country_id, {'name': name, 'aliases': []})
+        entry['name'] = name
+        if name not in entry['aliases']:
+            entry['aliases'].append(name)
+        self._register(country_id, country_id)
+        self._register(country_id, name)
+        return country_id
+
+    def name(self, country_id: str) -> Optional[str]:
+        entry = self.countries.get(country_id)
+        return entry['name'] if entry else None
+
+    def to_json(self) -> dict:
+        return {
+            'version': INDEX_VERSION,
+            'countries': {country_id: self.countries[country_id] for country_id in sorted(self.countries)},
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'CountryIndex':
+        index = cls()
+        if data.get('version') != INDEX_VERSION:
+            return index
+        countries = data.get('countries', {})
+        # IDs recorded earlier stay put, unless ALIASES now folds them into another country
+        for country_id, entry in countries.items():
+            target = index.lookup(country_id) or country_id
+            for spelling in [country_id] + entry['aliases']:
+                index._register(target, spelling)
+        for entry in countries.values():
+            for spelling in entry['aliases'] + [entry['name']]:
+                index.add(spelling)
+        return index
+
+
+def edition_names(data_dir: Path) -> list[str]:
+    """Country names of every edition's _index.json, oldest edition first."""
+    names = []
+    if not data_dir.is_dir():
+        return names
+    years = sorted(int(item.name) for item in data_dir.iterdir() if item.is_dir() and item.name.isdigit())
+    for year in years:
+        try:
+            with open(data_dir / str(year) / '_index.json') as f:
+                names.extend(entry['name'] for entry in json.load(f)['countries'])
+        except (OSError, ValueError, KeyError):
+            continue
+    return names
+
+
+def load_index(data_dir: Path) -> CountryIndex:
+    """The persisted index of data_dir, brought up to date with its editions' _index.json files."""
+    try:
+        with open(data_dir / INDEX_FILE) as f:
+            index = CountryIndex.from_json(json.load(f))
+    except (OSError, ValueError):
+        index = CountryIndex()
+    for name in edition_names(data_dir):
+        index.add(name)
+    return index
+
+
+def save_index(index: CountryIndex, data_dir: Path) -> bool:
+    """Write data_dir/_countries.json unless unchanged; True if written."""
+    content = json.dumps(index.to_json(), indent=2)
+    filepath = data_dir / INDEX_FILE
+    try:
+        if filepath.read_text() == content:
+            return False
+    except OSError:
+        pass
+    data_dir.mkdir(parents=True, exist_ok=True)
+    # Swapped in whole, so readers never see a partly written index
+    tmp_path = filepath.with_name(f"{filepath.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(content)
+    os.replace(tmp_path, filepath)
+    return True
@@ -7,29 +7,100 @@ Streams line-by-line to handle large files efficiently (~18MB).
 
 Usage:
     python extract_factbook.py pg35830-images.html --year 2010
+    python extract_factbook.py --edition factbook_2000.html 2000 --edition factbook_2015.html 2015
+    python extract_factbook.py --manifest editions.json --workers 8
+    python extract_factbook.py pg35830-images.html --year 2010 --ndjson - | jq .country
+    python extract_factbook.py pg35830-images.html --year 2010 --stats
 """
 
 import argparse
+import hashlib
+import html
 import json
+import mmap
 import os
 import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from html.parser import HTMLParser
-from typing import Optional
+from typing import Iterable, Iterator, Optional, TextIO, Union
+
+from columnar import COLUMNS_FILE, encode_columns
+from country_ids import INDEX_FILE, load_index, save_index, slugify
+from records import REGISTRY, CountryRecord
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Bump when parsing logic changes so cached extractions are redone
+# 2: layout detection; _index.json reports the layout and parser
+EXTRACTOR_VERSION = 2
+CACHE_FILE = '_cache.json'
+STATS_FILE = '_stats.json'
 
 # Regex patterns for parsing
 COUNTRY_START = re.compile(r'@([A-Za-z\s\-\'\.,]+)\s*\(([^)]+)\)')
 SECTION_HEADER = re.compile(r'(Introduction|Geography|People|Government|Economy|Communications|Transportation|Military)\s*::')
 
 # Numeric value patterns  
-BILLION_PATTERN = re.compile(r'\$?([\d,.]+)\s*billion', re.IGNORECASE)
-MILLION_PATTERN = re.compile(r'\$?([\d,.]+)\s*million', re.IGNORECASE)
-TRILLION_PATTERN = re.compile(r'\$?([\d,.]+)\s*trillion', re.IGNORECASE)
+UNIT_AMOUNT = re.compile(r'\$?([\d,.]+)\s*(trillion|billion|million)', re.IGNORECASE)
+POPULATION_NUMBER = re.compile(r'^([\d,]{5,})')
+FIRST_INT = re.compile(r'([\d,]+)')
+FIRST_DECIMAL = re.compile(r'([\d.]+)')
+LEADING_DECIMAL = re.compile(r'^([\d.]+)')
+TOTAL_NUMBER = re.compile(r'total[:\s]+([\d.]+)')
+DOLLAR_AMOUNT = re.compile(r'\$?([\d,]+)')
 PERCENT_PATTERN = re.compile(r'(-?[\d,.]+)\s*%')
 PLAIN_NUMBER = re.compile(r'^([\d,]+)\s')
 YEAR_NUMBER = re.compile(r'([\d,.]+)\s*years')
 DATE_PATTERN = re.compile(r'(\d{1,2}\s+\w+\s+\d{4})')
 
+# Modern editions: a region/countryName header per country page, <h2 sectiontitle="...">
+# sections, and fields as a <div id="field-..."> label plus <div class="category_data ..."> values
+COUNTRY_HEADER = re.compile(
+    r'<span class="region">([^<]*)</span>(?:[\s:]|<[^>]*>)*?<span class="countryName\s*">([^<]*)</span>')
+COUNTRY_HEADER_BYTES = re.compile(COUNTRY_HEADER.pattern.encode('ascii'))
+FIELD_BLOCK = re.compile(
+    r'<h2\b[^>]*\bsectiontitle="(?P<section>[^"]*)"'
+    r'|<div\b[^>]*\bid="field-[^"]*"[^>]*>(?P<label>.*?)</div>'
+    r'|<div\b[^>]*\bclass="category_data[^"]*"[^>]*>(?P<data>.*?)</div>',
+    re.DOTALL
+)
+BREAK_TAG = re.compile(r'<(?:br|/?p|/?li)\b[^>]*>', re.IGNORECASE)
+ANY_TAG = re.compile(r'<[^>]*>')
+
+# Bytes read from the start of a file to fingerprint its layout
+PRESCAN_BYTES = 64 << 10
+# (layout, fingerprint) pairs, most specific first: modern pages also hold '::'
+LAYOUT_FINGERPRINTS = [
+    ('field-divs', re.compile(rb'<div\b[^>]*\bid="field-|class="category_data|<span class="countryName')),
+    ('marker-lines', re.compile(rb"@[A-Za-z][A-Za-z\s\-'.,]*\([^)\n]+\)|(?:Introduction|People|Economy)\s*::")),
+]
+
+# Well-formed start/end tags that HTMLParser consumes without emitting any data
+SIMPLE_TAG = re.compile(
+    r'</?[a-zA-Z][a-zA-Z0-9]*'
+    r'(?:\s+[a-zA-Z_:][-a-zA-Z0-9_:.]*(?:\s*=\s*(?:"[^"<>]*"|\'[^\'<>]*\'|[^\s"\'=<>`]+))?)*'
+    r'\s*/?>'
+)
+CDATA_TAG = re.compile(r'<(?:script|style)', re.IGNORECASE)
+# HTMLParser holds back trailing text that may end in a truncated charref
+PARTIAL_CHARREF = re.compile(r'&[^\s;]*\Z')
+
+CHUNK_SIZE = 1 << 20
+SCAN_BLOCK = 1 << 20
+REPORT_BYTES = 10 << 20
+
+# Universal-newline line endings, as applied by text-mode reads
+NEWLINE = re.compile(r'\r\n|\r|\n')
+# Invalid UTF-8 is dropped on decode and may join the bytes around it
+NON_ASCII = re.compile(rb'[\x80-\xff]')
+
 
 class TextExtractor(HTMLParser):
     """Strip HTML tags and extract text content."""
@@ -41,6 +112,10 @@ class TextExtractor(HTMLParser):
     def handle_data(self, data):
         self.text_parts.append(data)
         
+    def reset(self):
+        super().reset()
+        self.text_parts = []
+        
     def get_text(self):
         return ' '.join(self.text_parts).strip()
 
@@ -55,8 +130,276 @@ def strip_html(html: str) -> str:
         return re.sub(r'<[^>]+>', ' ', html).strip()
 
 
+class TagStripper:
+    """Incrementally strip HTML tags from a stream of chunks.
+
+    Yields one text line per input line, identical to calling strip_html()
+    on each line. Lines made only of plain text and simple tags are split
+    with a regex; anything else goes through a single reused TextExtractor.
+    """
+
+    def __init__(self):
+        self._extractor = TextExtractor()
+        self._pending = ''
+
+    def feed(self, chunk: str) -> Iterator[str]:
+        """Yield stripped text for every line completed by this chunk."""
+        lines = (self._pending + chunk).split('\n')
+        self._pending = lines.pop()
+        for line in lines:
+            yield self.strip_line(line + '\n')
+
+    def close(self) -> Iterator[str]:
+        """Yield the final line if the stream did not end with a newline."""
+        if self._pending:
+            yield self.strip_line(self._pending)
+        self._pending = ''
+
+    def strip_line(self, line: str) -> str:
+        """Strip tags from one line, exactly like strip_html()."""
+        if '<' in line:
+            if CDATA_TAG.search(line):
+                return self._strip_slow(line)
+            segments = SIMPLE_TAG.split(line)
+            if any('<' in segment for segment in segments):
+                return self._strip_slow(line)
+        else:
+            segments = [line]
+
+        if PARTIAL_CHARREF.search(segments[-1][-34:]):
+            return self._strip_slow(line)
+        parts = [html.unescape(segment) if '&' in segment else segment
+                 for segment in segments if segment]
+        return ' '.join(parts).strip()
+
+    def _strip_slow(self, line: str) -> str:
+        extractor = self._extractor
+        extractor.reset()
+        try:
+            extractor.feed(line)
+            return extractor.get_text()
+        except:
+            return re.sub(r'<[^>]+>', ' ', line).strip()
+
+
+def decode_lines(data: bytes) -> list[str]:
+    """Decode a newline-terminated byte span into text-mode lines."""
+    text = data.decode('utf-8', errors='ignore')
+    if '\r' not in text:
+        return [text]
+    lines = [line + '\n' for line in NEWLINE.split(text)]
+    last = lines.pop()
+    if last != '\n':
+        lines.append(last[:-1])
+    return lines
+
+
+def anchor_tokens(labels: Iterable[str]) -> list[bytes]:
+    """Lowercase byte strings, one of which every state-changing line holds.
+    
+    Tag-stripped text is built from the raw line's characters, spaces joining
+    text around tags, and characters produced by '&' entities. A tag inside a
+    word splits that word in the text as well, so a line can only yield a
+    country marker, section header, field label or election date if its raw
+    bytes contain '@', '::', the last word of a label, "held" or an '&'.
+    Lines with non-ASCII bytes are checked separately (see NON_ASCII).
+    """
+    words = {label.split()[-1].lower() for label in labels}
+    words.update({'state:', 'government:', 'held'})
+    return [b'@', b'::', b'&'] + sorted(word.encode('utf-8') for word in words)
+
+
+def iter_text_lines(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Read a text file in large chunks and yield its tag-stripped lines."""
+    stripper = TagStripper()
+    for chunk in iter(lambda: f.read(chunk_size), ''):
+        yield from stripper.feed(chunk)
+    yield from stripper.close()
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation that factors shared prefixes into a trie."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def render(node: dict) -> str:
+        # Longest continuation first so the match at a position is the longest label
+        branches = []
+        for char, child in sorted(node.items(), reverse=True):
+            if char == '':
+                continue
+            run = char
+            while len(child) == 1 and '' not in child:
+                (char, child), = child.items()
+                run += char
+            branches.append(re.escape(run) + render(child) if child else re.escape(run))
+        if '' in node:
+            branches.append('')
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    return render(trie)
+
+
+class LabelMatcher:
+    """Find the first configured label contained in a line with one regex pass.
+
+    Matches are resolved by label priority (the order of the labels given),
+    exactly like a linear ``label.lower() in text.lower()`` scan would.
+    """
+
+    def __init__(self, labels: Iterable[str]):
+        self.priority = {}
+        for index, label in enumerate(labels):
+            self.priority.setdefault(label.lower(), index)
+
+        # A match at a position is the longest label there; any shorter label
+        # starting at the same position is a prefix of it and may rank higher.
+        self._best = {
+            label: min(rank for other, rank in self.priority.items() if label.startswith(other))
+            for label in self.priority
+        }
+        alternation = _trie_pattern(self.priority)
+        self._search = re.compile(alternation).search
+        self._scan = re.compile(f'(?=({alternation}))').finditer
+
+    def match(self, text_lower: str) -> Optional[int]:
+        """Return the priority index of the best label in a lowercased line."""
+        first = self._search(text_lower)
+        if not first:
+            return None
+        best = None
+        for match in self._scan(text_lower, first.start()):
+            rank = self._best[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return best
+
+
+# parser_type name -> function(stripped text) -> value or None
+VALUE_PARSERS = {}
+
+
+def register_parser(name: str):
+    """Decorator adding a value parser for FIELD_CONFIG parser_type `name`."""
+    def register(func):
+        VALUE_PARSERS[name] = func
+        return func
+    return register
+
+
+def resolve_parser(name: str):
+    """The registered parser for a parser_type, failing early on unknown names."""
+    try:
+        return VALUE_PARSERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown parser type {name!r}; known: {sorted(VALUE_PARSERS)}") from None
+
+
+@register_parser('population')
+def parse_population(text: str) -> Optional[int]:
+    # Population must be at least 5 digits (10,000+) to avoid rank numbers
+    match = POPULATION_NUMBER.search(text)
+    if match:
+        try:
+            return int(match.group(1).replace(',', ''))
+        except ValueError:
+            return None
+    return None
+
+
+@register_parser('plain_int')
+def parse_plain_int(text: str) -> Optional[int]:
+    # Match first number in text
+    match = FIRST_INT.search(text)
+    if match:
+        try:
+            return int(match.group(1).replace(',', ''))
+        except ValueError:
+            return None
+    return None
+
+
+@register_parser('percent')
+def parse_percent(text: str) -> Optional[float]:
+    match = PERCENT_PATTERN.search(text)
+    if match:
+        try:
+            return float(match.group(1).replace(',', ''))
+        except ValueError:
+            return None
+    return None
+
+
+@register_parser('billions')
+def parse_billions(text: str) -> Optional[float]:
+    # One pass over all unit amounts; the first trillion wins, then the
+    # first billion, then the first million (converted to billions)
+    amounts = {}
+    for match in UNIT_AMOUNT.finditer(text):
+        unit = match.group(2).lower()
+        if unit not in amounts:
+            amounts[unit] = match.group(1).replace(',', '')
+            if unit == 'trillion':
+                break
+    if 'trillion' in amounts:
+        return float(amounts['trillion']) * 1000
+    if 'billion' in amounts:
+        return float(amounts['billion'])
+    if 'million' in amounts:
+        return float(amounts['million']) / 1000
+    return None
+
+
+@register_parser('years')
+def parse_years(text: str) -> Optional[float]:
+    # Look for "X years" or just a number
+    match = YEAR_NUMBER.search(text)
+    if match:
+        return float(match.group(1).replace(',', ''))
+    match = TOTAL_NUMBER.search(text.lower())
+    if match:
+        return float(match.group(1))
+    match = LEADING_DECIMAL.search(text)
+    if match:
+        return float(match.group(1))
+    return None
+
+
+@register_parser('first_number')
+def parse_first_number(text: str) -> Optional[float]:
+    # Get first decimal number in text
+    match = FIRST_DECIMAL.search(text)
+    if match:
+        return float(match.group(1))
+    return None
+
+
+@register_parser('dollars')
+def parse_dollars(text: str) -> Optional[int]:
+    # Parse dollar amounts - could be thousands or no suffix
+    match = DOLLAR_AMOUNT.search(text)
+    if match:
+        return int(match.group(1).replace(',', ''))
+    return None
+
+
 class FactbookExtractor:
-    """Stream-parses Factbook HTML and extracts country data."""
+    """Stream-parses Factbook HTML and extracts country data.
+    
+    Parses the 'marker-lines' layout of the 2010 edition: '@Name (Region)'
+    country markers, 'Section ::' headers and labels on the line before
+    (or the start of the line holding) their values.
+    """
+    
+    LAYOUT = 'marker-lines'
     
     # Fields to look for - labels appear on separate line from values
     FIELD_CONFIG = {
@@ -90,35 +433,177 @@ class FactbookExtractor:
         'Manpower available for military service:': ('military', 'manpower_available', 'plain_int'),
     }
     
-    def __init__(self, year: int):
+    def __init__(self, year: int, verbose: bool = True):
         self.year = year
+        self.verbose = verbose
         self.countries = []
+        self.finished = []  # Finalized countries not yet yielded
         self.current_country = None
         self.current_section = None
         self.pending_field = None  # The field label we're waiting for value
         self.line_buffer = []
+        # (section, field, parser function), resolved once per FIELD_CONFIG entry
+        self.field_configs = [
+            (section, field_name, resolve_parser(parser_type))
+            for section, field_name, parser_type in self.FIELD_CONFIG.values()
+        ]
+        self.label_matcher = LabelMatcher(self.FIELD_CONFIG)
+        self.anchor_tokens = anchor_tokens(self.FIELD_CONFIG)
+        for section, field_name, _ in self.FIELD_CONFIG.values():
+            REGISTRY.slot(section, field_name)
+        
+    def process_file(self, filepath: str, byte_scan: bool = True) -> list:
+        """Stream process the HTML file.
         
-    def process_file(self, filepath: str) -> list:
-        """Stream process the HTML file."""
-        print(f"Processing {filepath}...")
+        By default the file is mmapped and scanned as bytes so that only lines
+        able to change the extraction state are decoded; byte_scan=False reads
+        it in text mode instead. Both give identical results.
+        """
+        self.countries.extend(self.iter_countries(filepath, byte_scan))
+        if self.verbose:
+            print(f"Extracted {len(self.countries)} countries")
+        return self.countries
+    
+    @staticmethod
+    def country_offsets(mm: mmap.mmap) -> list[int]:
+        """Offsets after 0 where a country of this layout starts (see country_segments)."""
+        return find_country_offsets(mm)
+    
+    def iter_countries(self, filepath: str, byte_scan: bool = True) -> Iterator[CountryRecord]:
+        """Yield each country record of the file as soon as it is finalized."""
+        if self.verbose:
+            print(f"Processing {filepath}...")
         
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            for line_num, line in enumerate(f, 1):
-                self._process_line(line, line_num)
+        if byte_scan:
+            with open(filepath, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        yield from self._process_buffer(mm)
+        else:
+            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                yield from self._process_stream(f)
+    
+    def process_file_sharded(self, filepath: str, workers: Optional[int] = None) -> list:
+        """Parse country-aligned shards of the file in worker processes.
+        
+        Gives the same countries, in the same order, as process_file().
+        """
+        if self.verbose:
+            print(f"Processing {filepath} in shards...")
+            
+        workers = workers or os.cpu_count() or 1
+        segments = country_segments(filepath, type(self))
+        for countries in extract_segments(type(self), self.year, filepath, segments, workers,
+                                          verbose=self.verbose):
+            self.countries.extend(countries)
                 
-                if line_num % 100000 == 0:
-                    print(f"  Processed {line_num:,} lines...")
+        if self.verbose:
+            print(f"Extracted {len(self.countries)} countries")
+        return self.countries
+    
+    def _process_stream(self, f: TextIO) -> Iterator[CountryRecord]:
+        """Process every line of an open text stream, yielding finished countries."""
+        for line_num, text in enumerate(iter_text_lines(f), 1):
+            self._process_line(text, line_num)
+            if self.finished:
+                yield from self._take_finished()
+            
+            if self.verbose and line_num % 100000 == 0:
+                print(f"  Processed {line_num:,} lines...")
         
         # Save final country
         if self.current_country:
             self._finalize_country()
+        yield from self._take_finished()
+    
+    def _take_finished(self) -> list:
+        finished, self.finished = self.finished, []
+        return finished
+    
+    def _process_buffer(self, buf, start: int = 0, end: Optional[int] = None) -> Iterator[CountryRecord]:
+        """Process the lines of buf[start:end], yielding finished countries.
+        
+        Only candidate lines are decoded.
+        
+        start must be a line start. Lines without an anchor token are skipped
+        unless a field is waiting for its value on the next non-empty line.
+        """
+        end = len(buf) if end is None else end
+        stripper = self._new_stripper()
+        line_num = 0
+        next_report = start + REPORT_BYTES
+        # Drop scanned pages of a mapped file from our RSS as we go
+        madvise = getattr(buf, 'madvise', None) if hasattr(mmap, 'MADV_DONTNEED') else None
+        
+        def consume(pos: int, limit: int) -> int:
+            # Process the line at pos, then keep going while a value is pending
+            nonlocal line_num
+            while pos < limit:
+                line_end = buf.find(b'\n', pos, limit)
+                line_end = limit if line_end == -1 else line_end + 1
+                for line in decode_lines(buf[pos:line_end]):
+                    line_num += 1
+                    self._process_line(stripper.strip_line(line), line_num)
+                pos = line_end
+                if self.pending_field is None:
+                    break
+            return pos
+        
+        block_start = start
+        while block_start < end:
+            block_end = buf.find(b'\n', min(block_start + SCAN_BLOCK, end), end)
+            block_end = end if block_end == -1 else block_end + 1
             
-        print(f"Extracted {len(self.countries)} countries")
-        return self.countries
+            pos = block_start
+            if self.pending_field is not None:
+                pos = consume(pos, block_end)
+            for line_start in self._candidate_line_starts(buf[block_start:block_end]):
+                line_start += block_start
+                if line_start >= pos:
+                    pos = consume(line_start, block_end)
+                    if self.finished:
+                        yield from self._take_finished()
+            if madvise:
+                page_start = block_start - block_start % mmap.PAGESIZE
+                madvise(mmap.MADV_DONTNEED, page_start, block_end - page_start)
+            block_start = block_end
+            
+            if self.verbose and block_start >= next_report:
+                print(f"  Scanned {(block_start - start) >> 20:,} MB...")
+                next_report += REPORT_BYTES
+        
+        # Save final country
+        if self.current_country:
+            self._finalize_country()
+        yield from self._take_finished()
+    
+    def _new_stripper(self) -> TagStripper:
+        return TagStripper()
+    
+    def _candidate_line_starts(self, block: bytes) -> list[int]:
+        """Sorted start offsets of the lines in block holding an anchor."""
+        lower = block.lower()
+        find = lower.find
+        starts = set()
+        for token in self.anchor_tokens:
+            pos = find(token)
+            while pos != -1:
+                starts.add(lower.rfind(b'\n', 0, pos) + 1)
+                line_end = find(b'\n', pos)
+                if line_end == -1:
+                    break
+                pos = find(token, line_end)
+        match = NON_ASCII.search(lower)
+        while match:
+            starts.add(lower.rfind(b'\n', 0, match.start()) + 1)
+            line_end = find(b'\n', match.start())
+            if line_end == -1:
+                break
+            match = NON_ASCII.search(lower, line_end)
+        return sorted(starts)
     
-    def _process_line(self, line: str, line_num: int):
-        """Process a single line of HTML."""
-        text = strip_html(line).strip()
+    def _process_line(self, text: str, line_num: int):
+        """Process a single line of tag-stripped text."""
         if not text:
             return
             
@@ -147,16 +632,16 @@ class FactbookExtractor:
             self.pending_field = None
             
         # Check if this line is a field label
-        for label, config in self.FIELD_CONFIG.items():
-            if label.lower() in text.lower():
-                # Check if the value is on the same line (after colon)
-                parts = text.split(':', 1)
-                if len(parts) > 1 and parts[1].strip():
-                    self._extract_value(parts[1], config)
-                else:
-                    # Value is on next line
-                    self.pending_field = config
-                break
+        field_index = self.label_matcher.match(text.lower())
+        if field_index is not None:
+            config = self.field_configs[field_index]
+            # Check if the value is on the same line (after colon)
+            parts = text.split(':', 1)
+            if len(parts) > 1 and parts[1].strip():
+                self._extract_value(parts[1], config)
+            else:
+                # Value is on next line
+                self.pending_field = config
                 
         # Also check for political leaders (special handling)
         if self.current_section == 'Government':
@@ -164,113 +649,24 @@ class FactbookExtractor:
     
     def _start_country(self, name: str, region: str):
         """Initialize a new country record."""
-        self.current_country = {
-            'country': name,
-            'region': region,
-            'year': self.year,
-            'demographics': {},
-            'economy': {},
-            'military': {},
-            'political': {}
-        }
+        self.current_country = CountryRecord(name, region, self.year)
         self.current_section = None
         
     def _finalize_country(self):
         """Save current country and reset."""
-        if self.current_country and self.current_country['country']:
+        if self.current_country and self.current_country.country:
             # Only save if we have some meaningful data
-            has_data = any([
-                self.current_country['demographics'],
-                self.current_country['economy'],
-                self.current_country['military'],
-                self.current_country['political']
-            ])
-            if has_data:
-                self.countries.append(self.current_country)
+            if self.current_country.has_data():
+                self.finished.append(self.current_country)
         self.current_country = None
                 
     def _extract_value(self, text: str, config: tuple):
         """Extract and parse a field value."""
-        section, field_name, parser_type = config
-        value = self._parse_value(text, parser_type)
+        section, field_name, parse = config
+        value = parse(text.strip())
         if value is not None:
-            self.current_country[section][field_name] = value
+            self.current_country.set(section, field_name, value)
             
-    def _parse_value(self, text: str, parser_type: str):
-        """Parse value based on type."""
-        text = text.strip()
-        
-        if parser_type == 'population':
-            # Population must be at least 5 digits (10,000+) to avoid rank numbers
-            match = re.search(r'^([\d,]{5,})', text)
-            if match:
-                try:
-                    return int(match.group(1).replace(',', ''))
-                except:
-                    return None
-            return None
-        
-        if parser_type == 'plain_int':
-            # Match first number in text
-            match = re.search(r'([\d,]+)', text)
-            if match:
-                try:
-                    return int(match.group(1).replace(',', ''))
-                except:
-                    return None
-                    
-        elif parser_type == 'percent':
-            match = PERCENT_PATTERN.search(text)
-            if match:
-                try:
-                    return float(match.group(1).replace(',', ''))
-                except:
-                    return None
-                    
-        elif parser_type == 'billions':
-            # Try trillion first
-            match = TRILLION_PATTERN.search(text)
-            if match:
-                return float(match.group(1).replace(',', '')) * 1000
-            # Then billion
-            match = BILLION_PATTERN.search(text)
-            if match:
-                return float(match.group(1).replace(',', ''))
-            # Then million (convert to billions)
-            match = MILLION_PATTERN.search(text)
-            if match:
-                return float(match.group(1).replace(',', '')) / 1000
-            return None
-            
-        elif parser_type == 'years':
-            # Look for "X years" or just a number
-            match = YEAR_NUMBER.search(text)
-            if match:
-                return float(match.group(1).replace(',', ''))
-            match = re.search(r'total[:\s]+([\d.]+)', text.lower())
-            if match:
-                return float(match.group(1))
-            match = re.search(r'^([\d.]+)', text)
-            if match:
-                return float(match.group(1))
-            return None
-            
-        elif parser_type == 'first_number':
-            # Get first decimal number in text
-            match = re.search(r'([\d.]+)', text)
-            if match:
-                return float(match.group(1))
-            return None
-            
-        elif parser_type == 'dollars':
-            # Parse dollar amounts - could be thousands or no suffix
-            match = re.search(r'\$?([\d,]+)', text)
-            if match:
-                return int(match.group(1).replace(',', ''))
-            return None
-            
-        return None
-        
     def _extract_political(self, text: str):
         """Extract political/leadership data."""
         text_lower = text.lower()
@@ -287,7 +683,7 @@ class FactbookExtractor:
                 else:
                     name = re.split(r'[;(]', name)[0].strip()
                 if name and len(name) > 2:
-                    self.current_country['political']['chief_of_state'] = name[:80]
+                    self.current_country.set('political', 'chief_of_state', name[:80])
                 
         elif 'head of government:' in text_lower:
             parts = text.split(':', 1)
@@ -299,63 +695,801 @@ class FactbookExtractor:
                 else:
                     name = re.split(r'[;(]', name)[0].strip()
                 if name and len(name) > 2:
-                    self.current_country['political']['head_of_government'] = name[:80]
+                    self.current_country.set('political', 'head_of_government', name[:80])
                 
         elif 'election' in text_lower and 'last held' in text_lower:
             match = DATE_PATTERN.search(text)
             if match:
-                self.current_country['political']['last_election'] = match.group(1)
+                self.current_country.set('political', 'last_election', match.group(1))
+
 
+def block_text(fragment: str) -> str:
+    """Visible text of an HTML fragment on one line, whitespace collapsed."""
+    return ' '.join(html.unescape(ANY_TAG.sub('', BREAK_TAG.sub(' ', fragment))).split())
 
-def save_countries(countries: list, output_dir: Path):
-    """Save each country as a separate JSON file."""
+
+class FieldDivExtractor(FactbookExtractor):
+    """Block parser for the 'field-divs' layout of modern editions.
+    
+    Each country page opens with a '<span class="region">' ...
+    '<span class="countryName">' header, sections are
+    '<h2 sectiontitle="...">' headings and each field is a
+    '<div id="field-...">' label followed by one
+    '<div class="category_data ...">' per subfield or note. Pages are
+    parsed whole with one regex pass over their blocks: a field's value is
+    the first of its data divs that parses, configured labels are also
+    found as subfields of other fields ('urban population:' under
+    Urbanization) and Government data divs give the political fields.
+    """
+    
+    LAYOUT = 'field-divs'
+    # Fields renamed in modern editions
+    FIELD_CONFIG = {
+        **FactbookExtractor.FIELD_CONFIG,
+        'Real GDP (purchasing power parity):': ('economy', 'gdp_ppp_billions', 'billions'),
+        'Real GDP growth rate:': ('economy', 'gdp_growth_pct', 'percent'),
+        'Real GDP per capita:': ('economy', 'gdp_per_capita', 'dollars'),
+    }
+    
+    @staticmethod
+    def country_offsets(mm: mmap.mmap) -> list[int]:
+        return [match.start() for match in COUNTRY_HEADER_BYTES.finditer(mm) if match.start() > 0]
+    
+    def _process_stream(self, f: TextIO) -> Iterator[CountryRecord]:
+        """Parse an open text stream page by page, yielding finished countries."""
+        pending = ''
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), ''):
+            pending += chunk
+            # Everything before the last complete header is whole pages
+            cut = 0
+            for match in COUNTRY_HEADER.finditer(pending):
+                cut = match.start()
+            if cut:
+                self._process_pages(pending[:cut])
+                pending = pending[cut:]
+                yield from self._take_finished()
+        self._process_pages(pending)
+        if self.current_country:
+            self._finalize_country()
+        yield from self._take_finished()
+    
+    def _process_buffer(self, buf, start: int = 0, end: Optional[int] = None) -> Iterator[CountryRecord]:
+        """Parse the pages of buf[start:end] one at a time, yielding finished countries."""
+        end = len(buf) if end is None else end
+        cuts = [match.start() for match in COUNTRY_HEADER_BYTES.finditer(buf, start, end) if match.start() > start]
+        next_report = start + REPORT_BYTES
+        for page_start, page_end in zip([start] + cuts, cuts + [end]):
+            self._process_pages(buf[page_start:page_end].decode('utf-8', errors='ignore'))
+            yield from self._take_finished()
+            if self.verbose and page_end >= next_report:
+                print(f"  Scanned {(page_end - start) >> 20:,} MB...")
+                next_report += REPORT_BYTES
+        if self.current_country:
+            self._finalize_country()
+        yield from self._take_finished()
+    
+    def _process_pages(self, text: str):
+        """Parse whole country pages, plus any text before the first of them."""
+        pos = 0
+        for header in COUNTRY_HEADER.finditer(text):
+            self._process_blocks(text, pos, header.start())
+            if self.current_country:
+                self._finalize_country()
+            self._start_country(block_text(header.group(2)), block_text(header.group(1)))
+            pos = header.end()
+        self._process_blocks(text, pos, len(text))
+    
+    def _process_blocks(self, text: str, start: int, end: int):
+        """Extract the fields of the current country found in text[start:end]."""
+        if not self.current_country:
+            return
+        label = None
+        values = []
+        for match in FIELD_BLOCK.finditer(text, start, end):
+            data = match.group('data')
+            if data is not None:
+                if label is not None:
+                    values.append(data)
+                continue
+            if label is not None:
+                self._extract_field(label, values)
+            label, values = None, []
+            if match.group('section') is not None:
+                self.current_section = block_text(match.group('section'))
+            else:
+                label = block_text(match.group('label'))
+        if label is not None:
+            self._extract_field(label, values)
+    
+    def _extract_field(self, label: str, values: list[str]):
+        """Extract one field from its label and the HTML of its data divs.
+        
+        Only the data divs a value is looked for in are stripped, and
+        subfield labels only in the text before their first colon, so long
+        narrative fields cost one regex pass.
+        """
+        field_index = self.label_matcher.match(label.lower())
+        if field_index is not None:
+            section, field_name, parse = self.field_configs[field_index]
+            for data in values:
+                value = parse(block_text(data))
+                if value is not None:
+                    self.current_country.set(section, field_name, value)
+                    break
+        else:
+            for data in values:
+                colon = data.find(':')
+                if colon < 0 or self.label_matcher.match(block_text(data[:colon + 1]).lower()) is None:
+                    continue
+                text = block_text(data)
+                field_index = self.label_matcher.match(text.lower())
+                parts = text.split(':', 1)
+                if field_index is not None and len(parts) > 1 and parts[1].strip():
+                    self._extract_value(parts[1], self.field_configs[field_index])
+        if self.current_section == 'Government':
+            for data in values:
+                self._extract_political(block_text(data))
+
+
+# Layout name -> extractor class that parses it
+LAYOUT_PARSERS = {cls.LAYOUT: cls for cls in (FactbookExtractor, FieldDivExtractor)}
+
+
+def detect_layout(filepath: str) -> Optional[str]:
+    """Fingerprint a file's layout from its first PRESCAN_BYTES; None if unrecognized."""
+    with open(filepath, 'rb') as f:
+        head = f.read(PRESCAN_BYTES)
+    for layout, fingerprint in LAYOUT_FINGERPRINTS:
+        if fingerprint.search(head):
+            return layout
+    return None
+
+
+def parser_for(layout: Optional[str]) -> type:
+    """Extractor class for a layout; unrecognized files get the 2010 line parser."""
+    return LAYOUT_PARSERS.get(layout, FactbookExtractor)
+
+
+class TimedTagStripper(TagStripper):
+    """TagStripper that adds the time spent stripping to timings['strip_html']."""
+    
+    def __init__(self, timings: Counter):
+        super().__init__()
+        self.timings = timings
+    
+    def strip_line(self, line: str) -> str:
+        start = time.perf_counter()
+        text = super().strip_line(line)
+        self.timings['strip_html'] += time.perf_counter() - start
+        return text
+
+
+class ProfilingExtractor(FactbookExtractor):
+    """FactbookExtractor that records per-stage timings and per-field counters.
+    
+    Stages: scan (finding and decoding candidate lines), strip_html, detect
+    (country/section markers and political fields), label_match and
+    value_parse. A field counts a hit when its label was found and the value
+    parsed, a miss when the label was found but the value did not parse.
+    """
+    
+    def __init__(self, year: int, verbose: bool = True):
+        super().__init__(year, verbose)
+        self.timings = Counter()
+        self.lines = 0
+        self.field_hits = Counter()
+        self.field_misses = Counter()
+        self.label_matcher.match = self._timed(self.label_matcher.match, 'label_match')
+        self.field_configs = [
+            (section, field_name, self._counting_parser(label, parse))
+            for label, (section, field_name, parse) in zip(self.FIELD_CONFIG, self.field_configs)
+        ]
+    
+    def _timed(self, func, stage: str):
+        timings = self.timings
+        
+        def timed(*args):
+            start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                timings[stage] += time.perf_counter() - start
+        return timed
+    
+    def _counting_parser(self, label: str, parse):
+        timings, hits, misses = self.timings, self.field_hits, self.field_misses
+        
+        def counting_parse(text: str):
+            start = time.perf_counter()
+            value = parse(text)
+            timings['value_parse'] += time.perf_counter() - start
+            (hits if value is not None else misses)[label] += 1
+            return value
+        return counting_parse
+    
+    def _new_stripper(self) -> TagStripper:
+        return TimedTagStripper(self.timings)
+    
+    def _process_line(self, text: str, line_num: int):
+        start = time.perf_counter()
+        super()._process_line(text, line_num)
+        self.timings['process_line'] += time.perf_counter() - start
+        self.lines += 1
+    
+    def report(self, filepath: str, countries: list, seconds: float) -> dict:
+        """Machine-readable stats for one pass over filepath that took `seconds`."""
+        size = os.path.getsize(filepath)
+        with open(filepath, 'rb') as f:
+            total_lines = sum(block.count(b'\n') for block in iter(lambda: f.read(CHUNK_SIZE), b''))
+        timings = self.timings
+        stages = {
+            'scan': seconds - timings['strip_html'] - timings['process_line'],
+            'strip_html': timings['strip_html'],
+            'detect': timings['process_line'] - timings['label_match'] - timings['value_parse'],
+            'label_match': timings['label_match'],
+            'value_parse': timings['value_parse'],
+        }
+        fields = {}
+        for label, (section, field_name, _) in self.FIELD_CONFIG.items():
+            found = sum(1 for country in countries if country.has(section, field_name))
+            fields[label] = {
+                'field': f"{section}/{field_name}",
+                'hits': self.field_hits[label],
+                'misses': self.field_misses[label],
+                'countries': found,
+                'coverage_pct': round(found / len(countries) * 100, 1) if countries else 0.0,
+            }
+        return {
+            'year': self.year,
+            'input': str(filepath),
+            'bytes': size,
+            'lines': total_lines,
+            'lines_processed': self.lines,
+            'countries': len(countries),
+            'seconds': {stage: round(value, 4) for stage, value in stages.items()},
+            'throughput': {
+                'mb_per_sec': round(size / (1 << 20) / seconds, 2) if seconds else None,
+                'lines_per_sec': round(total_lines / seconds) if seconds else None,
+                'countries_per_sec': round(len(countries) / seconds, 1) if seconds else None,
+            },
+            'fields': fields,
+        }
+
+
+def profiling_extractor(parser_cls: type) -> type:
+    """ProfilingExtractor for the layout parsed by parser_cls.
+    
+    Line-parser stages (strip_html, detect) stay at zero for block parsers,
+    whose time is counted under scan.
+    """
+    if issubclass(ProfilingExtractor, parser_cls):
+        return ProfilingExtractor
+    return type(f"Profiling{parser_cls.__name__}", (ProfilingExtractor, parser_cls), {})
+
+
+def profile_extraction(filepath: str, year: int, output_dir: Path, columnar: bool = False) -> dict:
+    """Extract an edition serially with a profiling version of its layout's parser.
+    
+    Writes STATS_FILE next to the output. Always a full, uncached pass so
+    every stage is measured.
+    """
+    layout = detect_layout(filepath)
+    parser_cls = parser_for(layout)
+    extractor = profiling_extractor(parser_cls)(year)
+    start = time.perf_counter()
+    countries = extractor.process_file(filepath)
+    parse_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    save_countries(countries, output_dir, layout, parser_cls.__name__)
+    if columnar:
+        save_columns(countries, output_dir, year)
+    elif (output_dir / COLUMNS_FILE).exists():
+        (output_dir / COLUMNS_FILE).unlink()
+    write_seconds = time.perf_counter() - start
+    
+    report = extractor.report(filepath, countries, parse_seconds)
+    report['layout'] = layout
+    report['parser'] = parser_cls.__name__
+    report['seconds']['write_output'] = round(write_seconds, 4)
+    report['seconds']['total'] = round(parse_seconds + write_seconds, 4)
+    report['peak_rss_mb'] = peak_rss_mb()
+    with open(output_dir / STATS_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def print_stats(report: dict):
+    """Summarize a profile_extraction() report."""
+    total = report['seconds']['total']
+    print(f"\nLayout {report['layout'] or 'unrecognized'}, parsed by {report['parser']}")
+    print(f"\n{'Stage':<14} {'Seconds':>8} {'Share':>6}")
+    for stage, seconds in report['seconds'].items():
+        if stage != 'total':
+            print(f"{stage:<14} {seconds:>8.3f} {seconds / total if total else 0:>6.0%}")
+    throughput = report['throughput']
+    print(f"{report['lines']:,} lines ({report['lines_processed']:,} processed), "
+          f"{report['countries']} countries: {throughput['mb_per_sec']} MB/s, "
+          f"{throughput['lines_per_sec']:,} lines/s")
+    
+    print(f"\n{'Field':<45} {'Hits':>6} {'Misses':>7} {'Coverage':>9}")
+    for label, field in report['fields'].items():
+        print(f"{label:<45} {field['hits']:>6} {field['misses']:>7} {field['coverage_pct']:>8.1f}%")
+
+
+def find_country_offsets(mm: mmap.mmap) -> list[int]:
+    """Byte offsets of lines whose stripped text holds a COUNTRY_START marker.
+    
+    Offsets always follow a newline, so a shard starting there decodes and
+    splits into exactly the same lines as the whole file does.
+    """
+    stripper = TagStripper()
+    offsets = []
+    pos = mm.find(b'@')
+    while pos != -1:
+        start = mm.rfind(b'\n', 0, pos) + 1
+        end = mm.find(b'\n', pos)
+        end = len(mm) if end == -1 else end + 1
+        text = mm[start:end].decode('utf-8', errors='ignore')
+        # Universal newlines: a lone '\r' also ends the line starting here
+        line = re.split(r'\r\n?|\n', text, maxsplit=1)[0] + '\n'
+        if start > 0 and COUNTRY_START.search(stripper.strip_line(line)):
+            offsets.append(start)
+        pos = mm.find(b'@', end)
+    return offsets
+
+
+def country_segments(filepath: str, extractor_cls: type = FactbookExtractor) -> list[tuple[int, int]]:
+    """Split a file into byte ranges that each start at a country of extractor_cls's layout.
+    
+    The first range also holds any preamble before the first country.
+    """
+    with open(filepath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            cuts = [0] + extractor_cls.country_offsets(mm) + [size]
+    return list(zip(cuts, cuts[1:]))
+
+
+def plan_shards(segments: list[tuple[int, int]], count: int) -> list[list[tuple[int, int]]]:
+    """Group consecutive segments into about `count` shards of similar size."""
+    if not segments:
+        return []
+    target = (segments[-1][1] - segments[0][0]) / max(count, 1)
+    shards = [[]]
+    for segment in segments:
+        if shards[-1] and segment[0] - shards[-1][0][0] >= target:
+            shards.append([])
+        shards[-1].append(segment)
+    return shards
+
+
+def extract_segments(extractor_cls: type, year: int, filepath: str, segments: list[tuple[int, int]],
+                     workers: int = 1, verbose: bool = False) -> list[list]:
+    """Extract each segment independently; returns one country list per segment.
+    
+    Every segment after the first starts at a country marker, where the
+    extractor state is fully reset, so concatenating the lists gives exactly
+    the countries of a serial pass over the whole file.
+    """
+    if workers <= 1 or len(segments) <= 1:
+        return _extract_segments(extractor_cls, year, filepath, segments)
+    
+    shards = plan_shards(segments, workers * 4)
+    if verbose:
+        print(f"  {len(segments)} country segments, {len(shards)} shards, {workers} workers")
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [pool.submit(_extract_segments, extractor_cls, year, filepath, shard) for shard in shards]
+        for job in jobs:
+            results.extend(job.result())
+    return results
+
+
+def _extract_segments(extractor_cls: type, year: int, filepath: str,
+                      segments: list[tuple[int, int]]) -> list[list]:
+    """Worker: extract the countries of each byte range of the file."""
+    if not segments:
+        return []
+    extractor = extractor_cls(year, verbose=False)
+    results = []
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start, end in segments:
+                results.append(list(extractor._process_buffer(mm, start, end)))
+    return results
+
+
+def file_sha256(filepath: str) -> str:
+    """Hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def field_fingerprint(fields: list) -> str:
+    """Stable hash of an ordered field configuration."""
+    return hashlib.sha256(json.dumps(fields).encode('utf-8')).hexdigest()
+
+
+def load_cache(output_dir: Path) -> Optional[dict]:
+    """Read the extraction cache manifest of a year directory, if any."""
+    try:
+        with open(output_dir / CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def changed_labels(old_fields: list, new_fields: list) -> Optional[set]:
+    """Labels whose config was added, removed or changed between two configs.
+    
+    Returns None when the labels both configs share were reordered, since a
+    priority change can alter which label any line resolves to.
+    """
+    old = {label: config for label, *config in old_fields}
+    new = {label: config for label, *config in new_fields}
+    shared_old = [label for label in old if label in new]
+    shared_new = [label for label in new if label in old]
+    if shared_old != shared_new:
+        return None
+    return {label for label in old.keys() | new.keys() if old.get(label) != new.get(label)}
+
+
+def segments_mentioning(filepath: str, segments: list[tuple[int, int]], labels: set) -> set[int]:
+    """Indexes of segments whose stripped text may contain any of the labels.
+    
+    A raw-byte hit on a label's last word marks the segment directly; lines
+    holding '&' or non-ASCII bytes are stripped and checked exactly.
+    """
+    lowered = [label.lower() for label in labels]
+    tokens = {label.split()[-1].encode('utf-8') for label in lowered}
+    stripper = TagStripper()
+    hits = set()
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for index, (start, end) in enumerate(segments):
+                block = mm[start:end].lower()
+                if any(token in block for token in tokens):
+                    hits.add(index)
+                    continue
+                for line in block.split(b'\n'):
+                    if b'&' in line or NON_ASCII.search(line):
+                        text = ' '.join(stripper.strip_line(part) for part in decode_lines(line + b'\n'))
+                        if any(label in text.lower() for label in lowered):
+                            hits.add(index)
+                            break
+    return hits
+
+
+def _load_cached_countries(output_dir: Path, files: list[str]) -> Optional[list]:
+    countries = []
+    for filename in files:
+        try:
+            with open(output_dir / filename, encoding='utf-8') as f:
+                countries.append(CountryRecord.from_dict(json.load(f)))
+        except (OSError, ValueError):
+            return None
+    return countries
+
+
+def extract_to_directory(filepath: str, year: int, output_dir: Path, workers: int = 1,
+                         force: bool = False, extractor_cls: type = None,
+                         columnar: bool = False, verbose: bool = True,
+                         update_index: bool = True) -> Optional[list]:
+    """Extract an edition into output_dir, reusing the cache manifest there.
+    
+    Returns None when the input, extractor version and field config all match
+    the cache. When only the field config changed, only the countries whose
+    text mentions an added, removed or changed label are re-extracted. With
+    columnar=True a _columns.bin bundle is written next to the JSON files.
+    """
+    layout = detect_layout(filepath)
+    extractor_cls = extractor_cls or parser_for(layout)
+    fields = [[label, *config] for label, config in extractor_cls.FIELD_CONFIG.items()]
+    cache = {
+        'extractor_version': EXTRACTOR_VERSION,
+        'year': year,
+        'input_sha256': file_sha256(filepath),
+        'layout': layout,
+        'parser': extractor_cls.__name__,
+        # Segments can only be reused by a parser of the same layout
+        'parser_layout': extractor_cls.LAYOUT,
+        'field_fingerprint': field_fingerprint(fields),
+        'fields': fields,
+    }
+    
+    previous = None if force else load_cache(output_dir)
+    same_input = previous is not None and all(
+        previous.get(key) == cache[key] for key in ('extractor_version', 'year', 'input_sha256', 'parser_layout')
+    )
+    if same_input and previous['field_fingerprint'] == cache['field_fingerprint']:
+        if verbose:
+            print(f"{output_dir} is up to date with {filepath}, skipping")
+        if columnar and not (output_dir / COLUMNS_FILE).exists():
+            files = [name for segment in previous.get('segments', []) for name in segment['files']]
+            countries = _load_cached_countries(output_dir, files)
+            if countries is not None:
+                save_columns(countries, output_dir, year, verbose)
+        return None
+    
+    if verbose:
+        print(f"Processing {filepath} (layout {layout or 'unrecognized'}, {extractor_cls.__name__})...")
+    segments = country_segments(filepath, extractor_cls)
+    results = [None] * len(segments)
+    
+    labels = changed_labels(previous['fields'], fields) if same_input else None
+    previous_segments = previous.get('segments', []) if same_input else []
+    if labels is not None and [(s['start'], s['end']) for s in previous_segments] == segments:
+        file_uses = Counter(name for segment in previous_segments for name in segment['files'])
+        affected = segments_mentioning(filepath, segments, labels)
+        for index, segment in enumerate(previous_segments):
+            if index not in affected and all(file_uses[name] == 1 for name in segment['files']):
+                results[index] = _load_cached_countries(output_dir, segment['files'])
+        if verbose:
+            reused = sum(result is not None for result in results)
+            print(f"  Field config changed: reusing {reused} of {len(segments)} country segments")
+    
+    todo = [index for index, result in enumerate(results) if result is None]
+    extracted = extract_segments(extractor_cls, year, filepath, [segments[i] for i in todo],
+                                 workers, verbose=verbose)
+    for index, countries in zip(todo, extracted):
+        results[index] = countries
+    
+    countries = [country for result in results for country in result]
+    if verbose:
+        print(f"Extracted {len(countries)} countries")
+    save_countries(countries, output_dir, layout, extractor_cls.__name__,
+                   update_index=update_index, verbose=verbose)
+    if columnar:
+        save_columns(countries, output_dir, year, verbose)
+    elif (output_dir / COLUMNS_FILE).exists():
+        # The bundle no longer mirrors the JSON files; loaders fall back to them
+        (output_dir / COLUMNS_FILE).unlink()
+    
+    cache['segments'] = [
+        {'start': start, 'end': end, 'files': [country_filename(c.country) for c in result]}
+        for (start, end), result in zip(segments, results)
+    ]
+    write_if_changed(output_dir / CACHE_FILE, json.dumps(cache, indent=2))
+    return countries
+
+
+def country_filename(name: str) -> str:
+    """JSON filename a country is saved under."""
+    return slugify(name) + '.json'
+
+
+def write_if_changed(filepath: Path, content: Union[str, bytes]) -> bool:
+    """Write content unless the file already holds exactly that; True if written."""
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    try:
+        with open(filepath, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    with open(filepath, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def save_countries(countries: list, output_dir: Path, layout: Optional[str] = None,
+                   parser: Optional[str] = None, update_index: bool = True, verbose: bool = True):
+    """Save each country as a separate JSON file.
+    
+    _index.json records the edition's detected layout and the parser used,
+    and lists each country's stable ID from the identity index in the
+    parent data directory, which is then updated with this edition unless
+    update_index is False (batch workers leave that to run_batch).
+    Progress goes to stderr, and only when verbose.
+    """
     output_dir.mkdir(parents=True, exist_ok=True)
+    data_dir = output_dir.parent
+    identity = load_index(data_dir)
     
     index = {
-        'year': countries[0]['year'] if countries else None,
+        'year': countries[0].year if countries else None,
+        'layout': layout,
+        'parser': parser,
         'total_countries': len(countries),
         'countries': []
     }
     
+    written = 0
     for country in countries:
-        # Create filename from country name
-        filename = re.sub(r'[^\w\s-]', '', country['country'].lower())
-        filename = re.sub(r'\s+', '_', filename)
-        filepath = output_dir / f"{filename}.json"
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(country, f, indent=2)
+        # Only rewrite files whose content changed, keeping mtimes stable
+        filename = country_filename(country.country)
+        written += write_if_changed(output_dir / filename, json.dumps(country.to_dict(), indent=2))
             
         index['countries'].append({
-            'name': country['country'],
-            'region': country['region'],
-            'file': f"{filename}.json"
+            'id': identity.resolve(country.country),
+            'name': country.country,
+            'region': country.region,
+            'file': filename
         })
         
     # Save index
-    with open(output_dir / '_index.json', 'w', encoding='utf-8') as f:
-        json.dump(index, f, indent=2)
+    written += write_if_changed(output_dir / '_index.json', json.dumps(index, indent=2))
         
-    print(f"Saved {len(countries)} countries to {output_dir}")
+    if verbose:
+        print(f"Saved {len(countries)} countries to {output_dir} ({written} files rewritten)", file=sys.stderr)
+    
+    # Reloaded so display names follow edition order, not extraction order
+    if update_index and save_index(load_index(data_dir), data_dir) and verbose:
+        print(f"Updated country identity index {data_dir / INDEX_FILE}", file=sys.stderr)
+
+
+def save_columns(countries: list, output_dir: Path, year: Optional[int] = None, verbose: bool = True):
+    """Save a year's countries as one columnar bundle (see columnar.py)."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = write_if_changed(output_dir / COLUMNS_FILE, encode_columns([country.to_dict() for country in countries], year))
+    if written and verbose:
+        print(f"Saved columnar bundle to {output_dir / COLUMNS_FILE}", file=sys.stderr)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+def extract_edition(filepath: str, year: int, output_dir: str, force: bool = False,
+                    columnar: bool = False) -> dict:
+    """Extract one edition into output_dir/<year>/ and report its cost."""
+    start = time.perf_counter()
+    countries = extract_to_directory(filepath, year, Path(output_dir) / str(year),
+                                     force=force, columnar=columnar, verbose=False, update_index=False)
+    return {
+        'year': year,
+        'file': filepath,
+        'countries': None if countries is None else len(countries),
+        'seconds': time.perf_counter() - start,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def write_ndjson(filepath: str, year: int, output) -> int:
+    """Write each country of an edition as one JSON line as soon as it is parsed."""
+    extractor = parser_for(detect_layout(filepath))(year, verbose=False)
+    count = 0
+    for country in extractor.iter_countries(filepath):
+        output.write(json.dumps(country.to_dict(), separators=(',', ':')) + '\n')
+        count += 1
+    return count
+
+
+def load_manifest(manifest_path: str) -> list[tuple[str, int]]:
+    """Read a {"<year>": "<html file>"} manifest; paths are relative to it."""
+    base_dir = Path(manifest_path).parent
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    return [(str(base_dir / filepath), int(year)) for year, filepath in manifest.items()]
+
+
+def run_batch(editions: list[tuple[str, int]], output_dir: str, workers: Optional[int],
+              force: bool = False, columnar: bool = False) -> int:
+    """Extract several editions in parallel, one edition per worker process."""
+    missing = [filepath for filepath, _ in editions if not os.path.exists(filepath)]
+    if missing:
+        for filepath in missing:
+            print(f"Error: File not found: {filepath}")
+        return 1
+
+    workers = min(workers or os.cpu_count() or 1, len(editions))
+    print(f"Extracting {len(editions)} editions with {workers} workers...")
+
+    start = time.perf_counter()
+    results = []
+    # A fresh process per edition keeps each peak RSS reading independent
+    # (max_tasks_per_child needs 3.11; before that workers are reused and
+    # peak RSS is the largest edition a worker has handled so far)
+    fresh = {'max_tasks_per_child': 1} if sys.version_info >= (3, 11) else {}
+    with ProcessPoolExecutor(max_workers=workers, **fresh) as pool:
+        futures = {
+            pool.submit(extract_edition, filepath, year, output_dir, force, columnar): year
+            for filepath, year in editions
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  {futures[future]}: failed: {e}")
+                continue
+            results.append(result)
+            if result['countries'] is None:
+                print(f"  {result['year']}: up to date")
+            else:
+                print(f"  {result['year']}: {result['countries']} countries in {result['seconds']:.1f}s")
+    elapsed = time.perf_counter() - start
+    # Once, after every worker is done: concurrent writers would lose each other's IDs
+    data_dir = Path(output_dir)
+    if save_index(load_index(data_dir), data_dir):
+        print(f"Updated country identity index {data_dir / INDEX_FILE}")
+
+    print(f"\n{'Year':<6} {'Countries':>9} {'Seconds':>8} {'Peak RSS (MB)':>14}  File")
+    for result in sorted(results, key=lambda r: r['year']):
+        rss = f"{result['peak_rss_mb']:.1f}" if result['peak_rss_mb'] is not None else 'n/a'
+        countries = 'cached' if result['countries'] is None else result['countries']
+        print(f"{result['year']:<6} {countries:>9} {result['seconds']:>8.1f} {rss:>14}  {result['file']}")
+    serial = sum(r['seconds'] for r in results)
+    print(f"\nWall time {elapsed:.1f}s for {serial:.1f}s of extraction work")
+
+    return 0 if len(results) == len(editions) else 1
 
 
 def main():
     parser = argparse.ArgumentParser(description='Extract CIA World Factbook data')
-    parser.add_argument('input_file', help='Path to Factbook HTML file')
-    parser.add_argument('--year', type=int, required=True, help='Factbook year (e.g., 2010)')
+    parser.add_argument('input_file', nargs='?', help='Path to Factbook HTML file')
+    parser.add_argument('--year', type=int, help='Factbook year (e.g., 2010)')
     parser.add_argument('--output-dir', default='data', help='Output directory')
+    parser.add_argument('--edition', nargs=2, action='append', default=[], metavar=('FILE', 'YEAR'),
+                        help='Add an edition to a batch run (repeatable)')
+    parser.add_argument('--manifest', help='JSON file mapping years to HTML files for a batch run')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes (batch: one edition each; single file: shard the file '
+                             'on country boundaries). Default: CPU count for batches, serial otherwise')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-extract even if the cache manifest says the output is up to date')
+    parser.add_argument('--columnar', action='store_true',
+                        help=f'Also write a columnar {COLUMNS_FILE} bundle per year')
+    parser.add_argument('--ndjson', metavar='PATH',
+                        help="Stream countries as NDJSON to PATH ('-' for stdout) instead of "
+                             "writing per-country files")
+    parser.add_argument('--stats', '--profile', action='store_true',
+                        help=f'Profile a full serial extraction and write per-stage timings and '
+                             f'per-field hit counts to {STATS_FILE} next to the output')
     
     args = parser.parse_args()
     
+    editions = [(filepath, int(year)) for filepath, year in args.edition]
+    if args.manifest:
+        editions.extend(load_manifest(args.manifest))
+    if editions:
+        if args.ndjson or args.stats:
+            parser.error('--ndjson and --stats take a single input_file, not --edition/--manifest')
+        if args.input_file:
+            if args.year is None:
+                parser.error('--year is required with input_file')
+            editions.insert(0, (args.input_file, args.year))
+        return run_batch(editions, args.output_dir, args.workers, args.force, args.columnar)
+    
+    if not args.input_file or args.year is None:
+        parser.error('input_file and --year are required (or use --edition/--manifest)')
+    
     if not os.path.exists(args.input_file):
-        print(f"Error: File not found: {args.input_file}")
+        print(f"Error: File not found: {args.input_file}", file=sys.stderr if args.ndjson else sys.stdout)
         return 1
-        
-    extractor = FactbookExtractor(args.year)
-    countries = extractor.process_file(args.input_file)
     
+    if args.ndjson:
+        if args.workers or args.columnar:
+            parser.error('--ndjson is a single serial pass; drop --workers and --columnar')
+        if args.ndjson == '-':
+            count = write_ndjson(args.input_file, args.year, sys.stdout)
+        else:
+            with open(args.ndjson, 'w', encoding='utf-8') as f:
+                count = write_ndjson(args.input_file, args.year, f)
+        # Keep stdout clean for the records themselves
+        print(f"Streamed {count} countries", file=sys.stderr)
+        return 0
+        
     output_path = Path(args.output_dir) / str(args.year)
-    save_countries(countries, output_path)
+    if args.stats:
+        if args.workers:
+            parser.error('--stats profiles a single serial pass; drop --workers')
+        print_stats(profile_extraction(args.input_file, args.year, output_path, args.columnar))
+        print(f"\nSaved stats to {output_path / STATS_FILE}")
+        return 0
+    
+    extract_to_directory(args.input_file, args.year, output_path, args.workers or 1, args.force,
+                         columnar=args.columnar)
     
     print(f"\nDone! Run 'ls {output_path}' to see extracted files.")
     return 0
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Factbook SQLite Store
+
+Exports the extracted years and the merge output into one indexed SQLite
+database so ranked and range queries ("top 20 countries by inflation in
+2015", "every year of GDP for a region") read a few index pages instead of
+whole JSON files.
+
+Tables:
+    countries      one row per country key, with its latest name and region
+    metrics        one row per numeric field, with its section
+    observations   (country, metric, year) -> value for every numeric field;
+                   the primary key doubles as the (country, metric, year)
+                   index and observations_metric_year_value covers rankings
+    changes        per-period metric changes from data/_merged/changes.json
+    alerts         per-period alerts from data/_merged/changes.json
+
+Usage:
+    python factbook_db.py
+    python factbook_db.py --top inflation_pct 2010 --limit 20
+    python factbook_db.py --series united_states gdp_ppp_billions
+
+Outputs:
+    data/_merged/factbook.db
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+from merge_timeseries import DATA_DIR, OUTPUT_DIR, TRACKED_METRICS, get_available_years, load_all_countries
+
+DB_PATH = OUTPUT_DIR / 'factbook.db'
+
+SCHEMA = """
+CREATE TABLE countries (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    region TEXT
+);
+CREATE TABLE metrics (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    section TEXT NOT NULL
+);
+-- value has no declared type so ints and floats keep the type they were extracted with
+CREATE TABLE observations (
+    country_id INTEGER NOT NULL REFERENCES countries (id),
+    metric_id INTEGER NOT NULL REFERENCES metrics (id),
+    year INTEGER NOT NULL,
+    value NOT NULL,
+    PRIMARY KEY (country_id, metric_id, year)
+) WITHOUT ROWID;
+CREATE TABLE changes (
+    country_id INTEGER NOT NULL REFERENCES countries (id),
+    metric_id INTEGER NOT NULL REFERENCES metrics (id),
+    from_year INTEGER NOT NULL,
+    to_year INTEGER NOT NULL,
+    old NOT NULL,
+    new NOT NULL,
+    abs_change REAL NOT NULL,
+    pct_change REAL,
+    PRIMARY KEY (country_id, metric_id, from_year, to_year)
+) WITHOUT ROWID;
+CREATE TABLE alerts (
+    country_id INTEGER NOT NULL REFERENCES countries (id),
+    from_year INTEGER NOT NULL,
+    to_year INTEGER NOT NULL,
+    alert TEXT NOT NULL,
+    PRIMARY KEY (country_id, from_year, to_year, alert)
+) WITHOUT ROWID;
+"""
+
+# Created after the bulk insert, which is much faster than maintaining them row by row
+INDEXES = """
+CREATE INDEX observations_metric_year_value ON observations (metric_id, year, value);
+CREATE INDEX countries_region ON countries (region);
+CREATE INDEX changes_period_metric ON changes (from_year, to_year, metric_id, pct_change);
+CREATE INDEX alerts_period_alert ON alerts (from_year, to_year, alert);
+"""
+
+
+def parse_period(period: str) -> tuple[int, int]:
+    """(from_year, to_year) of a changes.json period name like '2005_to_2010'."""
+    prev_year, curr_year = period.split('_to_')
+    return int(prev_year), int(curr_year)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def build_database(db_path: Path, years: list[int], changes_path: Optional[Path] = None) -> dict:
+    """Build the database at db_path and return row counts per table.
+
+    Years are loaded one at a time. The database is written next to db_path
+    and moved into place at the end, so readers never see a partial store.
+    """
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_name(db_path.name + '.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # Nothing to recover if the build dies half way: the temp file is rebuilt
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.executescript(SCHEMA)
+
+        country_ids = {}
+        metric_ids = {}
+        for year in years:
+            print(f"Loading {year}...")
+            countries = load_all_countries(year)
+            rows = []
+            for key, record in countries.items():
+                # Later years win, so names and regions reflect the newest edition
+                country = (record.country, record.region)
+                if key not in country_ids:
+                    country_ids[key] = len(country_ids) + 1
+                    conn.execute('INSERT INTO countries VALUES (?, ?, ?, ?)', (country_ids[key], key, *country))
+                else:
+                    conn.execute('UPDATE countries SET name = ?, region = ? WHERE id = ?',
+                                 (*country, country_ids[key]))
+                for section, metric, value in record.items():
+                    if not _is_number(value):
+                        continue
+                    if metric not in metric_ids:
+                        metric_ids[metric] = len(metric_ids) + 1
+                        conn.execute('INSERT INTO metrics VALUES (?, ?, ?)',
+                                     (metric_ids[metric], metric, section))
+                    rows.append((country_ids[key], metric_ids[metric], year, value))
+            conn.executemany('INSERT INTO observations VALUES (?, ?, ?, ?)', rows)
+            print(f"  {len(countries)} countries, {len(rows)} observations")
+
+        if changes_path is not None:
+            with open(changes_path) as f:
+                changes = json.load(f)
+            change_rows = []
+            alert_rows = []
+            # Metrics with changes but no observation in any loaded year still need a row
+            sections = {metric: section for section, fields in TRACKED_METRICS.items() for metric in fields}
+            for metric in sorted({metric for periods in changes.values() for record in periods.values()
+                                  for metric in record['metrics']} - metric_ids.keys()):
+                if metric not in sections:
+                    print(f"  Warning: {metric} in {changes_path.name} is not a tracked metric, skipping")
+                    continue
+                metric_ids[metric] = len(metric_ids) + 1
+                conn.execute('INSERT INTO metrics VALUES (?, ?, ?)', (metric_ids[metric], metric, sections[metric]))
+            for key, periods in changes.items():
+                if key not in country_ids:
+                    print(f"  Warning: {key} in {changes_path.name} has no extracted data, skipping")
+                    continue
+                for period, record in periods.items():
+                    prev_year, curr_year = parse_period(period)
+                    for metric, change in record['metrics'].items():
+                        if metric not in metric_ids:
+                            continue
+                        change_rows.append((country_ids[key], metric_ids[metric], prev_year, curr_year,
+                                            change['old'], change['new'], change['abs_change'],
+                                            change['pct_change']))
+                    for alert in record['alerts']:
+                        alert_rows.append((country_ids[key], prev_year, curr_year, alert))
+            conn.executemany('INSERT INTO changes VALUES (?, ?, ?, ?, ?, ?, ?, ?)', change_rows)
+            conn.executemany('INSERT INTO alerts VALUES (?, ?, ?, ?)', alert_rows)
+
+        conn.executescript(INDEXES)
+        conn.execute('ANALYZE')
+        conn.commit()
+        counts = {
+            table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            for table in ('countries', 'metrics', 'observations', 'changes', 'alerts')
+        }
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    return counts
+
+
+class FactbookDB:
+    """Read-only queries over a database built by build_database()."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _rows(self, sql: str, params: tuple) -> list[dict]:
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def years(self) -> list[int]:
+        return [row[0] for row in self.conn.execute('SELECT DISTINCT year FROM observations ORDER BY year')]
+
+    def metrics(self) -> list[dict]:
+        return self._rows('SELECT name, section FROM metrics ORDER BY id', ())
+
+    def top(self, metric: str, year: int, limit: int = 20, region: Optional[str] = None,
+            ascending: bool = False) -> list[dict]:
+        """Countries ranked by one metric in one year, highest first unless ascending."""
+        order = 'ASC' if ascending else 'DESC'
+        region_filter = 'AND c.region = ?' if region is not None else ''
+        params = (metric, year) + ((region,) if region is not None else ()) + (limit,)
+        return self._rows(f"""
+            SELECT c.key AS country, c.name, c.region, o.value
+            FROM observations o
+            JOIN metrics m ON m.id = o.metric_id
+            JOIN countries c ON c.id = o.country_id
+            WHERE m.name = ? AND o.year = ? {region_filter}
+            ORDER BY o.value {order}, c.key
+            LIMIT ?
+        """, params)
+
+    def between(self, metric: str, year: int, low: Optional[float] = None,
+                high: Optional[float] = None) -> list[dict]:
+        """Countries whose metric falls in [low, high] in one year, in value order."""
+        # Bounds are only added when given so they become a range on the index
+        bounds = ''
+        params = (metric, year)
+        if low is not None:
+            bounds += ' AND o.value >= ?'
+            params += (low,)
+        if high is not None:
+            bounds += ' AND o.value <= ?'
+            params += (high,)
+        return self._rows(f"""
+            SELECT c.key AS country, c.name, c.region, o.value
+            FROM observations o
+            JOIN metrics m ON m.id = o.metric_id
+            JOIN countries c ON c.id = o.country_id
+            WHERE m.name = ? AND o.year = ?{bounds}
+            ORDER BY o.value, c.key
+        """, params)
+
+    def series(self, country: str, metric: str, start: Optional[int] = None,
+               end: Optional[int] = None) -> list[dict]:
+        """{year, value} points of one country's metric, optionally within [start, end]."""
+        return self._rows("""
+            SELECT o.year, o.value
+            FROM observations o
+            JOIN metrics m ON m.id = o.metric_id
+            JOIN countries c ON c.id = o.country_id
+            WHERE c.key = ? AND m.name = ?
+              AND o.year >= coalesce(?, o.year) AND o.year <= coalesce(?, o.year)
+            ORDER BY o.year
+        """, (country, metric, start, end))
+
+    def region_series(self, region: str, metric: str, start: Optional[int] = None,
+                      end: Optional[int] = None) -> list[dict]:
+        """Every {country, year, value} point of a metric for the countries of one region."""
+        return self._rows("""
+            SELECT c.key AS country, o.year, o.value
+            FROM countries c
+            JOIN metrics m ON m.name = ?
+            JOIN observations o ON o.country_id = c.id AND o.metric_id = m.id
+            WHERE c.region = ?
+              AND o.year >= coalesce(?, o.year) AND o.year <= coalesce(?, o.year)
+            ORDER BY c.key, o.year
+        """, (metric, region, start, end))
+
+    def movers(self, metric: str, from_year: int, to_year: int, limit: int = 20,
+               ascending: bool = False) -> list[dict]:
+        """Largest percentage changes of a metric over one period (smallest first if ascending)."""
+        order = 'ASC' if ascending else 'DESC'
+        return self._rows(f"""
+            SELECT c.key AS country, ch.old, ch.new, ch.abs_change, ch.pct_change
+            FROM changes ch
+            JOIN metrics m ON m.id = ch.metric_id
+            JOIN countries c ON c.id = ch.country_id
+            WHERE ch.from_year = ? AND ch.to_year = ? AND m.name = ? AND ch.pct_change IS NOT NULL
+            ORDER BY ch.pct_change {order}, c.key
+            LIMIT ?
+        """, (from_year, to_year, metric, limit))
+
+    def alerts(self, from_year: Optional[int] = None, to_year: Optional[int] = None,
+               alert: Optional[str] = None, country: Optional[str] = None) -> list[dict]:
+        """Alerts matching every given filter, by period then country."""
+        return self._rows("""
+            SELECT c.key AS country, a.from_year, a.to_year, a.alert
+            FROM alerts a
+            JOIN countries c ON c.id = a.country_id
+            WHERE a.from_year = coalesce(?, a.from_year) AND a.to_year = coalesce(?, a.to_year)
+              AND a.alert = coalesce(?, a.alert) AND c.key = coalesce(?, c.key)
+            ORDER BY a.from_year, a.to_year, c.key, a.alert
+        """, (from_year, to_year, alert, country))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export extracted Factbook data to an indexed SQLite database')
+    parser.add_argument('--db', type=Path, default=DB_PATH, help=f'Database path (default: {DB_PATH})')
+    parser.add_argument('--top', nargs=2, metavar=('METRIC', 'YEAR'),
+                        help='Print the top countries for a metric in a year instead of building')
+    parser.add_argument('--series', nargs=2, metavar=('COUNTRY', 'METRIC'),
+                        help="Print one country's series for a metric instead of building")
+    parser.add_argument('--limit', type=int, default=20, help='Rows for --top')
+    parser.add_argument('--region', help='Only rank countries of this region with --top')
+    args = parser.parse_args()
+
+    if args.top or args.series:
+        if not args.db.exists():
+            print(f"Error: {args.db} not found, run factbook_db.py first")
+            return 1
+        with FactbookDB(args.db) as db:
+            if args.top:
+                metric, year = args.top
+                for rank, row in enumerate(db.top(metric, int(year), args.limit, args.region), 1):
+                    print(f"{rank:>3}. {row['name']:<40} {row['value']:>16,}")
+            else:
+                for row in db.series(*args.series):
+                    print(f"{row['year']}  {row['value']:>16,}")
+        return 0
+
+    years = get_available_years()
+    print(f"Found {len(years)} years of data: {years}")
+    if not years:
+        print(f"Error: No data years found in {DATA_DIR}/ directory")
+        return 1
+
+    changes_path = OUTPUT_DIR / 'changes.json'
+    if not changes_path.exists():
+        print(f"Warning: {changes_path} not found, run merge_timeseries.py first for changes and alerts")
+        changes_path = None
+
+    counts = build_database(args.db, years, changes_path)
+    print(f"\nSaved {args.db}")
+    for table, count in counts.items():
+        print(f"  {table}: {count:,} rows")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -5,21 +5,65 @@ Merge Timeseries Data
 Combines multiple years of extracted Factbook data into time-series
 format for trend analysis.
 
+Besides the tracked metrics, timeseries.json holds the DERIVED_METRICS
+series (trade balance, ratios, per-capita and share-of-GDP figures), so
+pages read them instead of recomputing them. With --fill, missing years
+are filled by interpolation and/or carried forward; filled points are
+marked with "filled". Changes and alerts only use extracted values.
+
 Usage:
     python merge_timeseries.py
+    python merge_timeseries.py --incremental
+    python merge_timeseries.py --horizons 1 5 10
+    python merge_timeseries.py --sharded
+    python merge_timeseries.py --stream
+    python merge_timeseries.py --stats
+    python merge_timeseries.py --fill interpolate forward
 
 Outputs:
     data/_merged/timeseries.json
     data/_merged/changes.json
+    data/_merged/horizons.json   (with --horizons)
+    data/_merged/timeseries/     (with --sharded)
+    data/_merged/_stats.json     (with --stats)
+    data/_countries.json         (country identity index, see country_ids.py)
 """
 
+import argparse
+import bisect
+import hashlib
+import heapq
 import json
+import math
 import os
+import re
+import time
+from array import array
+from operator import add, mul, sub
 from pathlib import Path
 from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import groupby
+from typing import Iterator, Optional
+
+from columnar import COLUMNS_FILE, read_records, read_table
+from country_ids import INDEX_FILE, CountryIndex, aliases_fingerprint, load_index, save_index
+from panel import MetricPanel
+from records import REGISTRY, CountryRecord
+
+NAN = math.nan
 
 DATA_DIR = Path('data')
 OUTPUT_DIR = DATA_DIR / '_merged'
+STATE_FILE = '_state.json'
+STATS_FILE = '_stats.json'
+# Bookkeeping files written next to a year's extracted JSON, not part of its data
+YEAR_CACHE = '_cache.json'
+YEAR_BOOKKEEPING = {YEAR_CACHE, '_stats.json'}
+# 2: countries keyed by country_ids.py IDs
+# 3: fill methods
+STATE_VERSION = 3
 
 # Metrics to track over time
 TRACKED_METRICS = {
@@ -28,8 +72,34 @@ TRACKED_METRICS = {
                 'unemployment_pct', 'exports_billions', 'imports_billions', 'external_debt_billions'],
     'military': ['expenditure_pct_gdp'],
 }
+# (metric, record slot) of every tracked metric
+TRACKED_SLOTS = [
+    (metric, REGISTRY.slot(section, metric)) for section, fields in TRACKED_METRICS.items() for metric in fields
+]
+TRACKED_NAMES = [metric for metric, _ in TRACKED_SLOTS]
 
-# Alert thresholds for significant changes
+# Metrics computed from tracked (or earlier derived) metrics for every country
+# and year: op(args) * scale, rounded to digits (default 2). A missing input
+# or a zero divisor leaves the value missing.
+DERIVED_METRICS = {
+    'trade_balance_billions': {'op': 'sub', 'args': ('exports_billions', 'imports_billions')},
+    'trade_ratio': {'op': 'div', 'args': ('exports_billions', 'imports_billions'), 'digits': 4},
+    'trade_balance_pct_gdp': {'op': 'div', 'args': ('trade_balance_billions', 'gdp_ppp_billions'), 'scale': 100},
+    'external_debt_pct_gdp': {'op': 'div', 'args': ('external_debt_billions', 'gdp_ppp_billions'), 'scale': 100},
+    'exports_per_capita': {'op': 'div', 'args': ('exports_billions', 'population'), 'scale': 1e9},
+    'external_debt_per_capita': {'op': 'div', 'args': ('external_debt_billions', 'population'), 'scale': 1e9},
+}
+
+# --fill methods, and the "filled" marker of the points each adds
+FILL_METHODS = ('interpolate', 'forward')
+FILL_INTERPOLATED = 1
+FILL_FORWARD = 2
+FILL_MARKERS = {FILL_INTERPOLATED: 'interpolated', FILL_FORWARD: 'forward'}
+# Decimal digits of interpolated float values; interpolated ints stay ints
+FILL_DIGITS = 4
+
+# Year-over-year alert thresholds for significant changes (longer horizons
+# are judged by their yearly rate, see compute_changes)
 ALERT_THRESHOLDS = {
     'gdp_ppp_billions': {'change_pct': 20, 'direction': 'any'},
     'gdp_growth_pct': {'change_abs': 5, 'direction': 'any'},
@@ -40,6 +110,17 @@ ALERT_THRESHOLDS = {
 }
 
 
+@lru_cache(maxsize=None)
+def country_index() -> CountryIndex:
+    """The data directory's country identity index, loaded once per run."""
+    return load_index(DATA_DIR)
+
+
+def country_key(name: str) -> str:
+    """Stable ID for any spelling of a country name, so renamed countries share one series."""
+    return country_index().resolve(name)
+
+
 def get_available_years() -> list[int]:
     """Find all year directories in data folder."""
     years = []
@@ -50,33 +131,50 @@ def get_available_years() -> list[int]:
 
 
 def load_all_countries(year: int) -> dict:
-    """Load all countries for a given year."""
+    """Load all countries for a given year as {country_key: CountryRecord}.
+    
+    Uses the year's columnar bundle when extract_factbook.py wrote one,
+    otherwise parses every per-country JSON file.
+    """
     year_dir = DATA_DIR / str(year)
+    if (year_dir / COLUMNS_FILE).exists():
+        try:
+            return load_columnar_countries(year)
+        except (OSError, ValueError) as e:
+            print(f"  Warning: Could not load {year_dir / COLUMNS_FILE}: {e}")
+    
     countries = {}
     
     for filepath in year_dir.glob('*.json'):
-        if filepath.name == '_index.json':
+        # Skip _index.json, _cache.json and other bookkeeping files
+        if filepath.name.startswith('_'):
             continue
         try:
             with open(filepath) as f:
-                data = json.load(f)
-                # Use lowercase name as key for matching
-                key = data['country'].lower().replace(' ', '_')
-                countries[key] = data
+                record = CountryRecord.from_dict(json.load(f))
+            # Key by stable ID so every edition's spelling matches
+            countries[country_key(record.country)] = record
         except Exception as e:
             print(f"  Warning: Could not load {filepath}: {e}")
     
     return countries
 
 
-def extract_metrics(country_data: dict) -> dict:
-    """Extract tracked metrics from country data."""
+def load_columnar_countries(year: int) -> dict:
+    """Load all countries for a given year from its columnar bundle."""
+    countries = {}
+    for record in read_records(DATA_DIR / str(year) / COLUMNS_FILE):
+        countries[country_key(record.country)] = record
+    return countries
+
+
+def extract_metrics(record: CountryRecord) -> dict:
+    """Extract tracked metrics from a country record."""
     metrics = {}
-    for section, fields in TRACKED_METRICS.items():
-        section_data = country_data.get(section, {})
-        for field in fields:
-            if field in section_data and section_data[field] is not None:
-                metrics[field] = section_data[field]
+    for metric, slot in TRACKED_SLOTS:
+        value = record.value(slot)
+        if value is not None:
+            metrics[metric] = value
     return metrics
 
 
@@ -127,108 +225,1087 @@ def check_alerts(metric: str, change: dict) -> list[str]:
     return alerts
 
 
-def main():
-    years = get_available_years()
-    print(f"Found {len(years)} years of data: {years}")
+def consecutive_periods(years: list[int]) -> list[tuple[int, int]]:
+    """(previous, current) pairs for each year after the first."""
+    return list(zip(years, years[1:]))
+
+
+def period_name(prev_year: int, curr_year: int) -> str:
+    return f"{prev_year}_to_{curr_year}"
+
+
+def annual_pct(pct_change: float, span: int) -> float:
+    """Yearly percent change that compounds to pct_change over span years."""
+    if pct_change <= -100:
+        return -100.0
+    return ((1 + pct_change / 100) ** (1 / span) - 1) * 100
+
+
+def compute_changes(panel: MetricPanel, periods: list[tuple[int, int]] = None, annualize: bool = False) -> dict:
+    """Changes and alerts for every country over each period, column by column.
     
-    if len(years) < 1:
-        print("Error: No data years found in data/ directory")
-        return 1
+    Periods default to consecutive panel years. Gives the same records as
+    calculate_change() and check_alerts() applied to each country pair, with
+    metrics and alerts in TRACKED_METRICS order. The per-pair arithmetic
+    still runs in Python comprehensions over the array('d') columns: this
+    saves the per-country dicts and calls, it is not vectorised.
+    
+    With annualize=True, alerts of periods longer than a year judge the
+    average yearly change (CAGR for percent thresholds, change per year for
+    absolute ones) instead.
+    """
+    changes = defaultdict(dict)
+    if periods is None:
+        periods = consecutive_periods(panel.years)
+    
+    for prev_year, curr_year in periods:
+        period = period_name(prev_year, curr_year)
+        prev_pos = panel.year_index[prev_year]
+        curr_pos = panel.year_index[curr_year]
+        period_metrics = defaultdict(dict)
+        period_alerts = defaultdict(list)
+        span = curr_year - prev_year
+        
+        for metric in panel.metrics:
+            old_col = panel.values[metric][prev_pos]
+            new_col = panel.values[metric][curr_pos]
+            old_ints = panel.ints[metric][prev_pos]
+            new_ints = panel.ints[metric][curr_pos]
+            
+            # NaN in either year propagates, so d == d marks pairs with both values
+            diffs = list(map(sub, new_col, old_col))
+            pairs = [i for i, d in enumerate(diffs) if d == d]
+            
+            abs_changes = {}
+            pct_changes = {}
+            for i in pairs:
+                old_val = int(old_col[i]) if old_ints[i] else old_col[i]
+                new_val = int(new_col[i]) if new_ints[i] else new_col[i]
+                abs_change = new_val - old_val
+                pct_change = (abs_change / abs(old_val) * 100) if old_val != 0 else None
+                abs_changes[i] = round(abs_change, 2)
+                pct_changes[i] = round(pct_change, 2) if pct_change else None
+                period_metrics[i][metric] = {
+                    'old': old_val,
+                    'new': new_val,
+                    'abs_change': abs_changes[i],
+                    'pct_change': pct_changes[i]
+                }
+            
+            threshold = ALERT_THRESHOLDS.get(metric)
+            if not threshold:
+                continue
+            if annualize and span > 1:
+                # ALERT_THRESHOLDS are year-over-year, so compare yearly rates
+                pct_changes = {i: annual_pct(pct, span) if pct else pct for i, pct in pct_changes.items()}
+                abs_changes = {i: change / span for i, change in abs_changes.items()}
+            direction = threshold['direction']
+            if 'change_pct' in threshold:
+                target = threshold['change_pct']
+                if direction == 'any':
+                    hits = [i for i in pairs if pct_changes[i] and abs(pct_changes[i]) >= abs(target)]
+                    name = f"{metric}_major_change"
+                elif direction == 'increase':
+                    hits = [i for i in pairs if pct_changes[i] and pct_changes[i] >= target]
+                    name = f"{metric}_spike"
+                else:
+                    hits = [i for i in pairs if pct_changes[i] and pct_changes[i] <= target]
+                    name = f"{metric}_decline"
+                for i in hits:
+                    period_alerts[i].append(name)
+            if 'change_abs' in threshold:
+                target = threshold['change_abs']
+                if direction == 'increase':
+                    hits = [i for i in pairs if abs_changes[i] >= target]
+                    name = f"{metric}_spike"
+                elif direction == 'decrease':
+                    hits = [i for i in pairs if abs_changes[i] <= -target]
+                    name = f"{metric}_decline"
+                else:
+                    hits = []
+                for i in hits:
+                    period_alerts[i].append(name)
+        
+        for i in sorted(period_metrics):
+            changes[panel.countries[i]][period] = {
+                'metrics': period_metrics[i],
+                'alerts': period_alerts.get(i, [])
+            }
+    
+    return changes
+
+
+def add_cagr(panel: MetricPanel, changes: dict, periods: list[tuple[int, int]]):
+    """Add compound annual growth rates to change records, in place."""
+    for prev_year, curr_year in periods:
+        span = curr_year - prev_year
+        period = period_name(prev_year, curr_year)
+        for metric in panel.metrics:
+            old_col = panel.column(metric, prev_year)
+            new_col = panel.column(metric, curr_year)
+            # Growth rates are only defined between positive values (NaN fails too)
+            for i in [i for i, (old, new) in enumerate(zip(old_col, new_col)) if old > 0 and new > 0]:
+                cagr = ((new_col[i] / old_col[i]) ** (1 / span) - 1) * 100
+                changes[panel.countries[i]][period]['metrics'][metric]['cagr_pct'] = round(cagr, 2)
+
+
+def rolling_slopes(panel: MetricPanel, horizon: int) -> dict:
+    """Least-squares trend (units per year) over each trailing horizon window.
+    
+    Returns {country: {metric: {end_year: slope}}}. Uses running sums over the
+    year axis, so every window costs the same no matter how many windows
+    overlap it. Windows need two or more values.
+    """
+    trends = defaultdict(lambda: defaultdict(dict))
+    size = len(panel.countries)
+    base = panel.years[0]
+    
+    for metric in panel.metrics:
+        # Prefix sums of n, x, y, xy, xx over year positions, per country
+        sums = [[array('d', [0.0]) * size for _ in range(5)]]
+        for year, column in zip(panel.years, panel.values[metric]):
+            x = year - base
+            n, sx, sy, sxy, sxx = (list(col) for col in sums[-1])
+            for i, y in enumerate(column):
+                if y == y:
+                    n[i] += 1
+                    sx[i] += x
+                    sy[i] += y
+                    sxy[i] += x * y
+                    sxx[i] += x * x
+            sums.append([array('d', col) for col in (n, sx, sy, sxy, sxx)])
+        
+        for end_pos, end_year in enumerate(panel.years):
+            start_pos = bisect.bisect_left(panel.years, end_year - horizon)
+            if start_pos >= end_pos:
+                continue
+            hi, lo = sums[end_pos + 1], sums[start_pos]
+            for i in range(size):
+                n = hi[0][i] - lo[0][i]
+                if n < 2:
+                    continue
+                sx = hi[1][i] - lo[1][i]
+                sy = hi[2][i] - lo[2][i]
+                denominator = n * (hi[4][i] - lo[4][i]) - sx * sx
+                if denominator == 0:
+                    continue
+                slope = (n * (hi[3][i] - lo[3][i]) - sx * sy) / denominator
+                trends[panel.countries[i]][metric][str(end_year)] = round(slope, 4)
+    return trends
+
+
+def compute_horizons(panel: MetricPanel, horizons: list[int]) -> dict:
+    """Changes, CAGR, trend slopes and alerts for several horizons at once.
+    
+    A horizon of h years compares each year with the year h earlier when both
+    were loaded; horizon 1 compares consecutive loaded editions, so gaps
+    between editions still give periods. Alerts judge each window's yearly
+    rate against the year-over-year ALERT_THRESHOLDS. Windows shared by
+    several horizons are computed once.
+    """
+    windows = {
+        horizon: consecutive_periods(panel.years) if horizon == 1 else
+        [(year - horizon, year) for year in panel.years if year - horizon in panel.year_index]
+        for horizon in horizons
+    }
+    unique = sorted({window for periods in windows.values() for window in periods})
+    window_changes = compute_changes(panel, unique, annualize=True)
+    add_cagr(panel, window_changes, unique)
+    
+    result = {'horizons': horizons}
+    for horizon, periods in windows.items():
+        names = [period_name(*period) for period in periods]
+        changes = {}
+        for country_key, country_periods in window_changes.items():
+            selected = {name: country_periods[name] for name in names if name in country_periods}
+            if selected:
+                changes[country_key] = selected
+        alerts = [
+            {'country': country_key, 'period': name, 'alerts': record['alerts']}
+            for country_key, country_periods in changes.items()
+            for name, record in country_periods.items() if record['alerts']
+        ]
+        alerts.sort(key=lambda entry: -len(entry['alerts']))
+        result[str(horizon)] = {
+            'periods': names,
+            'changes': changes,
+            'alerts': alerts,
+            'trends': rolling_slopes(panel, horizon),
+        }
+    return result
+
+
+def save_sharded_timeseries(timeseries: dict, shard_dir: Path) -> tuple[dict, int]:
+    """Write compact per-country and per-metric timeseries shards plus a manifest.
+    
+    Layout:
+        countries/<country_key>.json   {metric: [{year, value}, ...]}
+        metrics/<metric>.json          {country_key: [{year, value}, ...]}
+        manifest.json                  file, byte size and SHA-256 of every shard
+    
+    Shards whose hash matches the previous manifest are not rewritten, so
+    their mtimes stay stable. Returns the manifest and the number of shards
+    written.
+    """
+    try:
+        with open(shard_dir / 'manifest.json') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+    
+    by_metric = defaultdict(dict)
+    for country_key, series in timeseries.items():
+        for metric, points in series.items():
+            by_metric[metric][country_key] = points
+    
+    manifest = {'countries': {}, 'metrics': {}}
+    written = 0
+    for kind, shards in (('countries', timeseries), ('metrics', by_metric)):
+        kind_dir = shard_dir / kind
+        kind_dir.mkdir(parents=True, exist_ok=True)
+        for key, shard in shards.items():
+            content = json.dumps(shard, separators=(',', ':')).encode('utf-8')
+            filename = f"{kind}/{key}.json"
+            entry = {
+                'file': filename,
+                'bytes': len(content),
+                'sha256': hashlib.sha256(content).hexdigest()
+            }
+            filepath = shard_dir / filename
+            if previous.get(kind, {}).get(key) != entry or not filepath.exists():
+                filepath.write_bytes(content)
+                written += 1
+            manifest[kind][key] = entry
+        # Drop shards of countries or metrics that are gone
+        expected = {entry['file'] for entry in manifest[kind].values()}
+        for filepath in kind_dir.glob('*.json'):
+            if f"{kind}/{filepath.name}" not in expected:
+                filepath.unlink()
+    
+    if manifest != previous:
+        with open(shard_dir / 'manifest.json', 'w') as f:
+            json.dump(manifest, f, indent=2)
+    return manifest, written
+
+
+@contextmanager
+def stage(stats: Optional[dict], name: str):
+    """Add the time spent in the block to stats['seconds'][name]; no-op without stats."""
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = stats.setdefault('seconds', {})
+        seconds[name] = seconds.get(name, 0.0) + time.perf_counter() - start
+
+
+def count_coverage(stats: Optional[dict], country_key: str, series: dict):
+    """Tally one country's values per metric into stats['metrics']; filled points don't count."""
+    if stats is None:
+        return
+    metrics = stats.setdefault('metrics', {})
+    for metric, points in series.items():
+        observations = sum(1 for point in points if 'filled' not in point)
+        if not observations:
+            continue
+        counts = metrics.setdefault(metric, {'observations': 0, 'countries': 0})
+        counts['observations'] += observations
+        counts['countries'] += 1
+
+
+def iter_year_metrics(year: int) -> Iterator[tuple[str, dict]]:
+    """Yield (country_key, tracked metrics) for one year in sorted key order.
+    
+    Only the key-to-file listing (or the bundle's tracked columns) is held
+    for the year; country files are parsed one at a time as they are yielded.
+    """
+    year_dir = DATA_DIR / str(year)
+    if (year_dir / COLUMNS_FILE).exists():
+        try:
+            table = read_table(year_dir / COLUMNS_FILE)
+        except (OSError, ValueError) as e:
+            print(f"  Warning: Could not load {year_dir / COLUMNS_FILE}: {e}")
+        else:
+            kinds = {column['key']: column['kind'] for column in table['numeric']}
+            columns = [
+                (metric, table['columns'][f"{section}/{metric}"], kinds[f"{section}/{metric}"] == 'int')
+                for section, fields in TRACKED_METRICS.items() for metric in fields
+                if f"{section}/{metric}" in kinds
+            ]
+            keys = {country_key(name): i for i, name in enumerate(table['countries'])}
+            del table
+            for key in sorted(keys):
+                i = keys[key]
+                yield key, {
+                    metric: int(column[i]) if is_int else column[i]
+                    for metric, column, is_int in columns if not math.isnan(column[i])
+                }
+            return
+    
+    files = {}
+    try:
+        with open(year_dir / '_index.json') as f:
+            for entry in json.load(f)['countries']:
+                files[country_key(entry['name'])] = year_dir / entry['file']
+    except (OSError, ValueError, KeyError):
+        # No usable index: read each file once just to learn its key
+        for filepath in year_dir.glob('*.json'):
+            if filepath.name.startswith('_'):
+                continue
+            try:
+                with open(filepath) as f:
+                    files[country_key(json.load(f)['country'])] = filepath
+            except Exception as e:
+                print(f"  Warning: Could not load {filepath}: {e}")
+    
+    for key in sorted(files):
+        try:
+            with open(files[key]) as f:
+                yield key, extract_metrics(CountryRecord.from_dict(json.load(f)))
+        except Exception as e:
+            print(f"  Warning: Could not load {files[key]}: {e}")
+
+
+def country_changes(history: dict, periods: list[tuple[int, int]]) -> dict:
+    """Change records of one country from its {year: metrics} history."""
+    changes = {}
+    for prev_year, curr_year in periods:
+        old, new = history.get(prev_year), history.get(curr_year)
+        if old is None or new is None:
+            continue
+        metrics = {}
+        alerts = []
+        for metric in old.keys() & new.keys():
+            metrics[metric] = calculate_change(old[metric], new[metric])
+        if not metrics:
+            continue
+        ordered = {}
+        for section_fields in TRACKED_METRICS.values():
+            for metric in section_fields:
+                if metric in metrics:
+                    ordered[metric] = metrics[metric]
+                    alerts.extend(check_alerts(metric, metrics[metric]))
+        changes[period_name(prev_year, curr_year)] = {'metrics': ordered, 'alerts': alerts}
+    return changes
+
+
+# Top-level member keys of a JSON object laid out like json.dump(indent=2)
+MEMBER_KEY = re.compile(r'^  ("(?:[^"\\\n]|\\.)*"): ', re.M)
+
+
+def member_text(value, depth: int = 1) -> str:
+    """JSON text of a value nested `depth` levels deep in a json.dump(indent=2) layout."""
+    return json.dumps(value, indent=2).replace('\n', '\n' + '  ' * depth)
+
+
+def read_members(path: Path) -> Optional[dict]:
+    """{key: JSON text} of each member of an object written with indent=2.
+    
+    Lets an incremental merge parse and rewrite only the members it changes.
+    Returns None if the file is missing or laid out some other way.
+    """
+    try:
+        with open(path) as f:
+            text = f.read()
+    except OSError:
+        return None
+    if text == '{}':
+        return {}
+    if not text.startswith('{\n  "') or not text.endswith('\n}'):
+        return None
+    members = {}
+    matches = list(MEMBER_KEY.finditer(text))
+    # Each value runs up to the ",\n" before the next key, the last up to "\n}"
+    ends = [match.start() - 2 for match in matches[1:]] + [len(text) - 2]
+    for match, end in zip(matches, ends):
+        members[json.loads(match.group(1))] = text[match.end():end]
+    return members
+
+
+def append_members(text: str, members: dict) -> str:
+    """Object member text from read_members() with more members added at its end."""
+    added = ''.join(f",\n    {json.dumps(key)}: {member_text(value, 2)}" for key, value in members.items())
+    return text[:-len('\n  }')] + added + '\n  }'
+
+
+def first_member_key(text: str) -> str:
+    """Key of the first member of object member text from read_members()."""
+    start = len('{\n    ')
+    return json.loads(text[start:text.index('": ', start) + 1])
+
+
+def last_member_key(text: str) -> str:
+    """Key of the last member of object member text from read_members()."""
+    start = text.rfind('\n    "') + len('\n    ')
+    return json.loads(text[start:text.index('": ', start) + 1])
+
+
+class JSONObjectWriter:
+    """Writes one JSON object member at a time, laid out like json.dump(indent=2)."""
+    
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+    
+    def write(self, key: str, value):
+        self.write_text(key, member_text(value))
+    
+    def write_text(self, key: str, text: str):
+        """Write a member whose value is already laid out by member_text()."""
+        self.f.write(('{\n  ' if self.count == 0 else ',\n  ') + json.dumps(key) + ': ' + text)
+        self.count += 1
+    
+    def close(self):
+        self.f.write('\n}' if self.count else '{}')
+
+
+def write_members(path: Path, members: dict):
+    """Write {key: JSON text} from read_members() back as one object."""
+    with open(path, 'w') as f:
+        writer = JSONObjectWriter(f)
+        for key, text in members.items():
+            writer.write_text(key, text)
+        writer.close()
+
+
+def merge_streaming(years: list[int], fingerprints: dict, stats: Optional[dict] = None,
+                    fill: tuple = ()) -> dict:
+    """Full merge as a k-way merge over years, writing outputs as it goes.
+    
+    Countries are walked in sorted key order across every year at once, so
+    only one country's history is in memory; its series and change records
+    go straight to timeseries.json and changes.json. Returns the merge state.
+    """
+    periods = consecutive_periods(years)
+    countries = {year: [] for year in years}
+    alerts = {}
+    
+    def tagged(year):
+        for key, metrics in iter_year_metrics(year):
+            yield key, year, metrics
+    
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(OUTPUT_DIR / 'timeseries.json', 'w') as ts_file, open(OUTPUT_DIR / 'changes.json', 'w') as ch_file:
+        timeseries_out = JSONObjectWriter(ts_file)
+        changes_out = JSONObjectWriter(ch_file)
+        merged = heapq.merge(*(tagged(year) for year in years), key=lambda item: (item[0], item[1]))
+        for country_key, records in groupby(merged, key=lambda item: item[0]):
+            history = {}
+            for _, year, metrics in records:
+                history[year] = metrics
+                countries[year].append(country_key)
+            
+            series = country_series(country_key, history, years, fill)
+            if series:
+                timeseries_out.write(country_key, series)
+                count_coverage(stats, country_key, series)
+            
+            changes = country_changes(history, periods)
+            if changes:
+                changes_out.write(country_key, changes)
+                alerts.update(alert_totals({country_key: changes}))
+        timeseries_out.close()
+        changes_out.close()
+    return merge_state(years, fingerprints, countries, fill, alerts)
+
+
+def year_fingerprint(year: int) -> str:
+    """Fingerprint of a year's extraction, to spot re-extracted years.
+    
+    Hashes the extractor's _cache.json (input hash, extractor version and
+    field config) with the name, size and mtime of every data file, so no
+    country file is read. Extractions only rewrite files whose content
+    changed, so an unchanged year keeps its fingerprint, while a rewrite
+    that bypasses the cache (extract_factbook.py --stats) still shows.
+    """
+    digest = hashlib.sha256()
+    year_dir = DATA_DIR / str(year)
+    try:
+        digest.update((year_dir / YEAR_CACHE).read_bytes())
+    except OSError:
+        pass
+    for filepath in sorted([*year_dir.glob('*.json'), year_dir / COLUMNS_FILE]):
+        # _cache.json and _stats.json only describe how the files were produced
+        if filepath.name in YEAR_BOOKKEEPING or not filepath.exists():
+            continue
+        info = filepath.stat()
+        digest.update(f"{filepath.name}\0{info.st_size}\0{info.st_mtime_ns}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def divide(numerator: float, denominator: float) -> float:
+    return numerator / denominator if denominator else NAN
+
+
+# DERIVED_METRICS op name -> function of two floats (NaN in, NaN out)
+DERIVED_OPS = {'add': add, 'sub': sub, 'mul': mul, 'div': divide}
+
+
+def derive_columns(panel: MetricPanel) -> dict:
+    """{metric: float64 column per year} of every DERIVED_METRICS formula.
+    
+    Each formula is applied column by column over the panel's float64 arrays;
+    metrics derived from other derived metrics use their unrounded values.
+    """
+    exact = {}
+    derived = {}
+    for metric, formula in DERIVED_METRICS.items():
+        op = DERIVED_OPS[formula['op']]
+        scale = formula.get('scale', 1)
+        digits = formula.get('digits', 2)
+        left, right = (exact[arg] if arg in exact else panel.values[arg] for arg in formula['args'])
+        exact[metric] = [array('d', [op(a, b) * scale for a, b in zip(left_col, right_col)])
+                         for left_col, right_col in zip(left, right)]
+        derived[metric] = [array('d', [round(value, digits) for value in column]) for column in exact[metric]]
+    return derived
+
+
+def fill_gaps(panel: MetricPanel, methods: tuple) -> dict:
+    """Fill missing years of every country's series in place.
+    
+    'interpolate' fills years between two values linearly by year;
+    'forward' carries the last value forward, up to the last year the
+    country has any value. With both, gaps between values are interpolated
+    and later ones carried forward. Returns {metric: [bytearray per year]}
+    holding the FILL_* code of each filled value.
+    """
+    years = panel.years
+    size = len(panel.countries)
+    interpolate = 'interpolate' in methods
+    forward = 'forward' in methods
+    
+    last_seen = [-1] * size
+    for columns in panel.values.values():
+        for year_pos, column in enumerate(columns):
+            for i in [i for i, value in enumerate(column) if value == value and year_pos > last_seen[i]]:
+                last_seen[i] = year_pos
+    
+    filled = {}
+    for metric in panel.metrics:
+        columns = panel.values[metric]
+        ints = panel.ints[metric]
+        flags = [bytearray(size) for _ in years]
+        # Next known value and its year after each year position, per country
+        following = [None] * len(years)
+        if interpolate:
+            next_value = array('d', [NAN]) * size
+            next_year = array('d', [NAN]) * size
+            for year_pos in range(len(years) - 1, -1, -1):
+                following[year_pos] = (array('d', next_value), array('d', next_year))
+                for i, value in enumerate(columns[year_pos]):
+                    if value == value:
+                        next_value[i] = value
+                        next_year[i] = years[year_pos]
+        
+        # Last known value, its year and int flag, per country
+        prev_value = array('d', [NAN]) * size
+        prev_year = array('d', [NAN]) * size
+        prev_int = bytearray(size)
+        for year_pos, (year, column) in enumerate(zip(years, columns)):
+            known = [i for i, value in enumerate(column) if value == value]
+            # NaN fails value == value, so only gaps after a known value are kept
+            gaps = [i for i, (value, prev) in enumerate(zip(column, prev_value)) if value != value and prev == prev]
+            for i in gaps:
+                if interpolate and following[year_pos][0][i] == following[year_pos][0][i]:
+                    after, after_year = following[year_pos][0][i], following[year_pos][1][i]
+                    value = prev_value[i] + (after - prev_value[i]) * (year - prev_year[i]) / (after_year - prev_year[i])
+                    column[i] = round(value) if prev_int[i] else round(value, FILL_DIGITS)
+                    ints[year_pos][i] = prev_int[i]
+                    flags[year_pos][i] = FILL_INTERPOLATED
+                elif forward and year_pos <= last_seen[i]:
+                    column[i] = prev_value[i]
+                    ints[year_pos][i] = prev_int[i]
+                    flags[year_pos][i] = FILL_FORWARD
+            for i in known:
+                prev_value[i] = column[i]
+                prev_year[i] = year
+                prev_int[i] = ints[year_pos][i]
+        filled[metric] = flags
+    return filled
+
+
+def series_panel(panel: MetricPanel, fill: tuple = ()) -> tuple[MetricPanel, dict]:
+    """Copy of a tracked-metric panel with DERIVED_METRICS added and gaps filled.
     
-    # Load all data
+    Returns the panel and the fill_gaps() flags ({} without fill methods).
+    """
+    series = panel.copy()
+    for metric, columns in derive_columns(panel).items():
+        series.add_metric(metric, columns)
+    filled = fill_gaps(series, fill) if fill else {}
+    return series, filled
+
+
+def build_timeseries(panel: MetricPanel, filled: Optional[dict] = None) -> dict:
+    """Per-country, per-metric lists of {year, value} points; filled points are marked."""
+    filled = filled or {}
+    columns = [(metric, panel.values[metric], panel.ints[metric], filled.get(metric)) for metric in panel.metrics]
+    timeseries = {}
+    for index, country_key in enumerate(panel.countries):
+        series = {}
+        for year_pos, year in enumerate(panel.years):
+            for metric, values, ints, flags in columns:
+                value = values[year_pos][index]
+                if value == value:
+                    point = {
+                        'year': year,
+                        'value': int(value) if ints[year_pos][index] else value
+                    }
+                    if flags and flags[year_pos][index]:
+                        point['filled'] = FILL_MARKERS[flags[year_pos][index]]
+                    series.setdefault(metric, []).append(point)
+        if series:
+            timeseries[country_key] = series
+    return timeseries
+
+
+def country_series(country_key: str, history: dict, years: list[int], fill: tuple = ()) -> dict:
+    """Timeseries of one country from its {year: tracked metrics} history."""
+    panel = MetricPanel(years, [country_key], list(TRACKED_NAMES))
+    for year, metrics in history.items():
+        year_pos = panel.year_index[year]
+        panel.present[year_pos][0] = 1
+        for metric, value in metrics.items():
+            panel.set(metric, year_pos, 0, value)
+    return build_timeseries(*series_panel(panel, fill)).get(country_key, {})
+
+
+def observed_timeseries(timeseries: dict) -> dict:
+    """A timeseries without derived metrics and filled points."""
+    observed = {}
+    for country_key, series in timeseries.items():
+        kept = {}
+        for metric, points in series.items():
+            if metric in DERIVED_METRICS:
+                continue
+            points = [point for point in points if 'filled' not in point]
+            if points:
+                kept[metric] = points
+        if kept:
+            observed[country_key] = kept
+    return observed
+
+
+def rebuild_timeseries(timeseries: dict, years: list[int], fill: tuple = ()) -> dict:
+    """Derived and filled series for an observed timeseries, countries kept in its order."""
+    panel = MetricPanel(years, list(timeseries), list(TRACKED_NAMES))
+    for index, series in enumerate(timeseries.values()):
+        for metric, points in series.items():
+            if metric not in panel.values:
+                continue
+            for point in points:
+                year_pos = panel.year_index.get(point['year'])
+                if year_pos is not None:
+                    panel.set(metric, year_pos, index, point['value'])
+    return build_timeseries(*series_panel(panel, fill))
+
+
+def load_derived_metrics() -> dict:
+    """{year: {country key: {metric: value}}} of the DERIVED_METRICS in timeseries.json.
+    
+    Filled points are skipped, so a country only has values for the years it
+    was extracted. Empty until the first merge.
+    """
+    try:
+        with open(OUTPUT_DIR / 'timeseries.json') as f:
+            timeseries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    derived = defaultdict(lambda: defaultdict(dict))
+    for country_key, series in timeseries.items():
+        for metric in DERIVED_METRICS:
+            for point in series.get(metric, ()):
+                if 'filled' not in point:
+                    derived[point['year']][country_key][metric] = point['value']
+    return {year: dict(countries) for year, countries in derived.items()}
+
+
+def load_years(years: list[int]) -> dict:
     all_data = {}
     for year in years:
         print(f"Loading {year}...")
         all_data[year] = load_all_countries(year)
         print(f"  Loaded {len(all_data[year])} countries")
+    return all_data
+
+
+def merge_full(years: list[int], fingerprints: dict, stats: Optional[dict] = None,
+               fill: tuple = ()) -> tuple[dict, dict, dict, MetricPanel]:
+    """Load every year and rebuild timeseries, changes and merge state."""
+    with stage(stats, 'load'):
+        all_data = load_years(years)
+    with stage(stats, 'build_panel'):
+        panel = MetricPanel.from_country_data(all_data, years, TRACKED_METRICS)
+    with stage(stats, 'derive_metrics'):
+        series, filled = series_panel(panel, fill)
+    with stage(stats, 'build_timeseries'):
+        timeseries = build_timeseries(series, filled)
     
-    # Build timeseries
-    timeseries = defaultdict(lambda: defaultdict(list))
-    all_countries = set()
+    # Calculate changes between consecutive years
+    with stage(stats, 'compute_changes'):
+        changes = compute_changes(panel)
     
-    for year in years:
-        for country_key, country_data in all_data[year].items():
-            all_countries.add(country_key)
-            metrics = extract_metrics(country_data)
-            
-            for metric, value in metrics.items():
-                timeseries[country_key][metric].append({
-                    'year': year,
-                    'value': value
-                })
+    state = merge_state(years, fingerprints, all_data, fill, alert_totals(changes))
+    return timeseries, changes, state, panel
+
+
+def merge_state(years: list[int], fingerprints: dict, countries: dict, fill: tuple, alerts: dict) -> dict:
+    """State of a merge, read back by --incremental runs.
     
-    # Calculate changes between consecutive years
-    changes = defaultdict(dict)
+    countries maps each year to the keys of the countries loaded for it;
+    alerts holds each country's total alert count, for the summary.
+    """
+    return {
+        'version': STATE_VERSION,
+        'aliases': aliases_fingerprint(),
+        'fill': list(fill),
+        'years': {
+            str(year): {'fingerprint': fingerprints[year], 'countries': list(countries[year])}
+            for year in years
+        },
+        'alerts': alerts,
+    }
+
+
+def alert_totals(changes: dict) -> dict:
+    """{country_key: alert count over all periods} of countries with alerts."""
+    totals = {}
+    for country_key, periods in changes.items():
+        total_alerts = sum(len(p.get('alerts', [])) for p in periods.values())
+        if total_alerts > 0:
+            totals[country_key] = total_alerts
+    return totals
+
+
+def load_merge_state() -> Optional[dict]:
+    """State of the previous merge, or None if missing or outdated."""
+    try:
+        with open(OUTPUT_DIR / STATE_FILE) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # Changed aliases can re-key countries in any year
+    if state.get('version') != STATE_VERSION or state.get('aliases') != aliases_fingerprint():
+        return None
+    return state
+
+
+def stale_years(state: dict, years: list[int], fingerprints: dict) -> set[int]:
+    """Years added, removed or re-extracted since the merge that wrote state."""
+    old_years = {int(year) for year in state['years']}
+    return {
+        year for year in old_years | set(years)
+        if year not in years or year not in old_years
+        or state['years'][str(year)]['fingerprint'] != fingerprints[year]
+    }
+
+
+def merge_incremental(years: list[int], fingerprints: dict, state: dict,
+                      fill: tuple = ()) -> Optional[tuple[dict, dict, dict]]:
+    """Patch the previous merge for added, removed and re-extracted years only.
     
-    for i in range(1, len(years)):
-        prev_year = years[i-1]
-        curr_year = years[i]
-        period = f"{prev_year}_to_{curr_year}"
-        
-        for country_key in all_countries:
-            prev_data = all_data[prev_year].get(country_key, {})
-            curr_data = all_data[curr_year].get(country_key, {})
-            
-            if not prev_data or not curr_data:
-                continue
-            
-            prev_metrics = extract_metrics(prev_data)
-            curr_metrics = extract_metrics(curr_data)
-            
-            country_changes = {}
-            country_alerts = []
-            
-            for metric in set(prev_metrics.keys()) | set(curr_metrics.keys()):
-                change = calculate_change(
-                    prev_metrics.get(metric),
-                    curr_metrics.get(metric)
-                )
-                if change:
-                    country_changes[metric] = change
-                    country_alerts.extend(check_alerts(metric, change))
-            
-            if country_changes:
-                changes[country_key][period] = {
-                    'metrics': country_changes,
-                    'alerts': country_alerts
-                }
+    Only countries with values in those years are parsed and rebuilt,
+    derived metrics and fills included; change records of untouched periods
+    are kept and new periods appended. Every other country keeps its
+    previous JSON text. Returns ({country_key: timeseries JSON text},
+    {country_key: changes JSON text}, state) for write_members(), or None
+    when the previous outputs are unusable.
+    """
+    timeseries = read_members(OUTPUT_DIR / 'timeseries.json')
+    changes = read_members(OUTPUT_DIR / 'changes.json')
+    if timeseries is None or changes is None:
+        return None
+    
+    old_years = sorted(int(year) for year in state['years'])
+    old_countries = {year: set(state['years'][str(year)]['countries']) for year in old_years}
+    stale = stale_years(state, years, fingerprints)
+    if stale:
+        print(f"Updating years: {sorted(stale)}")
+    else:
+        print(f"Fill methods changed to {list(fill)}, refilling timeseries")
+    
+    # Periods whose endpoints are both unchanged keep their records
+    new_periods = consecutive_periods(years)
+    kept = {
+        period_name(*period) for period in consecutive_periods(old_years)
+        if period in new_periods and not stale & set(period)
+    }
+    todo = [period for period in new_periods if period_name(*period) not in kept]
+    
+    needed = sorted({year for period in todo for year in period} | (stale & set(years)))
+    all_data = load_years(needed)
+    
+    # Timeseries: countries with values in a stale year, before or after it changed
+    touched = set()
+    for year in stale:
+        touched.update(old_countries.get(year, ()), all_data.get(year, ()))
+    if state.get('fill') != list(fill):
+        touched.update(timeseries)
+    elif fill:
+        # An added or removed year inside a country's span can gain or lose fills
+        spans = defaultdict(list)
+        for year in old_years:
+            for country_key in old_countries[year]:
+                spans[country_key].append(year)
+        moved = set(years) ^ set(old_years)
+        touched.update(key for key, span in spans.items() if any(span[0] < year < span[-1] for year in moved))
+    
+    # Previous countries keep their place, new ones follow in load order
+    loaded = dict.fromkeys(key for year in sorted(stale & set(years)) for key in all_data[year])
+    observed = {}
+    for country_key in [*(key for key in timeseries if key in touched), *(key for key in loaded if key not in timeseries)]:
+        text = timeseries.get(country_key)
+        series = observed_timeseries({country_key: json.loads(text)}).get(country_key, {}) if text else {}
+        for metric in list(series):
+            series[metric] = [point for point in series[metric] if point['year'] not in stale]
+            if not series[metric]:
+                del series[metric]
+        observed[country_key] = series
+    for year in sorted(stale & set(years)):
+        for country_key, record in all_data[year].items():
+            for metric, value in extract_metrics(record).items():
+                points = observed[country_key].setdefault(metric, [])
+                position = bisect.bisect([point['year'] for point in points], year)
+                points.insert(position, {'year': year, 'value': value})
+    rebuilt = rebuild_timeseries({key: series for key, series in observed.items() if series}, years, fill)
+    for country_key in observed:
+        if country_key in rebuilt:
+            timeseries[country_key] = member_text(rebuilt[country_key])
+        else:
+            timeseries.pop(country_key, None)
+    
+    # Changes: drop records of periods that are gone, append the new ones
+    order = {period_name(*period): i for i, period in enumerate(new_periods)}
+    dropped = set()
+    for prev_year, curr_year in consecutive_periods(old_years):
+        if period_name(prev_year, curr_year) not in kept:
+            dropped |= old_countries[prev_year] & old_countries[curr_year]
+    panel = MetricPanel.from_country_data(all_data, needed, TRACKED_METRICS)
+    added = compute_changes(panel, todo)
+    alerts = dict(state['alerts'])
+    for country_key in dropped | set(added):
+        text = changes.get(country_key)
+        periods = added.get(country_key, {})
+        new_alerts = sum(len(record['alerts']) for record in periods.values())
+        if text and country_key not in dropped and order[last_member_key(text)] < min(map(order.get, periods)):
+            # Only periods after the last recorded one: append without parsing
+            changes[country_key] = append_members(text, periods)
+            total_alerts = alerts.get(country_key, 0) + new_alerts
+        else:
+            previous = json.loads(text) if text else {}
+            periods = {**{p: v for p, v in previous.items() if p in kept}, **periods}
+            periods = dict(sorted(periods.items(), key=lambda item: order[item[0]]))
+            if periods:
+                changes[country_key] = member_text(periods)
+            else:
+                changes.pop(country_key, None)
+            total_alerts = alert_totals({country_key: periods}).get(country_key, 0)
+        if total_alerts:
+            alerts[country_key] = total_alerts
+        else:
+            alerts.pop(country_key, None)
+    
+    countries = {year: all_data[year] if year in stale else state['years'][str(year)]['countries'] for year in years}
+    # Members in full-merge order: countries as first loaded across the years,
+    # and their changes by first period, which a removed year can shift
+    position = {key: i for i, key in enumerate(dict.fromkeys(key for year in years for key in countries[year]))}
+    timeseries = dict(sorted(timeseries.items(), key=lambda item: position[item[0]]))
+    changes = dict(sorted(changes.items(), key=lambda item: (order[first_member_key(item[1])], position[item[0]])))
+    return timeseries, changes, merge_state(years, fingerprints, countries, fill, alerts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge extracted Factbook years into time series')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only process years added, removed or re-extracted since the last merge')
+    parser.add_argument('--horizons', type=int, nargs='+', metavar='YEARS',
+                        help='Also write horizons.json with changes, CAGR, trends and alerts '
+                             'over these windows (e.g. 1 5 10)')
+    parser.add_argument('--sharded', action='store_true',
+                        help='Also write per-country and per-metric timeseries shards with a manifest')
+    parser.add_argument('--stream', action='store_true',
+                        help='Full merge that streams one country at a time instead of loading every year')
+    parser.add_argument('--stats', '--profile', action='store_true',
+                        help=f'Write per-stage timings and per-metric coverage to {OUTPUT_DIR / STATS_FILE}')
+    parser.add_argument('--fill', nargs='+', choices=FILL_METHODS, default=[], metavar='METHOD',
+                        help='Fill missing years in timeseries.json: interpolate between values and/or '
+                             'carry the last value forward (points are marked "filled")')
+    args = parser.parse_args()
+    fill = tuple(args.fill)
+    if args.stream and (args.incremental or args.sharded):
+        parser.error('--stream cannot be combined with --incremental or --sharded')
+    
+    years = get_available_years()
+    print(f"Found {len(years)} years of data: {years}")
     
-    # Create output directory
+    if len(years) < 1:
+        print("Error: No data years found in data/ directory")
+        return 1
+    
+    if save_index(country_index(), DATA_DIR):
+        print(f"Updated country identity index {DATA_DIR / INDEX_FILE}")
+    
+    stats = {'seconds': {}} if args.stats else None
+    started = time.perf_counter()
+    with stage(stats, 'fingerprint'):
+        fingerprints = {year: year_fingerprint(year) for year in years}
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    if args.stream:
+        with stage(stats, 'stream_merge'):
+            state = merge_streaming(years, fingerprints, stats, fill)
+        print(f"\nSaved timeseries and changes to {OUTPUT_DIR}")
+        if args.horizons:
+            with stage(stats, 'horizons'):
+                save_horizons(MetricPanel.from_country_data(load_years(years), years, TRACKED_METRICS),
+                              args.horizons)
+            state['horizons'] = sorted(set(args.horizons))
+        save_state(state)
+        if stats is not None:
+            save_stats(stats, 'stream', years, state, time.perf_counter() - started)
+        print_summary(state, years)
+        return 0
+    
+    timeseries = None
+    members = None
+    panel = None
+    mode = 'full'
+    state = load_merge_state() if args.incremental else None
+    if args.incremental and state is None:
+        print("No usable merge state, running a full merge")
+    elif state is not None and not stale_years(state, years, fingerprints) and state['fill'] == list(fill):
+        print("Merge state is up to date, nothing to rewrite")
+        mode = 'unchanged'
+    elif state is not None:
+        with stage(stats, 'incremental_merge'):
+            merged = merge_incremental(years, fingerprints, state, fill)
+        if merged is None:
+            print("No usable previous output, running a full merge")
+        else:
+            members, changes_members, state = merged
+            mode = 'incremental'
+    if mode == 'full':
+        timeseries, changes, state, panel = merge_full(years, fingerprints, stats, fill)
     
-    # Save timeseries
-    timeseries_path = OUTPUT_DIR / 'timeseries.json'
-    with open(timeseries_path, 'w') as f:
-        json.dump(dict(timeseries), f, indent=2)
-    print(f"\nSaved timeseries to {timeseries_path}")
+    if mode != 'unchanged':
+        with stage(stats, 'write_output'):
+            timeseries_path = OUTPUT_DIR / 'timeseries.json'
+            changes_path = OUTPUT_DIR / 'changes.json'
+            if mode == 'incremental':
+                write_members(timeseries_path, members)
+                write_members(changes_path, changes_members)
+            else:
+                with open(timeseries_path, 'w') as f:
+                    json.dump(timeseries, f, indent=2)
+                with open(changes_path, 'w') as f:
+                    json.dump(changes, f, indent=2)
+        print(f"\nSaved timeseries to {timeseries_path}")
+        print(f"Saved changes to {changes_path}")
     
-    # Save changes
-    changes_path = OUTPUT_DIR / 'changes.json'
-    with open(changes_path, 'w') as f:
-        json.dump(dict(changes), f, indent=2)
-    print(f"Saved changes to {changes_path}")
+    # After an unchanged merge, extra outputs are only written if the last run skipped them
+    extras = False
+    if (args.sharded or stats is not None) and timeseries is None:
+        if members is not None:
+            timeseries = {country_key: json.loads(text) for country_key, text in members.items()}
+        else:
+            with open(OUTPUT_DIR / 'timeseries.json') as f:
+                timeseries = json.load(f)
+    if args.sharded and (mode != 'unchanged' or not state.get('sharded')):
+        with stage(stats, 'sharded_output'):
+            manifest, written = save_sharded_timeseries(timeseries, OUTPUT_DIR / 'timeseries')
+        print(f"Saved {len(manifest['countries'])} country and {len(manifest['metrics'])} metric "
+              f"shards to {OUTPUT_DIR / 'timeseries'} ({written} rewritten)")
+        state['sharded'] = extras = True
     
-    # Summary
+    # Multi-horizon windows need every year, even after an incremental merge
+    horizons = sorted(set(args.horizons or []))
+    if horizons and (mode != 'unchanged' or state.get('horizons') != horizons):
+        with stage(stats, 'horizons'):
+            if panel is None:
+                panel = MetricPanel.from_country_data(load_years(years), years, TRACKED_METRICS)
+            save_horizons(panel, horizons)
+        state['horizons'] = horizons
+        extras = True
+    
+    if mode != 'unchanged' or extras:
+        save_state(state)
+    
+    if stats is not None:
+        for country_key, series in timeseries.items():
+            count_coverage(stats, country_key, series)
+        save_stats(stats, mode, years, state, time.perf_counter() - started)
+    
+    print_summary(state, years)
+    return 0
+
+
+def save_state(state: dict):
+    """Save merge state for --incremental runs."""
+    with open(OUTPUT_DIR / STATE_FILE, 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def save_stats(stats: dict, mode: str, years: list[int], state: dict, seconds: float):
+    """Write the --stats report: stage timings, throughput and metric coverage."""
+    year_countries = {year: len(state['years'][str(year)]['countries']) for year in years}
+    all_countries = {key for year in state['years'].values() for key in year['countries']}
+    metrics = stats.get('metrics', {})
+    observations = sum(counts['observations'] for counts in metrics.values())
+    
+    report = {
+        'mode': mode,
+        'seconds': {**{name: round(value, 4) for name, value in stats['seconds'].items()},
+                    'total': round(seconds, 4)},
+        'throughput': {
+            'country_years_per_sec': round(sum(year_countries.values()) / seconds, 1) if seconds else None,
+            'observations_per_sec': round(observations / seconds, 1) if seconds else None,
+        },
+        'year_countries': {str(year): count for year, count in year_countries.items()},
+        'metrics': {},
+    }
+    for metric in [*TRACKED_NAMES, *DERIVED_METRICS]:
+        counts = metrics.get(metric, {'observations': 0, 'countries': 0})
+        report['metrics'][metric] = {
+            **counts,
+            'coverage_pct': round(counts['countries'] / len(all_countries) * 100, 1) if all_countries else 0.0,
+        }
+    
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(OUTPUT_DIR / STATS_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    print(f"\n{'Stage':<18} {'Seconds':>8}")
+    for name, value in report['seconds'].items():
+        print(f"{name:<18} {value:>8.3f}")
+    print(f"\n{'Metric':<24} {'Observations':>12} {'Countries':>10} {'Coverage':>9}")
+    for metric, counts in report['metrics'].items():
+        print(f"{metric:<24} {counts['observations']:>12} {counts['countries']:>10} {counts['coverage_pct']:>8.1f}%")
+    print(f"Saved stats to {OUTPUT_DIR / STATS_FILE}")
+
+
+def save_horizons(panel: MetricPanel, horizons: list[int]):
+    horizons_path = OUTPUT_DIR / 'horizons.json'
+    # Compact: one entry per (horizon, window, country, metric) adds up fast
+    with open(horizons_path, 'w') as f:
+        json.dump(compute_horizons(panel, sorted(set(horizons))), f, separators=(',', ':'))
+    print(f"Saved horizons {sorted(set(horizons))} to {horizons_path}")
+
+
+def print_summary(state: dict, years: list[int]):
+    all_countries = {key for year in state['years'].values() for key in year['countries']}
     print(f"\n=== Summary ===")
     print(f"Countries tracked: {len(all_countries)}")
     print(f"Years covered: {years}")
     
     if len(years) > 1:
-        # Find countries with most alerts
-        alert_counts = []
-        for country_key, periods in changes.items():
-            total_alerts = sum(len(p.get('alerts', [])) for p in periods.values())
-            if total_alerts > 0:
-                alert_counts.append((country_key, total_alerts))
-        
-        alert_counts.sort(key=lambda x: -x[1])
+        alert_counts = sorted(state['alerts'].items(), key=lambda x: -x[1])
         
         if alert_counts:
             print(f"\nTop countries with significant changes:")
             for country, count in alert_counts[:10]:
                 print(f"  {country}: {count} alerts")
-    
-    return 0
 
 
 if __name__ == '__main__':
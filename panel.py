@@ -0,0 +1,98 @@
+"""
+Metric Panel
+
+Dense (year, country, metric) store of tracked Factbook metrics. Each
+(metric, year) pair is one float64 column indexed by country position, with
+NaN for missing values, so merge stages can work column by column instead of
+walking nested country dicts.
+"""
+
+import math
+from array import array
+from typing import Optional
+
+from records import REGISTRY
+
+NAN = math.nan
+
+
+class MetricPanel:
+    """Tracked metric values for every loaded year and country."""
+
+    def __init__(self, years: list[int], countries: list[str], metrics: list[str]):
+        self.years = years
+        self.countries = countries
+        self.metrics = metrics
+        self.year_index = {year: i for i, year in enumerate(years)}
+        self.country_index = {key: i for i, key in enumerate(countries)}
+        size = len(countries)
+        # values[metric][year_pos] -> array('d') over countries
+        self.values = {
+            metric: [array('d', [NAN]) * size for _ in years] for metric in metrics
+        }
+        # ints[metric][year_pos] -> bytearray flagging values extracted as int
+        self.ints = {
+            metric: [bytearray(size) for _ in years] for metric in metrics
+        }
+        # present[year_pos] -> bytearray flagging countries loaded that year
+        self.present = [bytearray(size) for _ in years]
+
+    @classmethod
+    def from_country_data(cls, all_data: dict, years: list[int], sections: dict) -> 'MetricPanel':
+        """Build a panel from {year: {country_key: CountryRecord}}.
+
+        sections maps each section name to the metric names tracked in it;
+        countries keep the order they are first seen in across years. Values
+        are copied straight from each record's float64 slots.
+        """
+        countries = {}
+        for year in years:
+            for key in all_data.get(year, {}):
+                countries.setdefault(key, len(countries))
+        slots = [(metric, REGISTRY.slot(section, metric)) for section, fields in sections.items() for metric in fields]
+        panel = cls(years, list(countries), [metric for metric, _ in slots])
+        targets = [(slot, panel.values[metric], panel.ints[metric]) for metric, slot in slots]
+
+        for year_pos, year in enumerate(years):
+            present = panel.present[year_pos]
+            for key, record in all_data.get(year, {}).items():
+                index = countries[key]
+                present[index] = 1
+                values, ints = record.values, record.ints
+                for slot, columns, flags in targets:
+                    value = values[slot] if slot < len(values) else NAN
+                    if value == value:
+                        columns[year_pos][index] = value
+                        flags[year_pos][index] = ints >> slot & 1
+        return panel
+
+    def copy(self) -> 'MetricPanel':
+        """A panel with its own copy of every column."""
+        panel = MetricPanel(self.years, self.countries, [])
+        panel.metrics = list(self.metrics)
+        panel.values = {metric: [array('d', column) for column in columns] for metric, columns in self.values.items()}
+        panel.ints = {metric: [bytearray(column) for column in columns] for metric, columns in self.ints.items()}
+        panel.present = [bytearray(column) for column in self.present]
+        return panel
+
+    def add_metric(self, metric: str, columns: list[array]):
+        """Add a float metric from one float64 column per year."""
+        self.metrics.append(metric)
+        self.values[metric] = columns
+        self.ints[metric] = [bytearray(len(self.countries)) for _ in self.years]
+
+    def set(self, metric: str, year_pos: int, index: int, value):
+        """Store one value, remembering whether it was an int."""
+        self.values[metric][year_pos][index] = value
+        self.ints[metric][year_pos][index] = isinstance(value, int)
+
+    def value(self, metric: str, year_pos: int, index: int) -> Optional[float]:
+        """One value in its extracted type, or None if missing."""
+        value = self.values[metric][year_pos][index]
+        if value != value:
+            return None
+        return int(value) if self.ints[metric][year_pos][index] else value
+
+    def column(self, metric: str, year: int) -> array:
+        """The float64 column of a metric for one year."""
+        return self.values[metric][self.year_index[year]]
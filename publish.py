@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Publish Static Artifacts
+
+Writes every JSON artifact the site serves - the per-year files of
+extract_factbook.py and everything under data/_merged/ - once more as
+minified JSON plus precompressed .gz and .br variants, and a manifest of
+their content hashes. The API routes serve these bytes as they are, with
+the manifest's ETag for conditional GETs, instead of parsing and
+re-serializing the source JSON on every request.
+
+Files keep their path relative to data/, so data/2010/albania.json is
+published as data/_public/2010/albania.json(.gz|.br). Artifacts the API
+returns whole inside {"data": ...} (timeseries.json, risk/<year>.json) are
+published in that envelope, so those routes can send the bytes too.
+Bookkeeping files (_cache.json, _stats.json, _state.json) are skipped.
+Files whose source is unchanged since the last publish are not
+recompressed, and published files whose source is gone are removed.
+
+The manifest records each source's size and mtime. The API checks them on
+every request and serves the live file instead once a re-extract or
+re-merge has changed the source, until publish.py runs again.
+
+.br variants need the brotli module (pip install brotli); without it only
+.gz variants are written and the manifest says so.
+
+Usage:
+    python publish.py
+    python publish.py --force --workers 4
+
+Outputs:
+    data/_public/<path>.json, .json.gz, .json.br
+    data/_public/manifest.json
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+from merge_timeseries import DATA_DIR, OUTPUT_DIR, STATE_FILE, STATS_FILE, YEAR_BOOKKEEPING
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PUBLIC_DIR = DATA_DIR / '_public'
+MANIFEST_FILE = 'manifest.json'
+# 1: first version
+MANIFEST_VERSION = 1
+MERGED_BOOKKEEPING = {STATE_FILE, STATS_FILE}
+# Published once, read many times: compress as hard as the formats allow
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+# Hex digits of the SHA-256 used in ETags
+ETAG_DIGITS = 16
+# Path prefixes of artifacts the API serves as {"data": artifact}
+DATA_ENVELOPED = ('_merged/timeseries.json', '_merged/risk/')
+
+
+def iter_artifacts(data_dir: Path = DATA_DIR) -> Iterator[str]:
+    """Paths relative to data_dir of every JSON artifact to publish, in a stable order."""
+    years = sorted(int(item.name) for item in data_dir.iterdir() if item.is_dir() and item.name.isdigit())
+    for year in years:
+        for filepath in sorted((data_dir / str(year)).glob('*.json')):
+            if filepath.name not in YEAR_BOOKKEEPING:
+                yield f"{year}/{filepath.name}"
+    merged_dir = data_dir / OUTPUT_DIR.name
+    if merged_dir.is_dir():
+        for filepath in sorted(merged_dir.rglob('*.json')):
+            if filepath.name not in MERGED_BOOKKEEPING:
+                yield filepath.relative_to(data_dir).as_posix()
+
+
+def minify(content: bytes, envelope: bool = False) -> bytes:
+    """The same JSON without whitespace, optionally as {"data": ...}; keys keep their order."""
+    data = json.loads(content)
+    if envelope:
+        data = {'data': data}
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def variants(content: bytes) -> dict:
+    """{suffix: bytes} of the published variants of minified content."""
+    encoded = {'': content, '.gz': gzip.compress(content, GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        encoded['.br'] = brotli.compress(content, quality=BROTLI_QUALITY)
+    return encoded
+
+
+def published_files(path: str, entry: dict) -> list[str]:
+    """Files under the public directory that belong to a manifest entry."""
+    return [path + suffix for suffix in ('', '.gz', '.br') if suffix == '' or suffix[1:] in entry]
+
+
+def publish_artifact(path: str, data_dir: Path, public_dir: Path) -> dict:
+    """Write the variants of one artifact and return its manifest entry."""
+    source = (data_dir / path).read_bytes()
+    envelope = path.startswith(DATA_ENVELOPED)
+    content = minify(source, envelope)
+    digest = hashlib.sha256(content).hexdigest()
+    entry = {'etag': f'"{digest[:ETAG_DIGITS]}"', 'sha256': digest, 'bytes': len(content)}
+    if envelope:
+        entry['envelope'] = 'data'
+    (public_dir / path).parent.mkdir(parents=True, exist_ok=True)
+    for suffix, data in variants(content).items():
+        if suffix:
+            entry[suffix[1:]] = len(data)
+        (public_dir / (path + suffix)).write_bytes(data)
+    if 'br' not in entry:
+        # Left over from a publish that had brotli
+        (public_dir / (path + '.br')).unlink(missing_ok=True)
+    entry['source'] = hashlib.sha256(source).hexdigest()
+    entry.update(source_stat(data_dir / path))
+    return entry
+
+
+def source_stat(filepath: Path) -> dict:
+    """Size and mtime of a source file, as the API compares them to spot stale artifacts.
+    
+    The mtime is in nanoseconds and kept as a string, since it exceeds the
+    integers a JavaScript number holds exactly.
+    """
+    info = filepath.stat()
+    return {'source_bytes': info.st_size, 'source_mtime_ns': str(info.st_mtime_ns)}
+
+
+def _publish_artifacts(paths: list[str], data_dir: Path, public_dir: Path) -> list[tuple[str, object]]:
+    """(path, manifest entry or the error) of each path; runs in a worker process."""
+    results = []
+    for path in paths:
+        try:
+            results.append((path, publish_artifact(path, data_dir, public_dir)))
+        except (OSError, ValueError) as e:
+            results.append((path, e))
+    return results
+
+
+def load_manifest(public_dir: Path) -> dict:
+    """Entries of the previous publish, or {} if missing or outdated."""
+    try:
+        with open(public_dir / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+def remove_stale(public_dir: Path, files: dict) -> int:
+    """Delete published files not listed in the manifest, and emptied directories."""
+    keep = {name for path, entry in files.items() for name in published_files(path, entry)}
+    keep.add(MANIFEST_FILE)
+    removed = 0
+    for filepath in sorted(public_dir.rglob('*'), reverse=True):
+        if filepath.is_dir():
+            if not any(filepath.iterdir()):
+                filepath.rmdir()
+        elif filepath.relative_to(public_dir).as_posix() not in keep:
+            filepath.unlink()
+            removed += 1
+    return removed
+
+
+def publish(data_dir: Path = DATA_DIR, public_dir: Path = PUBLIC_DIR, force: bool = False,
+            workers: int = 1, verbose: bool = True) -> dict:
+    """Publish every artifact of data_dir; returns the manifest written.
+    
+    Changed artifacts are compressed by up to `workers` processes.
+    """
+    previous = {} if force else load_manifest(public_dir)
+    files = {}
+    changed = []
+    for path in iter_artifacts(data_dir):
+        entry = previous.get(path)
+        if (entry and entry['source'] == hashlib.sha256((data_dir / path).read_bytes()).hexdigest()
+                and ('br' in entry) == (brotli is not None)
+                and all((public_dir / name).exists() for name in published_files(path, entry))):
+            # Same bytes, possibly rewritten: refresh the stat the API checks
+            files[path] = {**entry, **source_stat(data_dir / path)}
+        else:
+            files[path] = None
+            changed.append(path)
+
+    workers = max(1, min(workers, len(changed)))
+    if workers == 1:
+        results = _publish_artifacts(changed, data_dir, public_dir)
+    else:
+        # Round-robin, so the few large merged files land on different workers
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [pool.submit(_publish_artifacts, changed[i::workers], data_dir, public_dir)
+                    for i in range(workers)]
+            for job in jobs:
+                results.extend(job.result())
+    for path, entry in results:
+        if isinstance(entry, Exception):
+            print(f"  Skipping {path}: {entry}")
+            del files[path]
+        else:
+            files[path] = entry
+    written = sum(1 for _, entry in results if not isinstance(entry, Exception))
+
+    public_dir.mkdir(parents=True, exist_ok=True)
+    removed = remove_stale(public_dir, files)
+    manifest = {'version': MANIFEST_VERSION, 'brotli': brotli is not None, 'files': files}
+    # Written last and swapped in whole, so readers never see entries for missing files
+    tmp_path = public_dir / (MANIFEST_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+    os.replace(tmp_path, public_dir / MANIFEST_FILE)
+
+    if verbose:
+        print(f"Published {len(files)} artifacts ({written} written, {len(files) - written} unchanged, "
+              f"{removed} stale files removed)")
+    return manifest
+
+
+def print_summary(manifest: dict, data_dir: Path = DATA_DIR):
+    files = manifest['files']
+    source = sum((data_dir / path).stat().st_size for path in files)
+    totals = {kind: sum(entry.get(kind, 0) for entry in files.values()) for kind in ('bytes', 'gz', 'br')}
+    print(f"  source    {source:>12,} bytes")
+    print(f"  minified  {totals['bytes']:>12,} bytes")
+    print(f"  gzip      {totals['gz']:>12,} bytes")
+    if manifest['brotli']:
+        print(f"  brotli    {totals['br']:>12,} bytes")
+    else:
+        print("  brotli    not installed (pip install brotli), .br variants skipped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Publish minified, precompressed JSON artifacts with ETags')
+    parser.add_argument('--force', action='store_true', help='Republish every artifact, even if unchanged')
+    parser.add_argument('--workers', type=int, help='Worker processes compressing artifacts (default: CPU count)')
+    args = parser.parse_args()
+
+    if not DATA_DIR.is_dir():
+        print(f"Error: {DATA_DIR} not found")
+        return 1
+
+    start = time.perf_counter()
+    manifest = publish(force=args.force, workers=args.workers or os.cpu_count() or 1)
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+    print_summary(manifest)
+    print(f"\nManifest: {PUBLIC_DIR / MANIFEST_FILE}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
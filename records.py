@@ -0,0 +1,210 @@
+"""
+Compact Country Records
+
+One country of one edition as a fixed-schema record instead of nested
+dicts. Every (section, field) pair gets a slot in the shared REGISTRY,
+seeded from the extractor's FIELD_CONFIG and the merger's TRACKED_METRICS.
+A record holds its numeric values in a single float64 array indexed by
+slot (NaN where missing), a bit mask of the values that were ints, any
+text values in a small {slot: value} dict, and the order its fields were
+set in, so to_dict() gives back the extracted JSON exactly. Country and
+region names are interned and shared across records and editions.
+
+extract_factbook.py and merge_timeseries.py pass these records around;
+JSON dicts are only built when writing output.
+"""
+
+import math
+import sys
+from array import array
+from typing import Iterable, Iterator, Optional
+
+NAN = math.nan
+RECORD_KEYS = ('country', 'region', 'year')
+SECTIONS = ('demographics', 'economy', 'military', 'political')
+# Slots are kept in a bytes string per record
+MAX_SLOTS = 256
+# Ints beyond this don't survive a float64 round trip and are kept as text values
+MAX_EXACT_INT = 2 ** 53
+
+_EMPTY = array('d', [NAN])
+_SLOT_BYTES = [bytes((slot,)) for slot in range(MAX_SLOTS)]
+_shared_sections = {SECTIONS: SECTIONS}
+
+
+class MetricRegistry:
+    """Slot numbers of (section, field) pairs, in the order first registered."""
+
+    def __init__(self):
+        self.keys = []    # slot -> (section, field)
+        self.slots = {}   # (section, field) -> slot
+        self.fields = {}  # section -> {field: slot}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def slot(self, section: str, field: str) -> int:
+        """The slot of a field, registering it if new."""
+        key = (section, field)
+        slot = self.slots.get(key)
+        if slot is None:
+            if len(self.keys) >= MAX_SLOTS:
+                raise ValueError(f"more than {MAX_SLOTS} distinct fields")
+            slot = self.slots[key] = len(self.keys)
+            self.keys.append((sys.intern(section), sys.intern(field)))
+            self.fields.setdefault(section, {})[field] = slot
+        return slot
+
+
+REGISTRY = MetricRegistry()
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class CountryRecord:
+    """One country's extracted fields, stored by REGISTRY slot."""
+
+    __slots__ = ('country', 'region', 'year', 'sections', 'values', 'ints', 'text', 'order')
+
+    def __init__(self, country: str, region: Optional[str], year: Optional[int], sections: tuple = SECTIONS):
+        self.country = _intern(country)
+        self.region = _intern(region)
+        self.year = year
+        self.sections = _shared_sections.setdefault(sections, sections)
+        self.values = _EMPTY * len(REGISTRY)
+        self.ints = 0
+        self.text = None  # slot -> non-numeric value
+        self.order = b''  # slots in the order they were set
+
+    def set(self, section: str, field: str, value):
+        """Set a field; like a dict, re-setting keeps its original position."""
+        if section not in self.sections:
+            sections = self.sections + (section,)
+            self.sections = _shared_sections.setdefault(sections, sections)
+        slot = REGISTRY.slots.get((section, field))
+        self.set_slot(REGISTRY.slot(section, field) if slot is None else slot, value)
+
+    def set_slot(self, slot: int, value):
+        """Set a field by slot; its section must be one of the record's sections."""
+        values = self.values
+        if slot >= len(values):
+            values.extend(_EMPTY * (len(REGISTRY) - len(values)))
+        kind = type(value)
+        if kind is float and value == value or kind is int and -MAX_EXACT_INT <= value <= MAX_EXACT_INT:
+            values[slot] = value
+            if kind is int:
+                self.ints |= 1 << slot
+            elif self.ints >> slot & 1:
+                self.ints ^= 1 << slot
+            if self.text:
+                self.text.pop(slot, None)
+        else:
+            values[slot] = NAN
+            if self.ints >> slot & 1:
+                self.ints ^= 1 << slot
+            if self.text is None:
+                self.text = {}
+            self.text[slot] = value
+        if slot not in self.order:
+            self.order += _SLOT_BYTES[slot]
+
+    def fill(self, items: Iterable[tuple[int, object]]):
+        """Set (slot, value) pairs on a record with no fields yet, each slot once."""
+        values = self.values
+        if len(values) < len(REGISTRY):
+            values.extend(_EMPTY * (len(REGISTRY) - len(values)))
+        order = []
+        ints = 0
+        text = None
+        for slot, value in items:
+            kind = type(value)
+            if kind is float and value == value:
+                values[slot] = value
+            elif kind is int and -MAX_EXACT_INT <= value <= MAX_EXACT_INT:
+                values[slot] = value
+                ints |= 1 << slot
+            else:
+                if text is None:
+                    text = {}
+                text[slot] = value
+            order.append(slot)
+        self.ints = ints
+        self.text = text
+        self.order = bytes(order)
+
+    def value(self, slot: int):
+        """The value in a slot in its original type, or None if unset."""
+        values = self.values
+        if slot < len(values):
+            value = values[slot]
+            if value == value:
+                return int(value) if self.ints >> slot & 1 else value
+        text = self.text
+        return text.get(slot) if text else None
+
+    def get(self, section: str, field: str, default=None):
+        slot = REGISTRY.slots.get((section, field))
+        if slot is None or slot not in self.order:
+            return default
+        return self.value(slot)
+
+    def has(self, section: str, field: str) -> bool:
+        slot = REGISTRY.slots.get((section, field))
+        return slot is not None and slot in self.order
+
+    def has_data(self) -> bool:
+        """Whether any field has been set."""
+        return bool(self.order)
+
+    def items(self) -> Iterator[tuple[str, str, object]]:
+        """(section, field, value) of every set field, grouped by section like to_dict()."""
+        keys = REGISTRY.keys
+        for section in self.sections:
+            for slot in self.order:
+                if keys[slot][0] == section:
+                    yield section, keys[slot][1], self.value(slot)
+
+    def to_dict(self) -> dict:
+        """The record as the extractor's nested JSON dict."""
+        data = {'country': self.country, 'region': self.region, 'year': self.year}
+        for section in self.sections:
+            data[section] = {}
+        keys = REGISTRY.keys
+        for slot in self.order:
+            section, field = keys[slot]
+            data[section][field] = self.value(slot)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CountryRecord':
+        """Build a record from a nested JSON dict."""
+        sections = tuple(key for key in data if key not in RECORD_KEYS)
+        record = cls(data['country'], data.get('region'), data.get('year'), sections)
+        items = []
+        for section in sections:
+            slots = REGISTRY.fields.get(section, {})
+            for field, value in data[section].items():
+                slot = slots.get(field)
+                items.append((REGISTRY.slot(section, field) if slot is None else slot, value))
+        record.fill(items)
+        return record
+
+    def __reduce__(self):
+        # By field name, since worker processes may number slots differently
+        return _rebuild, (self.country, self.region, self.year, self.sections, list(self.items()))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CountryRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"CountryRecord({self.country!r}, {self.region!r}, {self.year!r}, {len(self.order)} fields)"
+
+
+def _rebuild(country, region, year, sections, items) -> CountryRecord:
+    record = CountryRecord(country, region, year, sections)
+    record.fill([(REGISTRY.slot(section, field), value) for section, field, value in items])
+    return record
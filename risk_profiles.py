@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Precompute Risk Profiles
+
+Computes the risk scores of src/lib/analysis.ts once per year instead of
+on every page render: global stats are computed once, then every country
+gets its risk profile, global and regional rank and percentiles, plus the
+regional summary table of calculateRegionalStats().
+
+Scores, labels, factors and ranks match calculateAllRiskProfiles() for the
+same countries in _index.json order. Like the app, the trade factor reads
+the trade_ratio that merge_timeseries.py derives, so run the merge first.
+
+Usage:
+    python risk_profiles.py
+    python risk_profiles.py --years 2010 2015
+
+Outputs:
+    data/_merged/risk/<year>.json
+"""
+
+import argparse
+import json
+import math
+import re
+from decimal import Decimal, ROUND_HALF_UP
+
+from columnar import COLUMNS_FILE, read_countries
+from merge_timeseries import DATA_DIR, OUTPUT_DIR, country_key, get_available_years, load_derived_metrics
+
+RISK_DIR = OUTPUT_DIR / 'risk'
+ELECTION_YEAR = re.compile(r'\d{4}')
+
+# (name, color) for the lowest overall score reaching each threshold
+RISK_LEVELS = [
+    (80, 'Very Low', '#22c55e'),
+    (65, 'Low', '#84cc16'),
+    (45, 'Moderate', '#eab308'),
+    (30, 'High', '#f97316'),
+]
+LOWEST_LEVEL = ('Very High', '#ef4444')
+
+
+def js_round(value: float) -> int:
+    """Math.round: halves round towards +infinity."""
+    return math.floor(value + 0.5)
+
+
+def js_to_fixed(value: float, digits: int) -> str:
+    """Number.prototype.toFixed: exact binary value, ties away from zero."""
+    if value == 0:
+        # toFixed drops the sign of -0 (but not of small negatives that round to zero)
+        value = 0.0
+    return str(Decimal(value).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+
+def js_sum(values: list) -> float:
+    """Left-to-right sum, as Array.reduce((a, b) => a + b, 0) adds."""
+    total = 0
+    for value in values:
+        total += value
+    return total
+
+
+def get_stats(values: list) -> tuple[float, float]:
+    """Mean and population standard deviation."""
+    n = len(values)
+    if n == 0:
+        return 0, 0
+    mean = js_sum(values) / n
+    variance = js_sum([(value - mean) * (value - mean) for value in values]) / n
+    return mean, math.sqrt(variance)
+
+
+def global_stats(countries: list) -> dict:
+    """calculateGlobalStats(): means and deviations over non-zero values."""
+    gdp = [c['economy']['gdp_ppp_billions'] for c in countries if c['economy'].get('gdp_ppp_billions')]
+    growth = [c['economy']['gdp_growth_pct'] for c in countries if c['economy'].get('gdp_growth_pct')]
+    military = [c['military']['expenditure_pct_gdp'] for c in countries
+                if c['military'].get('expenditure_pct_gdp')]
+    stats = {}
+    for name, values in (('Gdp', gdp), ('Growth', growth), ('Military', military)):
+        mean, std = get_stats(values)
+        stats[f"avg{name}"] = mean
+        stats[f"std{name}"] = std
+    return stats
+
+
+def normalize_score(z: float) -> float:
+    return max(0, min(100, 50 + z * 15))
+
+
+def economic_score(country: dict, stats: dict) -> float:
+    economy = country['economy']
+    factors = []
+    if 'gdp_growth_pct' in economy:
+        std = stats['stdGrowth']
+        z = 0 if std == 0 else (economy['gdp_growth_pct'] - stats['avgGrowth']) / std
+        factors.append(normalize_score(z))
+    if 'inflation_pct' in economy:
+        # Optimal inflation around 2-3%
+        factors.append(max(0, 100 - abs(economy['inflation_pct'] - 2.5) * 5))
+    if 'unemployment_pct' in economy:
+        factors.append(max(0, 100 - economy['unemployment_pct'] * 4))
+    trade_ratio = country.get('derived', {}).get('trade_ratio')
+    if trade_ratio:
+        factors.append(min(100, trade_ratio * 50))
+    return js_sum(factors) / len(factors) if factors else 50
+
+
+def political_score(country: dict) -> float:
+    political = country['political']
+    score = 50
+    if political.get('chief_of_state'):
+        score += 10
+    if political.get('head_of_government'):
+        score += 5
+    if political.get('last_election'):
+        score += 10
+        # Recent elections suggest active democracy
+        match = ELECTION_YEAR.search(political['last_election'])
+        election_year = int(match.group(0)) if match else 0
+        if election_year and country['year'] - election_year <= 4:
+            score += 10
+    return min(100, score)
+
+
+def military_score(country: dict) -> float:
+    if 'expenditure_pct_gdp' not in country['military']:
+        return 50
+    pct = country['military']['expenditure_pct_gdp']
+    if pct < 0.5:
+        return 60
+    if pct <= 3:
+        return 80
+    if pct <= 5:
+        return 50
+    if pct <= 10:
+        return 30
+    return 15
+
+
+def demographic_score(country: dict) -> float:
+    demographics = country['demographics']
+    factors = []
+    if 'population_growth_pct' in demographics:
+        growth = demographics['population_growth_pct']
+        if growth < 0:
+            factors.append(max(20, 50 + growth * 20))
+        elif growth <= 2:
+            factors.append(80)
+        elif growth <= 3:
+            factors.append(60)
+        else:
+            factors.append(max(20, 80 - growth * 10))
+    if 'median_age' in demographics:
+        age = demographics['median_age']
+        if age < 20:
+            factors.append(40)
+        elif age < 28:
+            factors.append(70)
+        elif age <= 38:
+            factors.append(90)
+        elif age <= 45:
+            factors.append(70)
+        else:
+            factors.append(50)
+    if 'life_expectancy' in demographics:
+        factors.append(min(100, demographics['life_expectancy'] * 1.2))
+    return js_sum(factors) / len(factors) if factors else 50
+
+
+def risk_level(score: float) -> tuple[str, str]:
+    for threshold, label, color in RISK_LEVELS:
+        if score >= threshold:
+            return label, color
+    return LOWEST_LEVEL
+
+
+def risk_factors(country: dict) -> list:
+    economy, military, demographics = country['economy'], country['military'], country['demographics']
+    factors = []
+    if 'gdp_growth_pct' in economy:
+        growth = economy['gdp_growth_pct']
+        factors.append({
+            'name': 'GDP Growth',
+            'value': f"{js_to_fixed(growth, 1)}%",
+            'impact': 'positive' if growth > 3 else 'negative' if growth < 0 else 'neutral',
+            'weight': 0.10,
+            'description': 'Strong economic expansion' if growth > 5 else
+                           'Moderate growth' if growth > 0 else 'Economic contraction',
+        })
+    if 'unemployment_pct' in economy:
+        unemployment = economy['unemployment_pct']
+        factors.append({
+            'name': 'Unemployment',
+            'value': f"{js_to_fixed(unemployment, 1)}%",
+            'impact': 'positive' if unemployment < 5 else 'negative' if unemployment > 10 else 'neutral',
+            'weight': 0.08,
+            'description': 'Near full employment' if unemployment < 5 else
+                           'Moderate unemployment' if unemployment < 10 else 'High unemployment',
+        })
+    if 'expenditure_pct_gdp' in military:
+        spending = military['expenditure_pct_gdp']
+        factors.append({
+            'name': 'Military Spending',
+            'value': f"{js_to_fixed(spending, 1)}% GDP",
+            'impact': 'negative' if spending > 5 else 'neutral' if spending < 1 else 'positive',
+            'weight': 0.12,
+            'description': 'Elevated military posture' if spending > 5 else
+                           'Standard defense spending' if spending > 2 else 'Low military investment',
+        })
+    if 'population_growth_pct' in demographics:
+        growth = demographics['population_growth_pct']
+        factors.append({
+            'name': 'Population Growth',
+            'value': f"{js_to_fixed(growth, 2)}%",
+            'impact': 'negative' if growth < 0 or growth > 3 else 'positive',
+            'weight': 0.08,
+            'description': 'Declining population' if growth < 0 else
+                           'Rapid population growth' if growth > 3 else 'Stable population dynamics',
+        })
+    return factors
+
+
+def risk_profile(country: dict, stats: dict) -> dict:
+    """calculateRiskProfile() with precomputed global stats."""
+    economic = economic_score(country, stats)
+    political = political_score(country)
+    military = military_score(country)
+    demographic = demographic_score(country)
+    overall = economic * 0.30 + political * 0.25 + military * 0.25 + demographic * 0.20
+    label, color = risk_level(overall)
+    return {
+        'country': country['country'],
+        'region': country['region'],
+        'score': {
+            'overall': js_round(overall),
+            'economic': js_round(economic),
+            'political': js_round(political),
+            'military': js_round(military),
+            'demographic': js_round(demographic),
+            'label': label,
+            'color': color,
+        },
+        'factors': risk_factors(country),
+    }
+
+
+def percentiles(scores: list[int]) -> list[float]:
+    """Share of scores strictly below each score, in percent."""
+    ordered = sorted(scores)
+    n = len(scores)
+    below = {}
+    for i, score in enumerate(ordered):
+        below.setdefault(score, i)
+    return [round(below[score] / n * 100, 1) for score in scores]
+
+
+def rank_profiles(profiles: list) -> list:
+    """Sort by overall score and add global/regional ranks and percentiles."""
+    # Stable sort keeps input order among ties, like Array.prototype.sort
+    profiles.sort(key=lambda p: -p['score']['overall'])
+    regions = {}
+    for i, profile in enumerate(profiles):
+        profile['rank'] = i + 1
+        regions.setdefault(profile['region'], []).append(profile)
+    for profile, percentile in zip(profiles, percentiles([p['score']['overall'] for p in profiles])):
+        profile['percentile'] = percentile
+    for group in regions.values():
+        group_percentiles = percentiles([p['score']['overall'] for p in group])
+        for i, (profile, percentile) in enumerate(zip(group, group_percentiles)):
+            profile['regionalRank'] = i + 1
+            profile['regionalPercentile'] = percentile
+    return profiles
+
+
+def regional_stats(countries: list, profiles: list) -> list:
+    """calculateRegionalStats() from already ranked profiles."""
+    by_region = {}
+    for country in countries:
+        by_region.setdefault(country['region'], []).append(country)
+    scores = {}
+    for profile in profiles:
+        scores.setdefault(profile['region'], []).append(profile['score']['overall'])
+
+    def mean(values):
+        return js_sum(values) / len(values) if values else 0
+
+    stats = []
+    for region, group in by_region.items():
+        gdp = [c['economy']['gdp_ppp_billions'] for c in group if c['economy'].get('gdp_ppp_billions')]
+        top = sorted((c for c in group if c['economy'].get('gdp_ppp_billions')),
+                     key=lambda c: -c['economy']['gdp_ppp_billions'])
+        stats.append({
+            'region': region,
+            'avgGdp': mean(gdp),
+            'avgGrowth': mean([c['economy']['gdp_growth_pct'] for c in group
+                               if c['economy'].get('gdp_growth_pct')]),
+            'avgMilitary': mean([c['military']['expenditure_pct_gdp'] for c in group
+                                 if c['military'].get('expenditure_pct_gdp')]),
+            'totalPopulation': js_sum([c['demographics']['population'] for c in group
+                                       if c['demographics'].get('population')]),
+            'countryCount': len(group),
+            'topEconomy': top[0]['country'] if top else 'N/A',
+            'avgRiskScore': js_round(mean(scores[region])),
+        })
+    stats.sort(key=lambda s: -s['avgRiskScore'])
+    return stats
+
+
+def load_year_countries(year: int) -> list:
+    """A year's country records in _index.json order, as the app loads them."""
+    year_dir = DATA_DIR / str(year)
+    if (year_dir / COLUMNS_FILE).exists():
+        try:
+            return read_countries(year_dir / COLUMNS_FILE)
+        except (OSError, ValueError) as e:
+            print(f"  Warning: Could not load {year_dir / COLUMNS_FILE}: {e}")
+    try:
+        with open(year_dir / '_index.json') as f:
+            index = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"  Warning: Could not load {year_dir / '_index.json'}: {e}")
+        return []
+    countries = []
+    for entry in index['countries']:
+        try:
+            with open(year_dir / entry['file']) as f:
+                countries.append(json.load(f))
+        except Exception as e:
+            print(f"  Warning: Could not load {year_dir / entry['file']}: {e}")
+    return countries
+
+
+def attach_derived(countries: list, derived: dict):
+    """Set each record's "derived" metrics for its year, as loadAllCountries() does."""
+    for country in countries:
+        values = derived.get(country_key(country['country']))
+        if values:
+            country['derived'] = values
+
+
+def compute_year(year: int, countries: list) -> dict:
+    stats = global_stats(countries)
+    profiles = rank_profiles([risk_profile(country, stats) for country in countries])
+    return {
+        'year': year,
+        'globalStats': stats,
+        'profiles': profiles,
+        'regionalStats': regional_stats(countries, profiles),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute risk profiles and rankings per year')
+    parser.add_argument('--years', type=int, nargs='+', help='Years to process (default: all)')
+    args = parser.parse_args()
+
+    years = args.years or get_available_years()
+    if not years:
+        print("Error: No data years found in data/ directory")
+        return 1
+
+    derived = load_derived_metrics()
+    if not derived:
+        print("Warning: no merged timeseries.json, trade ratios left out (run merge_timeseries.py)")
+
+    RISK_DIR.mkdir(parents=True, exist_ok=True)
+    for year in years:
+        countries = load_year_countries(year)
+        if not countries:
+            print(f"{year}: no countries, skipping")
+            continue
+        attach_derived(countries, derived.get(year, {}))
+        result = compute_year(year, countries)
+        with open(RISK_DIR / f"{year}.json", 'w') as f:
+            json.dump(result, f, separators=(',', ':'))
+        top = result['profiles'][0]
+        print(f"{year}: {len(result['profiles'])} profiles, most stable {top['country']} "
+              f"({top['score']['overall']})")
+
+    print(f"\nSaved risk profiles to {RISK_DIR}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -4,6 +4,7 @@ import { useState, useEffect } from 'react';
 import Link from 'next/link';
 import Navigation from '@/components/Navigation';
 import { detectAnomalies, getAnomalyStats, Anomaly } from '@/lib/anomalies';
+import { withDerived, DerivedMetrics } from '@/lib/derived';
 
 interface CountryData {
     country: string;
@@ -13,6 +14,24 @@ interface CountryData {
     economy: Record<string, number | undefined>;
     military: Record<string, number | undefined>;
     political: Record<string, string | undefined>;
+    derived?: DerivedMetrics;
+}
+
+// Served by /api/horizons from horizons.json (merge_timeseries.py --horizons)
+interface HorizonAlerts {
+    horizons: number[];
+    horizon: number;
+    periods: string[];
+    alerts: Array<{ country: string; name: string; period: string; alerts: string[] }>;
+}
+
+// "gdp_ppp_billions_major_change" -> "gdp ppp billions major change"
+function alertLabel(alert: string): string {
+    return alert.replace(/_/g, ' ');
+}
+
+function periodLabel(period: string): string {
+    return period.replace('_to_', '–');
 }
 
 // SVG Icons
@@ -139,16 +158,21 @@ export default function AlertsPage() {
     const [loading, setLoading] = useState(true);
     const [filterType, setFilterType] = useState<Anomaly['type'] | 'all'>('all');
     const [filterSeverity, setFilterSeverity] = useState<Anomaly['severity'] | 'all'>('all');
+    const [horizon, setHorizon] = useState<number | null>(null);
+    const [horizonAlerts, setHorizonAlerts] = useState<HorizonAlerts | null>(null);
 
     useEffect(() => {
-        fetch('/api/countries')
-            .then(r => r.json())
-            .then(async (data) => {
+        Promise.all([
+            fetch('/api/countries').then(r => r.json()),
+            fetch('/api/derived').then(r => r.json()).catch(() => null)
+        ])
+            .then(async ([data, derivedData]) => {
                 const countryPromises = data.countries.map((c: { file: string }) =>
                     fetch(`/api/countries/${c.file.replace('.json', '')}`).then(r => r.json())
                 );
                 const allCountries = await Promise.all(countryPromises);
-                const validCountries = allCountries.filter(Boolean) as CountryData[];
+                // Trade and debt ratios come from the merged derived metrics
+                const validCountries = withDerived(allCountries.filter(Boolean) as CountryData[], derivedData?.data);
                 setCountries(validCountries);
                 
                 const detectedAnomalies = detectAnomalies(validCountries as any);
@@ -159,6 +183,14 @@ export default function AlertsPage() {
             .catch(() => setLoading(false));
     }, []);
 
+    // Trend alerts over each horizon; the section stays hidden until horizons.json exists
+    useEffect(() => {
+        fetch(horizon === null ? '/api/horizons' : `/api/horizons?horizon=${horizon}`)
+            .then(r => r.json())
+            .then(result => setHorizonAlerts(result.data))
+            .catch(() => setHorizonAlerts(null));
+    }, [horizon]);
+
     const stats = getAnomalyStats(anomalies);
 
     const filteredAnomalies = anomalies.filter(a => {
@@ -354,6 +386,68 @@ export default function AlertsPage() {
                     )}
                 </section>
 
+                {/* Horizon Alerts */}
+                {horizonAlerts && (
+                    <section className="mt-6 sm:mt-10">
+                        <div className="flex flex-col sm:flex-row sm:items-center justify-between gap-3 mb-3 sm:mb-4">
+                            <div>
+                                <h2 className="text-sm sm:text-lg font-semibold text-slate-700">
+                                    Trend Alerts
+                                    <span className="text-slate-500 font-normal ml-2">({horizonAlerts.alerts.length})</span>
+                                </h2>
+                                <p className="text-slate-500 text-xs sm:text-sm">
+                                    Average yearly change over each {horizonAlerts.horizon}-year window across editions
+                                </p>
+                            </div>
+                            <div className="flex items-center gap-2">
+                                <span className="text-slate-500 text-xs sm:text-sm whitespace-nowrap">Horizon:</span>
+                                {horizonAlerts.horizons.map(h => (
+                                    <button
+                                        key={h}
+                                        onClick={() => setHorizon(h)}
+                                        className={`px-3 py-2 rounded-lg text-xs sm:text-sm transition whitespace-nowrap ${
+                                            h === horizonAlerts.horizon
+                                                ? 'bg-slate-200 text-slate-800'
+                                                : 'bg-white text-slate-500 hover:text-slate-700 border border-slate-200'
+                                        }`}
+                                    >
+                                        {h}y
+                                    </button>
+                                ))}
+                            </div>
+                        </div>
+
+                        {horizonAlerts.alerts.length === 0 ? (
+                            <div className="text-center py-8 bg-white/80 rounded-xl border border-slate-200">
+                                <p className="text-slate-500 text-sm">No trend alerts over {horizonAlerts.horizon}-year windows</p>
+                            </div>
+                        ) : (
+                            <div className="rounded-xl border border-slate-200 bg-white/80 divide-y divide-slate-100">
+                                {horizonAlerts.alerts.map(entry => (
+                                    <div key={`${entry.country}-${entry.period}`} className="p-3 sm:p-4 flex flex-col sm:flex-row sm:items-center gap-2 sm:gap-4">
+                                        <div className="sm:w-56 flex-shrink-0">
+                                            <Link
+                                                href={`/countries/${entry.name.toLowerCase().replace(/\s+/g, '_')}`}
+                                                className="text-blue-600 hover:text-blue-700 text-sm font-medium"
+                                            >
+                                                {entry.name}
+                                            </Link>
+                                            <span className="text-slate-500 text-xs ml-2">{periodLabel(entry.period)}</span>
+                                        </div>
+                                        <div className="flex flex-wrap gap-2">
+                                            {entry.alerts.map(alert => (
+                                                <span key={alert} className="px-2 py-0.5 rounded-full text-xs bg-orange-50 text-orange-700 border border-orange-200">
+                                                    {alertLabel(alert)}
+                                                </span>
+                                            ))}
+                                        </div>
+                                    </div>
+                                ))}
+                            </div>
+                        )}
+                    </section>
+                )}
+
                 {/* Methodology Note */}
                 <div className="mt-6 sm:mt-10 p-4 sm:p-6 rounded-xl bg-white/80 border border-slate-200 shadow-sm -mx-4 sm:mx-0 rounded-none sm:rounded-xl border-x-0 sm:border-x">
                     <div className="flex items-start gap-3 sm:gap-4">
@@ -5,6 +5,7 @@ import Link from 'next/link';
 import Navigation from '@/components/Navigation';
 import CountryFlag from '@/components/CountryFlag';
 import { calculateAllRiskProfiles, calculateRegionalStats, CountryRiskProfile, RegionalStats } from '@/lib/analysis';
+import { withDerived, DerivedMetrics } from '@/lib/derived';
 
 // SVG Icons as components
 const ChevronDownIcon = () => (
@@ -35,6 +36,7 @@ interface CountryData {
     economy: Record<string, number | undefined>;
     military: Record<string, number | undefined>;
     political: Record<string, string | undefined>;
+    derived?: DerivedMetrics;
 }
 
 export default function AnalysisPage() {
@@ -47,21 +49,23 @@ export default function AnalysisPage() {
     const [expandedRows, setExpandedRows] = useState<Set<string>>(new Set());
 
     useEffect(() => {
-        fetch('/api/countries')
-            .then(r => r.json())
-            .then(async (data) => {
+        Promise.all([
+            fetch('/api/countries').then(r => r.json()),
+            fetch('/api/risk').then(r => r.json()).catch(() => null),
+            fetch('/api/derived').then(r => r.json()).catch(() => null)
+        ])
+            .then(async ([data, riskData, derivedData]) => {
                 const countryPromises = data.countries.map((c: { file: string }) =>
                     fetch(`/api/countries/${c.file.replace('.json', '')}`).then(r => r.json())
                 );
                 const allCountries = await Promise.all(countryPromises);
-                const validCountries = allCountries.filter(Boolean) as CountryData[];
+                const validCountries = withDerived(allCountries.filter(Boolean) as CountryData[], derivedData?.data);
                 setCountries(validCountries);
                 
-                const riskProfiles = calculateAllRiskProfiles(validCountries as any);
-                setProfiles(riskProfiles);
-                
-                const stats = calculateRegionalStats(validCountries as any);
-                setRegionalStats(stats);
+                // Prefer the profiles precomputed by risk_profiles.py
+                const risk = riskData?.data;
+                setProfiles(risk?.profiles ?? calculateAllRiskProfiles(validCountries as any));
+                setRegionalStats(risk?.regionalStats ?? calculateRegionalStats(validCountries as any));
                 
                 setLoading(false);
             })
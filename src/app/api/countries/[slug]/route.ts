@@ -1,5 +1,6 @@
 import { NextResponse } from 'next/server';
 import { loadCountry } from '@/lib/data';
+import { publishedResponse } from '@/lib/published';
 
 interface RouteParams {
     params: Promise<{ slug: string }>;
@@ -7,6 +8,11 @@ interface RouteParams {
 
 export async function GET(request: Request, { params }: RouteParams) {
     const { slug } = await params;
+    const published = publishedResponse(request, `2010/${slug}.json`);
+    if (published) {
+        return published;
+    }
+
     const country = loadCountry(2010, `${slug}.json`);
 
     if (!country) {
@@ -1,7 +1,13 @@
 import { NextResponse } from 'next/server';
 import { loadIndex } from '@/lib/data';
+import { publishedResponse } from '@/lib/published';
+
+export async function GET(request: Request) {
+    const published = publishedResponse(request, '2010/_index.json');
+    if (published) {
+        return published;
+    }
 
-export async function GET() {
     const index = loadIndex(2010);
 
     if (!index) {
@@ -1,10 +1,81 @@
 import { NextResponse } from 'next/server';
 import fs from 'fs';
 import path from 'path';
+import { publishedResponse } from '@/lib/published';
 
-export async function GET() {
+interface ShardEntry {
+    file: string;
+    bytes: number;
+    sha256: string;
+}
+
+interface ShardManifest {
+    countries: Record<string, ShardEntry>;
+    metrics: Record<string, ShardEntry>;
+}
+
+const MERGED_DIR = path.join(process.cwd(), 'data', '_merged');
+const SHARD_DIR = path.join(MERGED_DIR, 'timeseries');
+
+function loadManifest(): ShardManifest | null {
+    const manifestPath = path.join(SHARD_DIR, 'manifest.json');
+    if (!fs.existsSync(manifestPath)) {
+        return null;
+    }
+    return JSON.parse(fs.readFileSync(manifestPath, 'utf-8'));
+}
+
+// Own keys only, so names like "__proto__" or "constructor" are not found
+function lookup<T>(record: Record<string, T>, key: string): T | undefined {
+    return Object.hasOwn(record, key) ? record[key] : undefined;
+}
+
+function readShard(entry: ShardEntry) {
+    return JSON.parse(fs.readFileSync(path.join(SHARD_DIR, entry.file), 'utf-8'));
+}
+
+export async function GET(request: Request) {
     try {
-        const timeseriesPath = path.join(process.cwd(), 'data', '_merged', 'timeseries.json');
+        const { searchParams } = new URL(request.url);
+        const country = searchParams.get('country');
+        const metric = searchParams.get('metric');
+
+        // Slices are served from the per-country / per-metric shards when present
+        if (country || metric) {
+            const manifest = loadManifest();
+            if (manifest) {
+                if (country) {
+                    const entry = lookup(manifest.countries, country);
+                    if (!entry) {
+                        return NextResponse.json({ data: null, error: 'Country not found' }, { status: 404 });
+                    }
+                    const series = readShard(entry);
+                    if (metric) {
+                        return NextResponse.json({ data: { [country]: { [metric]: lookup(series, metric) ?? [] } } });
+                    }
+                    return NextResponse.json({ data: { [country]: series } });
+                }
+
+                const entry = lookup(manifest.metrics, metric as string);
+                if (!entry) {
+                    return NextResponse.json({ data: null, error: 'Metric not found' }, { status: 404 });
+                }
+                const byCountry = readShard(entry);
+                const data: Record<string, Record<string, unknown>> = {};
+                for (const [key, points] of Object.entries(byCountry)) {
+                    data[key] = { [metric as string]: points };
+                }
+                return NextResponse.json({ data });
+            }
+        }
+
+        // The whole series, precompressed as {"data": ...} by publish.py
+        const published = !country && !metric && publishedResponse(request, '_merged/timeseries.json');
+        if (published) {
+            return published;
+        }
+
+        const timeseriesPath = path.join(MERGED_DIR, 'timeseries.json');
         
         if (!fs.existsSync(timeseriesPath)) {
             return NextResponse.json({ 
@@ -16,6 +87,16 @@ export async function GET() {
         const content = fs.readFileSync(timeseriesPath, 'utf-8');
         const data = JSON.parse(content);
 
+        if (country || metric) {
+            // No shards yet: slice the monolithic file
+            const sliced: Record<string, Record<string, unknown>> = {};
+            for (const [key, series] of Object.entries(data as Record<string, Record<string, unknown>>)) {
+                if (country && key !== country) continue;
+                sliced[key] = metric ? { [metric]: lookup(series, metric) ?? [] } : series;
+            }
+            return NextResponse.json({ data: sliced });
+        }
+
         return NextResponse.json({ data });
     } catch (error) {
         return NextResponse.json({ 
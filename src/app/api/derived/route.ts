@@ -0,0 +1,17 @@
+import { NextResponse } from 'next/server';
+import { loadDerivedMetrics } from '@/lib/data';
+
+export async function GET(request: Request) {
+    const { searchParams } = new URL(request.url);
+    const year = parseInt(searchParams.get('year') || '2010');
+
+    const derived = loadDerivedMetrics(year);
+    if (!derived) {
+        return NextResponse.json({
+            data: null,
+            message: 'Derived metrics not available. Run merge_timeseries.py to generate.'
+        });
+    }
+
+    return NextResponse.json({ data: derived });
+}
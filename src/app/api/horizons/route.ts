@@ -0,0 +1,18 @@
+import { NextResponse } from 'next/server';
+import { loadHorizonAlerts } from '@/lib/data';
+
+export async function GET(request: Request) {
+    const { searchParams } = new URL(request.url);
+    const param = searchParams.get('horizon');
+    const horizon = param ? parseInt(param) : undefined;
+
+    const data = loadHorizonAlerts(horizon);
+    if (!data) {
+        return NextResponse.json({
+            data: null,
+            message: 'Horizon alerts not available. Run merge_timeseries.py --horizons to generate.'
+        });
+    }
+
+    return NextResponse.json({ data });
+}
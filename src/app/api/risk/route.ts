@@ -0,0 +1,24 @@
+import { NextResponse } from 'next/server';
+import { loadRiskProfiles } from '@/lib/data';
+import { publishedResponse } from '@/lib/published';
+
+export async function GET(request: Request) {
+    const { searchParams } = new URL(request.url);
+    const year = parseInt(searchParams.get('year') || '2010');
+
+    // Published as {"data": ...} by publish.py
+    const published = publishedResponse(request, `_merged/risk/${year}.json`);
+    if (published) {
+        return published;
+    }
+
+    const risk = loadRiskProfiles(year);
+    if (!risk) {
+        return NextResponse.json({
+            data: null,
+            message: 'Risk profiles not available. Run risk_profiles.py to generate.'
+        });
+    }
+
+    return NextResponse.json({ data: risk });
+}
@@ -1,5 +1,5 @@
 import Link from 'next/link';
-import { loadCountry, loadAllCountries, formatNumber, formatPercent, formatBillions } from '@/lib/data';
+import { loadCountry, loadAllCountries, loadRiskProfiles, formatNumber, formatPercent, formatBillions } from '@/lib/data';
 import { notFound } from 'next/navigation';
 import fs from 'fs';
 import path from 'path';
@@ -120,8 +120,11 @@ export default async function CountryPage({ params }: PageProps) {
     }
 
     const allCountries = loadAllCountries(2010);
-    const insights = generateCountryInsights(country, allCountries);
-    const riskProfile = calculateRiskProfile(country, allCountries);
+    // The same record with the derived metrics loadAllCountries attaches
+    const merged = allCountries.find(c => c.country === country.country) ?? country;
+    const insights = generateCountryInsights(merged, allCountries);
+    const riskProfile = loadRiskProfiles(2010)?.profiles.find(p => p.country === country.country)
+        ?? calculateRiskProfile(merged, allCountries);
 
     const d = country.demographics;
     const e = country.economy;
@@ -5,6 +5,7 @@ import Link from 'next/link';
 import Navigation from '@/components/Navigation';
 import { calculateAllRiskProfiles, CountryRiskProfile } from '@/lib/analysis';
 import { generateRegionalInsights, Insight } from '@/lib/insights';
+import { withDerived, DerivedMetrics } from '@/lib/derived';
 import { 
     Users, 
     Coins, 
@@ -27,6 +28,7 @@ interface CountryData {
     economy: Record<string, number | undefined>;
     military: Record<string, number | undefined>;
     political: Record<string, string | undefined>;
+    derived?: DerivedMetrics;
 }
 
 interface PageProps {
@@ -58,14 +60,17 @@ export default function RegionPage({ params }: PageProps) {
     const [sortBy, setSortBy] = useState<'gdp' | 'population' | 'growth' | 'stability'>('gdp');
 
     useEffect(() => {
-        fetch('/api/countries')
-            .then(r => r.json())
-            .then(async (data) => {
+        Promise.all([
+            fetch('/api/countries').then(r => r.json()),
+            fetch('/api/risk').then(r => r.json()).catch(() => null),
+            fetch('/api/derived').then(r => r.json()).catch(() => null)
+        ])
+            .then(async ([data, riskData, derivedData]) => {
                 const countryPromises = data.countries.map((c: { file: string }) =>
                     fetch(`/api/countries/${c.file.replace('.json', '')}`).then(r => r.json())
                 );
                 const all = await Promise.all(countryPromises);
-                const validCountries = all.filter(Boolean) as CountryData[];
+                const validCountries = withDerived(all.filter(Boolean) as CountryData[], derivedData?.data);
                 setAllCountries(validCountries);
                 
                 // Filter by region (case-insensitive match)
@@ -74,8 +79,9 @@ export default function RegionPage({ params }: PageProps) {
                 );
                 setCountries(regional);
                 
-                // Calculate risk profiles for regional countries
-                const allProfiles = calculateAllRiskProfiles(validCountries as any);
+                // Risk profiles for regional countries, precomputed when available
+                const allProfiles: CountryRiskProfile[] = riskData?.data?.profiles
+                    ?? calculateAllRiskProfiles(validCountries as any);
                 const regionalProfiles = allProfiles.filter(p => 
                     p.region.toLowerCase() === regionName.toLowerCase()
                 );
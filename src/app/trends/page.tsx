@@ -30,7 +30,8 @@ interface CountryData {
 
 interface TimeSeriesData {
     [country: string]: {
-        [metric: string]: Array<{ year: number; value: number }>;
+        // filled: gap filled by merge_timeseries.py --fill rather than extracted
+        [metric: string]: Array<{ year: number; value: number; filled?: 'interpolated' | 'forward' }>;
     };
 }
 
@@ -43,11 +44,17 @@ const METRICS = [
     { key: 'unemployment_pct', label: 'Unemployment', category: 'economy', format: (v: number) => `${v.toFixed(1)}%` },
     { key: 'life_expectancy', label: 'Life Exp.', category: 'demographics', format: (v: number) => `${v.toFixed(1)}y` },
     { key: 'expenditure_pct_gdp', label: 'Military %', category: 'military', format: (v: number) => `${v.toFixed(1)}%` },
+    // Derived series precomputed by merge_timeseries.py (DERIVED_METRICS)
+    { key: 'trade_balance_billions', label: 'Trade Balance', category: 'derived', format: (v: number) => `${v < 0 ? '-' : '+'}$${Math.abs(v).toFixed(0)}B` },
+    { key: 'trade_balance_pct_gdp', label: 'Trade Bal. % GDP', category: 'derived', format: (v: number) => `${v > 0 ? '+' : ''}${v.toFixed(1)}%` },
+    { key: 'external_debt_pct_gdp', label: 'Debt % GDP', category: 'derived', format: (v: number) => `${v.toFixed(0)}%` },
+    { key: 'exports_per_capita', label: 'Exports/Capita', category: 'derived', format: (v: number) => `$${v.toLocaleString()}` },
 ];
 
 export default function TrendsPage() {
     const [countries, setCountries] = useState<CountryData[]>([]);
     const [timeSeriesData, setTimeSeriesData] = useState<TimeSeriesData | null>(null);
+    const [countryIds, setCountryIds] = useState<Record<string, string>>({});
     const [availableYears, setAvailableYears] = useState<number[]>([2010]);
     const [loading, setLoading] = useState(true);
     const [selectedMetric, setSelectedMetric] = useState('gdp_ppp_billions');
@@ -64,6 +71,10 @@ export default function TrendsPage() {
             );
             const allCountries = await Promise.all(countryPromises);
             setCountries(allCountries.filter(Boolean));
+            // Time series are keyed by stable country ID (older indexes: the file slug)
+            setCountryIds(Object.fromEntries(indexData.countries.map((c: { name: string; id?: string; file: string }) =>
+                [c.name, c.id ?? c.file.replace('.json', '')]
+            )));
             
             if (tsData && tsData.data) {
                 setTimeSeriesData(tsData.data);
@@ -104,7 +115,7 @@ export default function TrendsPage() {
         const country = countries.find(c => c.country === countryName);
         if (!country) return null;
 
-        const tsCountryData = timeSeriesData?.[countryName.toLowerCase()];
+        const tsCountryData = timeSeriesData?.[countryIds[countryName]];
         if (tsCountryData && tsCountryData[selectedMetric]) {
             return {
                 country: countryName,
@@ -112,6 +123,8 @@ export default function TrendsPage() {
             };
         }
 
+        // Derived metrics only exist as time series
+        if (metric.category === 'derived') return null;
         const category = metric.category as 'demographics' | 'economy' | 'military';
         const value = country[category]?.[selectedMetric];
         if (value === undefined) return null;
@@ -291,7 +304,10 @@ export default function TrendsPage() {
                                                 {item.data.map((point: any, idx: number) => (
                                                     <div key={point.year} className="flex items-center gap-1">
                                                         <span className="text-xs text-slate-500">{point.year}:</span>
-                                                        <span className="text-sm text-blue-600">{metric.format(point.value)}</span>
+                                                        <span
+                                                            className={`text-sm ${point.filled ? 'text-slate-400 italic' : 'text-blue-600'}`}
+                                                            title={point.filled ? `Not in this edition (${point.filled} fill)` : undefined}
+                                                        >{metric.format(point.value)}</span>
                                                         {idx < item.data.length - 1 && (
                                                             <span className="text-slate-400 mx-1">→</span>
                                                         )}
@@ -17,6 +17,15 @@ export interface CountryRiskProfile {
     factors: RiskFactor[];
     rank?: number;
     regionalRank?: number;
+    percentile?: number;
+    regionalPercentile?: number;
+}
+
+// Per-year output of risk_profiles.py (data/_merged/risk/<year>.json)
+export interface PrecomputedRisk {
+    year: number;
+    profiles: CountryRiskProfile[];
+    regionalStats: RegionalStats[];
 }
 
 export interface RiskFactor {
@@ -85,9 +94,9 @@ function calculateEconomicScore(country: CountryData, globalStats: GlobalStats):
         factors.push(unemploymentScore);
     }
     
-    // Trade balance ratio
-    if (country.economy.exports_billions && country.economy.imports_billions) {
-        const tradeRatio = country.economy.exports_billions / country.economy.imports_billions;
+    // Trade ratio (exports / imports, merged by merge_timeseries.py)
+    const tradeRatio = country.derived?.trade_ratio;
+    if (tradeRatio) {
         const tradeScore = Math.min(100, tradeRatio * 50);
         factors.push(tradeScore);
     }
@@ -234,9 +243,11 @@ function getRiskColor(score: number): string {
     return '#ef4444';
 }
 
-export function calculateRiskProfile(country: CountryData, allCountries: CountryData[]): CountryRiskProfile {
-    const globalStats = calculateGlobalStats(allCountries);
-    
+export function calculateRiskProfile(
+    country: CountryData,
+    allCountries: CountryData[],
+    globalStats: GlobalStats = calculateGlobalStats(allCountries)
+): CountryRiskProfile {
     const economic = calculateEconomicScore(country, globalStats);
     const political = calculatePoliticalScore(country);
     const military = calculateMilitaryScore(country, globalStats);
@@ -316,7 +327,9 @@ export function calculateRiskProfile(country: CountryData, allCountries: Country
 }
 
 export function calculateAllRiskProfiles(countries: CountryData[]): CountryRiskProfile[] {
-    const profiles = countries.map(c => calculateRiskProfile(c, countries));
+    // Global stats are shared by every profile, so compute them once
+    const globalStats = calculateGlobalStats(countries);
+    const profiles = countries.map(c => calculateRiskProfile(c, countries, globalStats));
     
     // Sort by overall score descending (higher = more stable)
     profiles.sort((a, b) => b.score.overall - a.score.overall);
@@ -146,14 +146,13 @@ const ANOMALY_CHECKS: AnomalyConfig[] = [
         title: 'Trade Imbalance',
         icon: '⚖️',
         check: (country) => {
-            const exports = country.economy.exports_billions;
-            const imports = country.economy.imports_billions;
-            const gdp = country.economy.gdp_ppp_billions;
+            const balance = country.derived?.trade_balance_billions;
+            const balancePctGdp = country.derived?.trade_balance_pct_gdp;
             
-            if (!exports || !imports || !gdp) return null;
+            if (balance === undefined || balancePctGdp === undefined) return null;
             
-            const deficit = imports - exports;
-            const deficitRatio = deficit / gdp;
+            const deficit = -balance;
+            const deficitRatio = -balancePctGdp / 100;
             
             // Significant deficit relative to GDP
             if (deficitRatio > 0.15 && deficit > 50) {
@@ -179,12 +178,11 @@ const ANOMALY_CHECKS: AnomalyConfig[] = [
         title: 'Debt Crisis',
         icon: '💳',
         check: (country) => {
-            const debt = country.economy.external_debt_billions;
-            const gdp = country.economy.gdp_ppp_billions;
+            const debtPctGdp = country.derived?.external_debt_pct_gdp;
             
-            if (!debt || !gdp) return null;
+            if (!debtPctGdp) return null;
             
-            const debtRatio = debt / gdp;
+            const debtRatio = debtPctGdp / 100;
             
             if (debtRatio > 1.5) {
                 return {
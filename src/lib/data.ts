@@ -1,5 +1,7 @@
 import fs from 'fs';
 import path from 'path';
+import type { PrecomputedRisk } from './analysis';
+import { DERIVED_METRIC_KEYS, withDerived, type DerivedByCountry, type DerivedMetrics } from './derived';
 
 export interface CountryData {
     country: string;
@@ -37,12 +39,16 @@ export interface CountryData {
         head_of_government?: string;
         last_election?: string;
     };
+    derived?: DerivedMetrics;  // From the merged timeseries, see loadDerivedMetrics()
 }
 
 export interface IndexData {
     year: number;
+    layout?: string | null;  // Detected edition layout; null if unrecognized
+    parser?: string;         // Extractor class that parsed it
     total_countries: number;
     countries: Array<{
+        id?: string;  // Stable ID from data/_countries.json (country_ids.py)
         name: string;
         region: string;
         file: string;
@@ -83,6 +89,7 @@ export function loadCountry(year: number, filename: string): CountryData | null
     }
 }
 
+// A year's countries in _index.json order, with their derived metrics when merged
 export function loadAllCountries(year: number): CountryData[] {
     const index = loadIndex(year);
     if (!index) return [];
@@ -94,7 +101,96 @@ export function loadAllCountries(year: number): CountryData[] {
             countries.push(country);
         }
     }
-    return countries;
+    return withDerived(countries, loadDerivedMetrics(year));
+}
+
+// One year's DERIVED_METRICS from data/_merged/timeseries.json (merge_timeseries.py),
+// keyed by country name; filled points are skipped. Null if not merged yet.
+export function loadDerivedMetrics(year: number): DerivedByCountry | null {
+    const index = loadIndex(year);
+    if (!index) return null;
+    try {
+        const timeseriesPath = path.join(DATA_DIR, '_merged', 'timeseries.json');
+        const timeseries: Record<string, Record<string, Array<{ year: number; value: number; filled?: string }>>> =
+            JSON.parse(fs.readFileSync(timeseriesPath, 'utf-8'));
+
+        const derived: DerivedByCountry = {};
+        for (const entry of index.countries) {
+            // Time series are keyed by stable country ID (older indexes: the file slug)
+            const key = entry.id ?? entry.file.replace('.json', '');
+            if (!Object.hasOwn(timeseries, key)) continue;
+            const values: Record<string, number> = {};
+            for (const metric of DERIVED_METRIC_KEYS) {
+                const point = timeseries[key][metric]?.find(p => p.year === year && !p.filled);
+                if (point) values[metric] = point.value;
+            }
+            derived[entry.name] = values;
+        }
+        return derived;
+    } catch {
+        return null;
+    }
+}
+
+// Risk profiles precomputed by risk_profiles.py, or null if not generated
+export function loadRiskProfiles(year: number): PrecomputedRisk | null {
+    try {
+        const riskPath = path.join(DATA_DIR, '_merged', 'risk', `${year}.json`);
+        const content = fs.readFileSync(riskPath, 'utf-8');
+        return JSON.parse(content);
+    } catch {
+        return null;
+    }
+}
+
+export interface HorizonAlert {
+    country: string;   // Stable ID (country_ids.py)
+    name: string;      // Display name from data/_countries.json
+    period: string;    // "<from>_to_<to>"
+    alerts: string[];  // e.g. "population_decline", "gdp_ppp_billions_major_change"
+}
+
+export interface HorizonAlerts {
+    horizons: number[];
+    horizon: number;
+    periods: string[];
+    alerts: HorizonAlert[];
+}
+
+function loadCountryNames(): Record<string, string> {
+    try {
+        const content = fs.readFileSync(path.join(DATA_DIR, '_countries.json'), 'utf-8');
+        const index: { countries: Record<string, { name: string }> } = JSON.parse(content);
+        return Object.fromEntries(Object.entries(index.countries).map(([id, entry]) => [id, entry.name]));
+    } catch {
+        return {};
+    }
+}
+
+// Alerts for one horizon of horizons.json (merge_timeseries.py --horizons), or null if
+// not generated. Defaults to the longest horizon; changes and trends are left out.
+export function loadHorizonAlerts(horizon?: number): HorizonAlerts | null {
+    try {
+        const horizonsPath = path.join(DATA_DIR, '_merged', 'horizons.json');
+        const data = JSON.parse(fs.readFileSync(horizonsPath, 'utf-8'));
+        const horizons: number[] = data.horizons;
+        const selected = horizon ?? horizons[horizons.length - 1];
+        if (!horizons.includes(selected)) return null;
+
+        const names = loadCountryNames();
+        const window = data[String(selected)];
+        return {
+            horizons,
+            horizon: selected,
+            periods: window.periods,
+            alerts: window.alerts.map((entry: Omit<HorizonAlert, 'name'>) => ({
+                ...entry,
+                name: Object.hasOwn(names, entry.country) ? names[entry.country] : entry.country,
+            })),
+        };
+    } catch {
+        return null;
+    }
 }
 
 export function getRegions(countries: CountryData[]): string[] {
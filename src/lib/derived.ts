@@ -0,0 +1,23 @@
+// Series merge_timeseries.py derives for every country and year (DERIVED_METRICS).
+// Pages read them from a country's "derived" block instead of redoing the arithmetic.
+export interface DerivedMetrics {
+    trade_balance_billions?: number;
+    trade_ratio?: number;
+    trade_balance_pct_gdp?: number;
+    external_debt_pct_gdp?: number;
+    exports_per_capita?: number;
+    external_debt_per_capita?: number;
+}
+
+export const DERIVED_METRIC_KEYS: Array<keyof DerivedMetrics> = [
+    'trade_balance_billions', 'trade_ratio', 'trade_balance_pct_gdp',
+    'external_debt_pct_gdp', 'exports_per_capita', 'external_debt_per_capita',
+];
+
+// One year's derived metrics, keyed by country name as in the per-year country files
+export type DerivedByCountry = Record<string, DerivedMetrics>;
+
+export function withDerived<T extends { country: string }>(countries: T[], derived: DerivedByCountry | null): T[] {
+    if (!derived) return countries;
+    return countries.map(c => Object.hasOwn(derived, c.country) ? { ...c, derived: derived[c.country] } : c);
+}
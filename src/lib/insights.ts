@@ -109,9 +109,9 @@ export function generateCountryInsights(country: CountryData, allCountries: Coun
     }
     
     // Trade Analysis
-    if (country.economy.exports_billions && country.economy.imports_billions) {
-        const balance = country.economy.exports_billions - country.economy.imports_billions;
-        const exports = country.economy.exports_billions;
+    const balance = country.derived?.trade_balance_billions;
+    if (balance !== undefined) {
+        const exports = country.economy.exports_billions ?? 0;
         
         if (balance > 50) {
             insights.push({
@@ -141,7 +141,7 @@ export function generateCountryInsights(country: CountryData, allCountries: Coun
             .sort((a, b) => (b.economy.exports_billions || 0) - (a.economy.exports_billions || 0));
         const exportRank = allExports.findIndex(c => c.country === country.country) + 1;
         
-        if (exportRank <= 10) {
+        if (exportRank > 0 && exportRank <= 10) {
             insights.push({
                 id: 'major-exporter',
                 type: 'positive',
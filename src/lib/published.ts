@@ -0,0 +1,115 @@
+import fs from 'fs';
+import path from 'path';
+
+// Artifacts precompressed by publish.py, described by data/_public/manifest.json
+export interface PublishedEntry {
+    etag: string;
+    sha256: string;
+    bytes: number;
+    envelope?: 'data';  // Published as {"data": artifact}
+    gz?: number;
+    br?: number;
+    source_bytes: number;
+    source_mtime_ns: string;  // Nanoseconds, as a string to stay exact
+}
+
+interface PublishedManifest {
+    version: number;
+    brotli: boolean;
+    files: Record<string, PublishedEntry>;
+}
+
+const DATA_DIR = path.join(process.cwd(), 'data');
+const PUBLIC_DIR = path.join(DATA_DIR, '_public');
+const MANIFEST_PATH = path.join(PUBLIC_DIR, 'manifest.json');
+
+// Best first; keys are the manifest fields and file suffixes of each variant
+const ENCODINGS = [
+    { key: 'br', name: 'br' },
+    { key: 'gz', name: 'gzip' },
+] as const;
+
+let cached: { mtimeMs: number; manifest: PublishedManifest } | null = null;
+
+// Re-read only when publish.py has swapped in a new manifest
+function loadManifest(): PublishedManifest | null {
+    try {
+        const { mtimeMs } = fs.statSync(MANIFEST_PATH);
+        if (!cached || cached.mtimeMs !== mtimeMs) {
+            cached = { mtimeMs, manifest: JSON.parse(fs.readFileSync(MANIFEST_PATH, 'utf-8')) };
+        }
+        return cached.manifest;
+    } catch {
+        return null;
+    }
+}
+
+// Content codings the client accepts, ignoring q=0
+function acceptedEncodings(header: string | null): Set<string> {
+    const accepted = new Set<string>();
+    for (const part of (header || '').split(',')) {
+        const [coding, ...params] = part.trim().toLowerCase().split(';');
+        const q = params.map(p => p.trim()).find(p => p.startsWith('q='));
+        if (coding && !(q && parseFloat(q.slice(2)) === 0)) {
+            accepted.add(coding);
+        }
+    }
+    return accepted;
+}
+
+// Every variant shares the artifact's hash, so any of their ETags validates
+function matchesETag(header: string | null, entry: PublishedEntry): boolean {
+    if (!header) return false;
+    const hash = entry.etag.slice(1, -1);
+    return header.split(',').some(tag => {
+        const value = tag.trim().replace(/^W\//, '');
+        return value === '*' || value.replace(/-(br|gz)"$/, '"') === `"${hash}"`;
+    });
+}
+
+// The source was rewritten after publish.py ran, so the published bytes may be stale
+function sourceChanged(file: string, entry: PublishedEntry): boolean {
+    try {
+        const stat = fs.statSync(path.join(DATA_DIR, file), { bigint: true });
+        return stat.size !== BigInt(entry.source_bytes) || stat.mtimeNs.toString() !== entry.source_mtime_ns;
+    } catch {
+        return true;
+    }
+}
+
+/**
+ * Serve a published artifact (path relative to data/, e.g. '2010/albania.json')
+ * as precompressed bytes with an ETag, or 304 when the client's copy is current.
+ * Returns null when the artifact has not been published, or its source changed
+ * since it was, so routes can fall back to the live file.
+ */
+export function publishedResponse(request: Request, file: string): Response | null {
+    const files = loadManifest()?.files;
+    const entry = files && Object.hasOwn(files, file) ? files[file] : undefined;
+    if (!entry || sourceChanged(file, entry)) return null;
+
+    const accepted = acceptedEncodings(request.headers.get('accept-encoding'));
+    const encoding = ENCODINGS.find(e => entry[e.key] !== undefined && (accepted.has(e.name) || accepted.has('*')));
+    const headers: Record<string, string> = {
+        'Content-Type': 'application/json; charset=utf-8',
+        'Cache-Control': 'public, max-age=0, must-revalidate',
+        'ETag': encoding ? `"${entry.etag.slice(1, -1)}-${encoding.key}"` : entry.etag,
+        'Vary': 'Accept-Encoding',
+    };
+
+    if (matchesETag(request.headers.get('if-none-match'), entry)) {
+        return new Response(null, { status: 304, headers });
+    }
+
+    let body: Buffer;
+    try {
+        body = fs.readFileSync(path.join(PUBLIC_DIR, file + (encoding ? `.${encoding.key}` : '')));
+    } catch {
+        return null;
+    }
+    if (encoding) {
+        headers['Content-Encoding'] = encoding.name;
+    }
+    headers['Content-Length'] = String(body.length);
+    return new Response(new Uint8Array(body), { headers });
+}
@@ -0,0 +1,41 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# The pipeline modules live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from country_ids import slugify  # noqa: E402
+from merge_timeseries import country_index  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """An empty data/ under a fresh working directory, as the pipeline scripts expect."""
+    monkeypatch.chdir(tmp_path)
+    country_index.cache_clear()
+    (tmp_path / 'data').mkdir()
+    yield tmp_path / 'data'
+    country_index.cache_clear()
+
+
+@pytest.fixture
+def write_year(data_dir):
+    """Write one edition as extract_factbook.py does: a JSON file per country plus _index.json."""
+    def write(year: int, countries: list):
+        year_dir = data_dir / str(year)
+        year_dir.mkdir(exist_ok=True)
+        entries = []
+        for country in countries:
+            record = {'country': country['country'], 'region': country.get('region', 'Europe'), 'year': year,
+                      'demographics': {}, 'economy': {}, 'military': {}, 'political': {}}
+            for section in ('demographics', 'economy', 'military', 'political'):
+                record[section].update(country.get(section, {}))
+            filename = f"{slugify(country['country'])}.json"
+            (year_dir / filename).write_text(json.dumps(record, indent=2))
+            entries.append({'name': record['country'], 'region': record['region'], 'file': filename})
+        index = {'year': year, 'total_countries': len(entries), 'countries': entries}
+        (year_dir / '_index.json').write_text(json.dumps(index, indent=2))
+    return write
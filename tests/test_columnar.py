@@ -0,0 +1,33 @@
+import pytest
+
+from columnar import decode_columns, encode_columns, table_to_countries, table_to_records
+from records import CountryRecord
+
+COUNTRIES = [
+    {'country': 'Albania', 'region': 'Europe', 'year': 2010,
+     'demographics': {'population': 2986952, 'median_age': 30.0},
+     'economy': {'gdp_ppp_billions': 23.95},
+     'political': {'chief_of_state': 'President Bamir TOPI'}},
+    {'country': 'Algeria', 'region': 'Africa', 'year': 2010,
+     'demographics': {'population': 34586184},
+     'economy': {},
+     'political': {}},
+]
+
+
+def test_round_trip():
+    table = decode_columns(encode_columns(COUNTRIES))
+    assert table['year'] == 2010
+    assert table_to_countries(table) == COUNTRIES
+    assert table_to_records(table) == [CountryRecord.from_dict(country) for country in COUNTRIES]
+
+
+def test_int_columns_stay_ints():
+    countries = table_to_countries(decode_columns(encode_columns(COUNTRIES)))
+    assert type(countries[1]['demographics']['population']) is int
+    assert type(countries[0]['demographics']['median_age']) is float
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        decode_columns(b'{"country": "Albania"}')
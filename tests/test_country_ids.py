@@ -0,0 +1,48 @@
+import json
+
+from country_ids import INDEX_FILE, CountryIndex, load_index, normalize, save_index
+
+
+def test_spellings_normalize_alike():
+    assert normalize('Korea, South') == normalize('korea,_south') == normalize('korea_south')
+
+
+def test_aliases_and_renames_share_an_id():
+    index = CountryIndex()
+    assert index.add('Burma') == 'burma'
+    assert index.add('Myanmar') == 'burma'
+    assert index.name('burma') == 'Myanmar'
+    assert index.resolve('Korea, South') == index.resolve('South Korea') == 'korea_south'
+    assert index.resolve('Atlantis') == 'atlantis'
+
+
+def test_ids_survive_a_round_trip():
+    index = CountryIndex()
+    index.add('Holy See (Vatican City)')
+    index.add('Vatican City')
+    restored = CountryIndex.from_json(json.loads(json.dumps(index.to_json())))
+    assert restored.to_json() == index.to_json()
+    assert restored.lookup('Vatican City') == 'holy_see'
+
+
+def test_load_index_picks_up_editions(tmp_path):
+    for year, name in ((2000, 'Swaziland'), (2020, 'Eswatini')):
+        (tmp_path / str(year)).mkdir()
+        index_data = {'countries': [{'name': name, 'region': 'Africa', 'file': 'x.json'}]}
+        (tmp_path / str(year) / '_index.json').write_text(json.dumps(index_data))
+    index = load_index(tmp_path)
+    assert index.to_json()['countries'] == {
+        'swaziland': {'name': 'Eswatini', 'aliases': ['Swaziland', 'Eswatini']},
+    }
+
+
+def test_save_index_writes_only_changes(tmp_path):
+    index = CountryIndex()
+    index.add('Albania')
+    assert save_index(index, tmp_path)
+    assert not save_index(index, tmp_path)
+    index.add('Algeria')
+    assert save_index(index, tmp_path)
+    assert load_index(tmp_path).lookup('Algeria') == 'algeria'
+    # Written through a temp file that is swapped in whole
+    assert [path.name for path in tmp_path.iterdir()] == [INDEX_FILE]
@@ -0,0 +1,54 @@
+from extract_factbook import FactbookExtractor, country_segments, plan_shards
+
+COUNTRY = """<p>@{name} ({region})</p>
+<p>People ::</p>
+<p>Population:</p>
+<p>{population:,} (July 2010 est.)</p>
+<p>Median age:</p>
+<p>total: {age} years</p>
+<p>Economy ::</p>
+<p>GDP (purchasing power parity):</p>
+<p>${gdp} billion (2009 est.)</p>
+<p>Exports: ${exports} billion (2009 est.)</p>
+"""
+
+
+def write_edition(path, count=12):
+    parts = ['<html><body><p>The World Factbook</p>\n']
+    for i in range(count):
+        if i == 5:
+            # A marker without any fields is dropped by _finalize_country
+            parts.append('<p>@Nowhere (Oceans)</p>\n<p>Introduction ::</p>\n')
+        parts.append(COUNTRY.format(name=f'Country {chr(65 + i)}', region='Europe',
+                                    population=1_000_000 * (i + 1), age=20 + i,
+                                    gdp=10 + i * 1.5, exports=1 + i * 0.25))
+    parts.append('</body></html>\n')
+    path.write_text(''.join(parts))
+
+
+def test_sharded_matches_serial(tmp_path):
+    edition = tmp_path / 'factbook_2010.html'
+    write_edition(edition)
+
+    serial = FactbookExtractor(2010, verbose=False).process_file(str(edition))
+    sharded = FactbookExtractor(2010, verbose=False).process_file_sharded(str(edition), workers=2)
+
+    assert len(serial) == 12
+    assert 'Nowhere' not in [record.country for record in serial]
+    assert [record.to_dict() for record in sharded] == [record.to_dict() for record in serial]
+    assert serial[0].to_dict()['economy'] == {'gdp_ppp_billions': 10.0, 'exports_billions': 1.0}
+
+
+def test_segments_start_at_countries(tmp_path):
+    edition = tmp_path / 'factbook_2010.html'
+    write_edition(edition, count=4)
+    data = edition.read_bytes()
+
+    segments = country_segments(str(edition))
+    assert len(segments) == 5
+    assert segments[0][0] == 0 and segments[-1][1] == len(data)
+    for start, _ in segments[1:]:
+        assert data[start:start + 4] == b'<p>@'
+
+    shards = plan_shards(segments, 2)
+    assert [segment for shard in shards for segment in shard] == segments
@@ -0,0 +1,56 @@
+import json
+
+from factbook_db import FactbookDB, build_database
+
+COUNTRIES = {
+    2005: [{'country': 'Albania', 'demographics': {'population': 3563112}, 'economy': {'gdp_ppp_billions': 18.0}}],
+    2010: [{'country': 'Albania', 'demographics': {'population': 2986952}, 'economy': {'gdp_ppp_billions': 23.95}},
+           {'country': 'Algeria', 'region': 'Africa', 'economy': {'gdp_ppp_billions': 254.7}}],
+}
+
+
+def test_build_and_query(data_dir, write_year):
+    for year, countries in COUNTRIES.items():
+        write_year(year, countries)
+    db_path = data_dir / '_merged' / 'factbook.db'
+    counts = build_database(db_path, [2005, 2010])
+    assert counts['countries'] == 2 and counts['observations'] == 5
+
+    with FactbookDB(db_path) as db:
+        assert db.years() == [2005, 2010]
+        assert db.series('albania', 'population') == [{'year': 2005, 'value': 3563112},
+                                                      {'year': 2010, 'value': 2986952}]
+        assert [row['country'] for row in db.top('gdp_ppp_billions', 2010)] == ['algeria', 'albania']
+        assert db.between('gdp_ppp_billions', 2010, low=20, high=100)[0]['country'] == 'albania'
+
+
+def test_changes_with_metrics_never_observed(data_dir, write_year):
+    for year, countries in COUNTRIES.items():
+        write_year(year, countries)
+    changes = {
+        'albania': {'2005_to_2010': {
+            'metrics': {
+                'gdp_ppp_billions': {'old': 18.0, 'new': 23.95, 'abs_change': 5.95, 'pct_change': 33.06},
+                # Tracked, but in no loaded edition: still gets a metrics row
+                'unemployment_pct': {'old': 13.0, 'new': 12.5, 'abs_change': -0.5, 'pct_change': -3.85},
+                # Not tracked: skipped with a warning
+                'bogus_metric': {'old': 1, 'new': 2, 'abs_change': 1, 'pct_change': 100.0},
+            },
+            'alerts': ['gdp_ppp_billions_major_change'],
+        }},
+        # No extracted data: skipped with a warning
+        'atlantis': {'2005_to_2010': {'metrics': {}, 'alerts': ['population_decline']}},
+    }
+    changes_path = data_dir / '_merged' / 'changes.json'
+    changes_path.parent.mkdir()
+    changes_path.write_text(json.dumps(changes))
+    db_path = data_dir / '_merged' / 'factbook.db'
+    counts = build_database(db_path, [2005, 2010], changes_path)
+    assert counts['changes'] == 2 and counts['alerts'] == 1
+
+    with FactbookDB(db_path) as db:
+        assert {'name': 'unemployment_pct', 'section': 'economy'} in db.metrics()
+        assert 'bogus_metric' not in [row['name'] for row in db.metrics()]
+        assert db.movers('unemployment_pct', 2005, 2010)[0]['new'] == 12.5
+        assert db.alerts(2005, 2010) == [{'country': 'albania', 'from_year': 2005, 'to_year': 2010,
+                                          'alert': 'gdp_ppp_billions_major_change'}]
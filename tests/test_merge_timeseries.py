@@ -0,0 +1,136 @@
+import json
+import shutil
+import sys
+
+import pytest
+
+import merge_timeseries
+from merge_timeseries import OUTPUT_DIR, country_index, load_derived_metrics
+
+YEARS = [2000, 2002, 2004, 2006, 2008]
+NAMES = ['Albania', 'Algeria', 'Burma', 'Chad', 'Fiji']
+
+
+def edition(year: int) -> list:
+    """Deterministic countries for one year, with gaps, a rename and a few alert-sized jumps."""
+    countries = []
+    for i, name in enumerate(NAMES):
+        step = (year - 2000) // 2
+        if name == 'Burma' and year >= 2006:
+            name = 'Myanmar'
+        economy = {
+            'gdp_ppp_billions': round(10.0 * (i + 1) * (1.1 + 0.2 * (i == 3 and step == 3)) ** step, 2),
+            'exports_billions': round(1.5 + i + step * 0.25, 2),
+            'imports_billions': round(2.0 + i * 0.5 + step * 0.5, 2),
+            'inflation_pct': 2.5 + (15.0 if i == 1 and year == 2004 else 0.0),
+        }
+        if (i + step) % 3:
+            economy['external_debt_billions'] = round(0.5 * (i + step), 1)
+        countries.append({
+            'country': name,
+            'demographics': {'population': 1_000_000 * (i + 1) + 1_000 * step, 'median_age': 20.0 + i},
+            'economy': economy,
+            'military': {} if (i == 4 and year == 2002) else {'expenditure_pct_gdp': 1.0 + 0.1 * i},
+        })
+    return countries
+
+
+def merge(monkeypatch, *args) -> dict:
+    """Run merge_timeseries.py in-process and return its outputs as bytes."""
+    country_index.cache_clear()
+    monkeypatch.setattr(sys, 'argv', ['merge_timeseries.py', *args])
+    assert merge_timeseries.main() == 0
+    outputs = {}
+    for name in ('timeseries.json', 'changes.json', 'horizons.json'):
+        if (OUTPUT_DIR / name).exists():
+            outputs[name] = (OUTPUT_DIR / name).read_bytes()
+    return outputs
+
+
+MERGE_OPTIONS = [[], ['--fill', 'interpolate', 'forward'], ['--horizons', '1', '4']]
+
+
+@pytest.mark.parametrize('options', MERGE_OPTIONS)
+def test_incremental_appended_year_matches_full(data_dir, write_year, monkeypatch, options):
+    for year in YEARS[:-1]:
+        write_year(year, edition(year))
+    merge(monkeypatch, *options)
+    write_year(YEARS[-1], edition(YEARS[-1]))
+
+    incremental = merge(monkeypatch, '--incremental', *options)
+    assert json.loads((OUTPUT_DIR / '_state.json').read_text())['years'].keys() == {str(y) for y in YEARS}
+    assert incremental == merge(monkeypatch, *options)
+
+
+@pytest.mark.parametrize('options', MERGE_OPTIONS)
+def test_incremental_reextracted_and_removed_years_match_full(data_dir, write_year, monkeypatch, options):
+    for year in YEARS:
+        write_year(year, edition(year))
+    merge(monkeypatch, *options)
+
+    countries = edition(2004)
+    countries[0]['economy']['gdp_ppp_billions'] = 1234.5
+    del countries[2]
+    write_year(2004, countries)
+    (data_dir / '2004' / 'burma.json').unlink()
+    assert merge(monkeypatch, '--incremental', *options) == merge(monkeypatch, *options)
+
+    shutil.rmtree(data_dir / '2002')
+    assert merge(monkeypatch, '--incremental', *options) == merge(monkeypatch, *options)
+
+
+def test_incremental_earlier_edition_matches_full(data_dir, write_year, monkeypatch):
+    for year in YEARS:
+        write_year(year, edition(year))
+    merge(monkeypatch)
+    # An older edition with a country no later one has moves it ahead of the others
+    write_year(1998, [{'country': 'Andorra', 'demographics': {'population': 70000}}, *edition(2000)])
+    assert merge(monkeypatch, '--incremental') == merge(monkeypatch)
+
+
+def test_incremental_fill_switch_matches_full(data_dir, write_year, monkeypatch):
+    for year in YEARS:
+        write_year(year, edition(year))
+    merge(monkeypatch)
+    filled = merge(monkeypatch, '--incremental', '--fill', 'interpolate')
+    assert filled == merge(monkeypatch, '--fill', 'interpolate')
+
+
+def test_incremental_without_changes_rewrites_nothing(data_dir, write_year, monkeypatch):
+    for year in YEARS:
+        write_year(year, edition(year))
+    merge(monkeypatch)
+    before = (OUTPUT_DIR / 'timeseries.json').stat().st_mtime_ns
+    merge(monkeypatch, '--incremental')
+    assert (OUTPUT_DIR / 'timeseries.json').stat().st_mtime_ns == before
+
+
+def test_stream_matches_full(data_dir, write_year, monkeypatch):
+    for year in YEARS:
+        write_year(year, edition(year))
+    full = merge(monkeypatch)
+    stream = merge(monkeypatch, '--stream')
+    for name in ('timeseries.json', 'changes.json'):
+        assert json.loads(stream[name]) == json.loads(full[name])
+
+
+def test_renamed_country_shares_one_series(data_dir, write_year, monkeypatch):
+    for year in YEARS:
+        write_year(year, edition(year))
+    timeseries = json.loads(merge(monkeypatch)['timeseries.json'])
+    assert 'myanmar' not in timeseries
+    assert [point['year'] for point in timeseries['burma']['population']] == YEARS
+
+
+def test_derived_metrics(data_dir, write_year, monkeypatch):
+    for year in YEARS:
+        write_year(year, edition(year))
+    merge(monkeypatch, '--fill', 'forward')
+    derived = load_derived_metrics()
+    albania = edition(2000)[0]['economy']
+    assert derived[2000]['albania']['trade_balance_billions'] == round(
+        albania['exports_billions'] - albania['imports_billions'], 2)
+    assert derived[2000]['albania']['trade_ratio'] == round(
+        albania['exports_billions'] / albania['imports_billions'], 4)
+    # No debt extracted for Albania in 2000 (filled points are left out)
+    assert 'external_debt_pct_gdp' not in derived[2000]['albania']
@@ -0,0 +1,33 @@
+from panel import MetricPanel
+from records import CountryRecord
+
+
+def record(country, year, **economy):
+    return CountryRecord.from_dict({'country': country, 'region': 'Europe', 'year': year, 'economy': economy})
+
+
+def test_from_country_data():
+    all_data = {
+        2000: {'albania': record('Albania', 2000, gdp_ppp_billions=10.5, exports_billions=1)},
+        2010: {'algeria': record('Algeria', 2010, gdp_ppp_billions=200.0),
+               'albania': record('Albania', 2010, exports_billions=2.5)},
+    }
+    panel = MetricPanel.from_country_data(all_data, [2000, 2010],
+                                          {'economy': ['gdp_ppp_billions', 'exports_billions']})
+    assert panel.countries == ['albania', 'algeria']
+    assert panel.value('gdp_ppp_billions', 0, 0) == 10.5
+    assert panel.value('gdp_ppp_billions', 1, 0) is None
+    assert panel.value('exports_billions', 0, 0) == 1
+    assert type(panel.value('exports_billions', 0, 0)) is int
+    assert list(panel.present[0]) == [1, 0]
+    assert list(panel.present[1]) == [1, 1]
+    assert list(panel.column('gdp_ppp_billions', 2010))[1] == 200.0
+
+
+def test_copy_is_independent():
+    panel = MetricPanel([2000], ['albania'], ['population'])
+    panel.set('population', 0, 0, 3000000)
+    copy = panel.copy()
+    copy.set('population', 0, 0, 1.5)
+    assert panel.value('population', 0, 0) == 3000000
+    assert copy.value('population', 0, 0) == 1.5
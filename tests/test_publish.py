@@ -0,0 +1,70 @@
+import gzip
+import json
+import os
+
+from publish import MANIFEST_FILE, iter_artifacts, publish
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2))
+
+
+def make_data(data_dir):
+    write_json(data_dir / '2010' / 'albania.json', {'country': 'Albania', 'economy': {'gdp_ppp_billions': 23.95}})
+    write_json(data_dir / '2010' / '_index.json', {'year': 2010, 'countries': []})
+    write_json(data_dir / '2010' / '_cache.json', {'input_sha256': 'abc'})
+    write_json(data_dir / '_merged' / 'timeseries.json', {'albania': {'population': [{'year': 2010, 'value': 1}]}})
+    write_json(data_dir / '_merged' / '_state.json', {'version': 3})
+
+
+def test_iter_artifacts_skips_bookkeeping(tmp_path):
+    make_data(tmp_path)
+    assert list(iter_artifacts(tmp_path)) == ['2010/_index.json', '2010/albania.json', '_merged/timeseries.json']
+
+
+def test_publish_writes_minified_variants(tmp_path):
+    data_dir, public_dir = tmp_path / 'data', tmp_path / 'public'
+    make_data(data_dir)
+    manifest = publish(data_dir, public_dir, verbose=False)
+
+    entry = manifest['files']['2010/albania.json']
+    content = (public_dir / '2010' / 'albania.json').read_bytes()
+    assert content == b'{"country":"Albania","economy":{"gdp_ppp_billions":23.95}}'
+    assert gzip.decompress((public_dir / '2010' / 'albania.json.gz').read_bytes()) == content
+    assert entry['bytes'] == len(content)
+    assert entry['source_bytes'] == (data_dir / '2010' / 'albania.json').stat().st_size
+
+    # The API serves merged timeseries as {"data": ...}
+    timeseries = json.loads((public_dir / '_merged' / 'timeseries.json').read_bytes())
+    assert manifest['files']['_merged/timeseries.json']['envelope'] == 'data'
+    assert timeseries == {'data': {'albania': {'population': [{'year': 2010, 'value': 1}]}}}
+    assert json.loads((public_dir / MANIFEST_FILE).read_text()) == manifest
+
+
+def test_republish_reuses_unchanged_and_refreshes_stat(tmp_path):
+    data_dir, public_dir = tmp_path / 'data', tmp_path / 'public'
+    make_data(data_dir)
+    first = publish(data_dir, public_dir, verbose=False)
+
+    source = data_dir / '2010' / 'albania.json'
+    info = source.stat()
+    os.utime(source, ns=(info.st_atime_ns, info.st_mtime_ns + 10 ** 9))
+    second = publish(data_dir, public_dir, verbose=False)
+
+    entry = second['files']['2010/albania.json']
+    assert entry['etag'] == first['files']['2010/albania.json']['etag']
+    assert entry['source_mtime_ns'] == str(source.stat().st_mtime_ns)
+    assert entry['source_mtime_ns'] != first['files']['2010/albania.json']['source_mtime_ns']
+
+
+def test_removed_sources_are_unpublished(tmp_path):
+    data_dir, public_dir = tmp_path / 'data', tmp_path / 'public'
+    make_data(data_dir)
+    publish(data_dir, public_dir, verbose=False)
+
+    (data_dir / '2010' / 'albania.json').unlink()
+    manifest = publish(data_dir, public_dir, verbose=False)
+    assert '2010/albania.json' not in manifest['files']
+    assert not (public_dir / '2010' / 'albania.json').exists()
+    assert not (public_dir / '2010' / 'albania.json.gz').exists()
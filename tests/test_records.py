@@ -0,0 +1,54 @@
+import pickle
+
+from records import MAX_EXACT_INT, CountryRecord
+
+DATA = {
+    'country': 'Albania',
+    'region': 'Europe',
+    'year': 2010,
+    'demographics': {'population': 2986952, 'median_age': 30.0},
+    'economy': {'gdp_ppp_billions': 23.95, 'inflation_pct': -0.5},
+    'military': {},
+    'political': {'chief_of_state': 'President Bamir TOPI'},
+}
+
+
+def test_round_trip_keeps_types_and_order():
+    record = CountryRecord.from_dict(DATA)
+    restored = record.to_dict()
+    assert restored == DATA
+    assert list(restored['economy']) == ['gdp_ppp_billions', 'inflation_pct']
+    assert type(restored['demographics']['population']) is int
+    assert type(restored['demographics']['median_age']) is float
+
+
+def test_get_and_has():
+    record = CountryRecord.from_dict(DATA)
+    assert record.get('economy', 'gdp_ppp_billions') == 23.95
+    assert record.get('political', 'chief_of_state') == 'President Bamir TOPI'
+    assert record.get('economy', 'unemployment_pct', 'n/a') == 'n/a'
+    assert record.has('demographics', 'population')
+    assert not record.has('military', 'expenditure_pct_gdp')
+    assert CountryRecord.from_dict(DATA).has_data()
+    assert not CountryRecord('Nowhere', None, 2010).has_data()
+
+
+def test_set_keeps_position_and_switches_type():
+    record = CountryRecord('Albania', 'Europe', 2010)
+    record.set('economy', 'gdp_ppp_billions', 1)
+    record.set('economy', 'inflation_pct', 2.5)
+    record.set('economy', 'gdp_ppp_billions', 'unknown')
+    assert record.to_dict()['economy'] == {'gdp_ppp_billions': 'unknown', 'inflation_pct': 2.5}
+    record.set('economy', 'gdp_ppp_billions', 3.0)
+    assert record.to_dict()['economy'] == {'gdp_ppp_billions': 3.0, 'inflation_pct': 2.5}
+
+
+def test_ints_beyond_float_precision_stay_exact():
+    record = CountryRecord('Albania', 'Europe', 2010)
+    record.set('economy', 'electricity_kwh', MAX_EXACT_INT + 1)
+    assert record.get('economy', 'electricity_kwh') == MAX_EXACT_INT + 1
+
+
+def test_pickle_round_trip():
+    record = CountryRecord.from_dict(DATA)
+    assert pickle.loads(pickle.dumps(record)) == record
@@ -0,0 +1,22 @@
+from risk_profiles import js_round, js_to_fixed
+
+
+def test_js_round_halves_go_up():
+    assert js_round(2.5) == 3
+    assert js_round(-2.5) == -2
+    assert js_round(-2.6) == -3
+
+
+def test_js_to_fixed():
+    # Exact binary value, ties away from zero: 1.005 is stored just below 1.005
+    assert js_to_fixed(1.005, 2) == '1.00'
+    assert js_to_fixed(2.5, 0) == '3'
+    assert js_to_fixed(-2.5, 0) == '-3'
+    assert js_to_fixed(12.3456, 1) == '12.3'
+
+
+def test_js_to_fixed_negative_zero():
+    # (-0).toFixed(1) is "0.0", but small negatives keep their sign
+    assert js_to_fixed(-0.0, 1) == '0.0'
+    assert js_to_fixed(-0.04, 1) == '-0.0'
+    assert js_to_fixed(-1e-20, 2) == '-0.00'